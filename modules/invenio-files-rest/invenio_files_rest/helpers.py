@@ -10,17 +10,24 @@
 
 from __future__ import absolute_import, print_function
 
+import codecs
 import hashlib
 import mimetypes
 import os
 import unicodedata
 from time import time
 
+import cchardet as chardet
 from flask import current_app, request
 from werkzeug.datastructures import Headers
 from werkzeug.urls import url_quote
 from werkzeug.wsgi import FileWrapper
 
+try:
+    from PyPDF2 import PdfFileReader
+except ImportError:  # pragma: no cover
+    PdfFileReader = None
+
 MIMETYPE_TEXTFILES = {
     'readme'
 }
@@ -249,6 +256,76 @@ def compute_checksum(stream, algo, message_digest, chunk_size=None,
     return "{0}:{1}".format(algo, message_digest.hexdigest())
 
 
+def _join_text(parts, max_chars):
+    """Join extracted text parts, truncated to ``max_chars``."""
+    text = ''.join(parts)
+    return text if max_chars is None else text[:max_chars]
+
+
+def extract_plain_text(stream, max_chars=None, chunk_size=None):
+    """Decode a text stream chunk by chunk.
+
+    The encoding is detected on the first chunk and the stream is decoded
+    incrementally, so at most ``max_chars`` characters are kept in memory.
+
+    :param stream: File-like object.
+    :param max_chars: Maximum number of characters to return.
+    :param chunk_size: Read at most size bytes from the file at a time.
+    :returns: The decoded text.
+    """
+    chunk_size = chunk_size or 64 * 1024
+    chunk = stream.read(chunk_size)
+    encoding = chardet.detect(chunk).get('encoding') or 'utf-8'
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    except LookupError:
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    parts = []
+    length = 0
+    while chunk:
+        text = decoder.decode(chunk)
+        parts.append(text)
+        length += len(text)
+        if max_chars is not None and length >= max_chars:
+            break
+        chunk = stream.read(chunk_size)
+    else:
+        parts.append(decoder.decode(b'', final=True))
+    return _join_text(parts, max_chars)
+
+
+def extract_pdf_text(stream, max_chars=None, chunk_size=None):
+    """Extract the text of a PDF stream page by page.
+
+    Pages are read one at a time from the seekable stream and extraction
+    stops once ``max_chars`` characters are collected, so the file is never
+    loaded as a whole.
+
+    :param stream: Seekable file-like object.
+    :param max_chars: Maximum number of characters to return.
+    :param chunk_size: Unused, for signature compatibility.
+    :returns: The extracted text, or ``None`` if PyPDF2 is not installed or
+        no text could be extracted (e.g. scanned pages or CID fonts).
+    """
+    if PdfFileReader is None:
+        return None
+    reader = PdfFileReader(stream, strict=False)
+    if reader.isEncrypted:
+        reader.decrypt('')
+
+    parts = []
+    length = 0
+    for i in range(reader.getNumPages()):
+        text = reader.getPage(i).extractText()
+        parts.append(text)
+        length += len(text)
+        if max_chars is not None and length >= max_chars:
+            break
+    text = _join_text(parts, max_chars)
+    return text if text.strip() else None
+
+
 def populate_from_path(bucket, source, checksum=True, key_prefix='',
                        chunk_size=None):
     """Populate a ``bucket`` from all files in path.
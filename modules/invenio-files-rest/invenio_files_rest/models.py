@@ -954,6 +954,16 @@ class FileInstance(db.Model, Timestamp):
         """
         return self.storage(**kwargs).read_file(fjson)
 
+    def read_text(self, fjson, max_chars=None, **kwargs):
+        """Extract the plain text of the file for Elasticsearch.
+
+        :param fjson: File metadata.
+        :param max_chars: Maximum number of characters to extract.
+        :param kwargs:
+        :returns: The extracted text, or ``None`` if not supported.
+        """
+        return self.storage(**kwargs).read_text(fjson, max_chars=max_chars)
+
 
 class ObjectVersion(db.Model, Timestamp):
     """Model for storing versions of objects.
@@ -15,7 +15,8 @@ from calendar import timegm
 from functools import partial
 
 from ..errors import FileSizeError, StorageError, UnexpectedFileSizeError
-from ..helpers import chunk_size_or_default, compute_checksum, send_stream
+from ..helpers import chunk_size_or_default, compute_checksum, \
+    extract_pdf_text, extract_plain_text, send_stream
 
 
 def check_sizelimit(size_limit, bytes_written, total_size):
@@ -149,6 +150,35 @@ class FileStorage(object):
         finally:
             fp.close()
 
+    def read_text(self, fjson, max_chars=None, chunk_size=None):
+        """Extract the plain text of the file by streaming it.
+
+        Text files and PDFs are extracted here, the other formats are left
+        to the ingest attachment processor of Elasticsearch.
+
+        :param fjson: File metadata, its ``mimetype`` selects the extractor.
+        :param max_chars: Maximum number of characters to extract.
+        :param chunk_size: Chunk size to read from the file.
+        :returns: The extracted text, or ``None`` if the mimetype is not
+            supported or no text could be extracted.
+        """
+        mime = (fjson or {}).get('mimetype', '')
+        if 'text' in mime:
+            extract = extract_plain_text
+        elif mime == 'application/pdf':
+            extract = extract_pdf_text
+        else:
+            return None
+
+        fp = self.open(mode='rb')
+        try:
+            return extract(fp, max_chars=max_chars, chunk_size=chunk_size)
+        except Exception as e:
+            raise StorageError(
+                'Could not extract text of file: {0}'.format(e))
+        finally:
+            fp.close()
+
     #
     # Helpers
     #
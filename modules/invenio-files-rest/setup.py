@@ -44,6 +44,9 @@ extras_require = {
     'mysql': [
         'invenio-db[mysql]>=1.0.0',
     ],
+    'pdf': [
+        'PyPDF2>=1.26.0',
+    ],
     'sqlite': [
         'invenio-db>=1.0.0',
     ],
@@ -17,7 +17,7 @@ from os.path import dirname, exists, getsize, join
 
 import pytest
 from fs.errors import DirectoryNotEmptyError, ResourceNotFoundError
-from mock import patch
+from mock import MagicMock, patch
 from six import BytesIO
 
 from invenio_files_rest.errors import FileSizeError, StorageError, \
@@ -215,6 +215,46 @@ def test_pyfs_checksum_fail():
     pytest.raises(StorageError, s.checksum, progress_callback=callback)
 
 
+def test_pyfs_read_text(pyfs):
+    """Test streaming text extraction."""
+    data = u'テキスト text\n'.encode('utf-8') * 100
+    pyfs.save(BytesIO(data))
+
+    text = pyfs.read_text({'mimetype': 'text/plain'}, chunk_size=7)
+    assert text == data.decode('utf-8')
+
+    text = pyfs.read_text({'mimetype': 'text/plain'}, max_chars=10,
+                          chunk_size=7)
+    assert text == data.decode('utf-8')[:10]
+
+    assert pyfs.read_text({'mimetype': 'image/png'}) is None
+
+
+def test_pyfs_read_pdf_text(pyfs):
+    """Test page by page PDF text extraction."""
+    pyfs.save(BytesIO(b'%PDF-1.4'))
+    pages = [MagicMock(**{'extractText.return_value': 'page{0} '.format(i)})
+             for i in range(5)]
+    reader = MagicMock(isEncrypted=False, **{
+        'getNumPages.return_value': len(pages),
+        'getPage.side_effect': pages.__getitem__})
+
+    with patch('invenio_files_rest.helpers.PdfFileReader',
+               return_value=reader):
+        text = pyfs.read_text({'mimetype': 'application/pdf'}, max_chars=10)
+        assert text == 'page0 page'
+        # Pages after the limit are not read.
+        assert not pages[2].extractText.called
+
+        for page in pages:
+            page.extractText.return_value = ' '
+        # No text, e.g. CID fonts: left to the ingest pipeline.
+        assert pyfs.read_text({'mimetype': 'application/pdf'}) is None
+
+    with patch('invenio_files_rest.helpers.PdfFileReader', None):
+        assert pyfs.read_text({'mimetype': 'application/pdf'}) is None
+
+
 def test_pyfs_send_file(app, pyfs):
     """Test send file."""
     data = b'sendthis'
@@ -3,6 +3,7 @@
 """Admin model views for Mail sets."""
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 from flask import abort, current_app, flash, request
 from flask_admin import BaseView, expose
@@ -133,6 +134,87 @@ class MailSettingView(BaseView):
             current_app.logger.error('Cannot send email', ex)
             return False
 
+    @classmethod
+    def send_statistic_mails(cls, list_rf, workers=1):
+        """Send statistic mails over reused SMTP connections.
+
+        The mail settings are loaded once, then the mails are split between
+        ``workers`` threads which each keep one SMTP connection open for
+        their whole share of mails.
+
+        Arguments:
+            list_rf {list} -- list of mail data
+
+        Keyword Arguments:
+            workers {integer} -- number of sending threads (default: {1})
+
+        Returns:
+            list -- True/False send result of each mail, in order
+
+        """
+        if not list_rf:
+            return []
+        try:
+            mail_cfg = _load_mail_cfg_from_db()
+            _set_flask_mail_cfg(mail_cfg)
+        except Exception as ex:
+            current_app.logger.error('Cannot load mail settings', ex)
+            return [False] * len(list_rf)
+
+        app = current_app._get_current_object()
+        workers = max(1, min(workers, len(list_rf)))
+        size = -(-len(list_rf) // workers)
+        chunks = [list_rf[i:i + size] for i in range(0, len(list_rf), size)]
+        if len(chunks) == 1:
+            return _send_mail_chunk(app, chunks[0])
+        results = []
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            for chunk_result in executor.map(
+                    lambda chunk: _send_mail_chunk(app, chunk), chunks):
+                results.extend(chunk_result)
+        return results
+
+
+def _close_connection(conn):
+    """Close a SMTP connection, ignoring errors of a broken one."""
+    try:
+        conn.__exit__(None, None, None)
+    except Exception:
+        pass
+
+
+def _send_mail_chunk(app, list_rf):
+    """Send mails through a single SMTP connection.
+
+    The connection is reopened after a failure because the SMTP session may
+    be left in an unusable state.
+    """
+    results = []
+    with app.app_context():
+        mail = app.extensions['mail']
+        conn = None
+        try:
+            for rf in list_rf:
+                try:
+                    if conn is None:
+                        conn = mail.connect().__enter__()
+                    msg = Message()
+                    msg.subject = rf['subject']
+                    msg.body = rf['body']
+                    msg.recipients = [rf['recipient']]
+                    conn.send(msg)
+                    results.append(True)
+                except Exception as ex:
+                    current_app.logger.error('Cannot send email', ex)
+                    results.append(False)
+                    if conn is not None:
+                        _close_connection(conn)
+                        conn = None
+        finally:
+            if conn is not None:
+                _close_connection(conn)
+    return results
+
 
 mail_adminview = {
     'view_class': MailSettingView,
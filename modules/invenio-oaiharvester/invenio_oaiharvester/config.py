@@ -45,3 +45,18 @@ OAIHARVESTER_DEFAULT_AUTO_DISTRIBUTION = '0'
 
 OAIHARVESTER_NUMBER_OF_HISTORIES = 20
 """Default display number of histories."""
+
+OAIHARVESTER_HTTP_POOL_SIZE = 10
+"""Number of pooled connections of the harvesting HTTP session."""
+
+OAIHARVESTER_HTTP_RETRIES = 3
+"""Number of retries of a failed connection to the OAI-PMH repository."""
+
+OAIHARVESTER_HTTP_TIMEOUT = 300
+"""Timeout in seconds of a request to the OAI-PMH repository."""
+
+OAIHARVESTER_MAP_WORKERS = 4
+"""Number of threads mapping harvested records (1 maps sequentially)."""
+
+OAIHARVESTER_COMMIT_BATCH_SIZE = 100
+"""Number of harvested items committed per transaction."""
@@ -20,7 +20,9 @@
 """Harvest records from an OAI-PMH repository."""
 
 import re
+import threading
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from json import dumps, loads
 
@@ -28,6 +30,7 @@ import dateutil
 import requests
 import xmltodict
 from celery import shared_task
+from flask import current_app
 from invenio_db import db
 from lxml import etree
 from weko_deposit.api import WekoDeposit
@@ -43,6 +46,29 @@ DEFAULT_FIELD = [
     'lang']
 
 
+_http_session = threading.local()
+
+
+def get_http_session():
+    """Get the HTTP session of the current thread.
+
+    The session keeps its connections open between the requests of a
+    harvest, instead of opening a new connection for every page.
+    """
+    session = getattr(_http_session, 'session', None)
+    if session is None:
+        pool_size = current_app.config['OAIHARVESTER_HTTP_POOL_SIZE']
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=current_app.config['OAIHARVESTER_HTTP_RETRIES'])
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _http_session.session = session
+    return session
+
+
 def list_sets(url, encoding='utf-8'):
     """Get sets list."""
     # Avoid SSLError - dh key too small
@@ -52,8 +78,10 @@ def list_sets(url, encoding='utf-8'):
     sets = []
     payload = {
         'verb': 'ListSets'}
+    session = get_http_session()
+    timeout = current_app.config['OAIHARVESTER_HTTP_TIMEOUT']
     while True:
-        response = requests.get(url, params=payload)
+        response = session.get(url, params=payload, timeout=timeout)
         et = etree.XML(response.text.encode(encoding))
         sets = sets + et.findall('./ListSets/set', namespaces=et.nsmap)
         resumptionToken = et.find(
@@ -73,7 +101,9 @@ def list_records(
         metadata_prefix=None,
         setspecs='*',
         resumption_token=None,
-        encoding='utf-8'):
+        encoding='utf-8',
+        session=None,
+        timeout=None):
     """Get records list."""
     # Avoid SSLError - dh key too small
     requests.packages.urllib3.disable_warnings()
@@ -89,7 +119,10 @@ def list_records(
         payload['resumptionToken'] = resumption_token
     records = []
     rtoken = None
-    response = requests.get(url, params=payload)
+    session = session or get_http_session()
+    if timeout is None:
+        timeout = current_app.config['OAIHARVESTER_HTTP_TIMEOUT']
+    response = session.get(url, params=payload, timeout=timeout)
     et = etree.XML(response.text.encode(encoding))
     records = records + et.findall('./ListRecords/record', namespaces=et.nsmap)
     resumptionToken = et.find(
@@ -100,6 +133,35 @@ def list_records(
     return records, rtoken
 
 
+def iter_list_records(
+        url,
+        from_date=None,
+        until_date=None,
+        metadata_prefix=None,
+        setspecs='*',
+        resumption_token=None,
+        encoding='utf-8'):
+    """Iterate over the pages of records list.
+
+    The next page is requested in the background while the caller is
+    processing the current one.
+
+    :return: Generator of (records, resumption token of the next page).
+    """
+    session = get_http_session()
+    timeout = current_app.config['OAIHARVESTER_HTTP_TIMEOUT']
+    fetch = partial(list_records, url, from_date, until_date,
+                    metadata_prefix, setspecs, encoding=encoding,
+                    session=session, timeout=timeout)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(fetch, resumption_token=resumption_token)
+        while future:
+            records, rtoken = future.result()
+            future = executor.submit(fetch, resumption_token=rtoken) \
+                if rtoken else None
+            yield records, rtoken
+
+
 def map_field(schema):
     """Get field map."""
     res = {}
@@ -1529,9 +1591,14 @@ class BaseMapper:
 
     @classmethod
     def update_itemtype_map(cls):
-        """Update itemtype map."""
+        """Update itemtype map.
+
+        Item types are detached from the session so that they are not
+        expired by later commits and can be used by the mapping workers.
+        """
         for t in ItemType.query.all():
             cls.itemtype_map[t.item_type_name.name] = t
+            db.session.expunge(t)
 
     def __init__(self, xml):
         """Init."""
@@ -23,7 +23,9 @@ from __future__ import absolute_import, print_function
 
 import signal
 from ast import literal_eval as make_tuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
 
 import dateutil
 from celery import current_task, shared_task
@@ -36,14 +38,14 @@ from invenio_pidstore.models import PersistentIdentifier, PIDStatus
 from invenio_records.models import RecordMetadata
 from lxml import etree
 from weko_deposit.api import WekoDeposit
-from weko_index_tree.models import Index
+from weko_index_tree.api import Indexes
+from weko_index_tree.models import Index, IndexTreeVersion
 from weko_records.models import ItemMetadata
 from weko_records_ui.utils import soft_delete
 
 from .api import get_records, list_records, send_run_status_mail
 from .harvester import DCMapper, DDIMapper, JPCOARMapper
-from .harvester import list_records as harvester_list_records
-from .harvester import list_sets, map_sets
+from .harvester import iter_list_records, list_sets, map_sets
 from .models import HarvestLogs, HarvestSettings
 from .signals import oaiharvest_finished
 from .utils import ItemEvents, get_identifier_names
@@ -113,8 +115,11 @@ def create_indexes(parent_id, sets):
         pos = 0
     specs = [leaf.harvest_spec for leaf in existed_leaves]
     parent_idx = Index.query.filter_by(id=parent_id).first()
-    for s in sets:
-        if s not in specs:
+    new_sets = [s for s in sets if s not in specs]
+    if not new_sets:
+        return
+    with db.session.begin_nested():
+        for s in new_sets:
             idx = Index()
             idx.parent = parent_id
             idx.browsing_role = parent_idx.browsing_role
@@ -127,7 +132,10 @@ def create_indexes(parent_id, sets):
             idx.position = pos
             pos = pos + 1
             db.session.add(idx)
-            db.session.commit()
+            db.session.flush()
+            Indexes.refresh_index_path(idx.id)
+        IndexTreeVersion.increase()
+    db.session.commit()
 
 
 def map_indexes(index_specs, parent_id):
@@ -148,19 +156,39 @@ def event_counter(event_name, counter):
         counter[event_name] = 1
 
 
-def process_item(record, harvesting, counter):
-    """Process item."""
-    event_counter('processed_items', counter)
-    event = ItemEvents.INIT
+def map_item(record, metadata_prefix):
+    """Parse and map a harvested record.
+
+    Only uses the record xml and the item type map, so that it can run in
+    the mapping workers.
+
+    :return: (mapper, mapped json) or None if the prefix is not supported.
+    """
     xml = etree.tostring(record, encoding='utf-8').decode()
-    if harvesting.metadata_prefix == 'oai_dc':
+    if metadata_prefix == 'oai_dc':
         mapper = DCMapper(xml)
-    elif harvesting.metadata_prefix == 'jpcoar':
+    elif metadata_prefix == 'jpcoar':
         mapper = JPCOARMapper(xml)
-    elif harvesting.metadata_prefix == 'ddi':
+    elif metadata_prefix == 'ddi':
         mapper = DDIMapper(xml)
     else:
+        return None
+    return mapper, mapper.map()
+
+
+def process_item(record, harvesting, counter, mapped=None, commit=True):
+    """Process item.
+
+    :param mapped: Result of map_item for the record, if already mapped.
+    :param commit: Commit the session when the item is processed.
+    """
+    event_counter('processed_items', counter)
+    event = ItemEvents.INIT
+    if mapped is None:
+        mapped = map_item(record, harvesting.metadata_prefix)
+    if mapped is None:
         return
+    mapper, json = mapped
     hvstid = PersistentIdentifier.query.filter_by(
         pid_type='hvstid', pid_value=mapper.identifier()).first()
     if hvstid:
@@ -195,10 +223,9 @@ def process_item(record, harvesting, counter):
         return
 
     if mapper.is_deleted():
-        soft_delete(recid.pid_value)
+        soft_delete(recid.pid_value, commit=commit)
         event = ItemEvents.DELETE
     else:
-        json = mapper.map()
         json['$schema'] = '/items/jsonschema/' + str(mapper.itemtype.id)
         dep['_deposit']['status'] = 'draft'
         dep.update({'actions': 'publish', 'index': indexes}, json)
@@ -225,7 +252,8 @@ def process_item(record, harvesting, counter):
             first_ver.publish()
 
     harvesting.item_processed = harvesting.item_processed + 1
-    db.session.commit()
+    if commit:
+        db.session.commit()
 
     if event == ItemEvents.CREATE:
         event_counter('created_items', counter)
@@ -251,20 +279,74 @@ def link_error_handler(request, exc, traceback):
     args = make_tuple(request.argsrepr)  # Cannot access original args
     start_time = datetime.strptime(args[1], '%Y-%m-%dT%H:%M:%S')
     end_time = datetime.now()
-    oaiharvest_finished.send(current_app._get_current_object(),
-                             exec_data={
-                                 'task_state': 'FAILURE',
-                                 'start_time': start_time.strftime('%Y-%m-%dT%H:%M:%S%z'),
-                                 'end_time': end_time.strftime('%Y-%m-%dT%H:%M:%S%z'),
-                                 'total_records': 0,
-                                 'execution_time': str(end_time - start_time),
-                                 'task_name': 'harvest',
-                                 'repository_name': 'weko',  # TODO: Grab from config
-                                 'task_id': request.id
-    },
+    oaiharvest_finished.send(
+        current_app._get_current_object(),
+        exec_data={
+            'task_state': 'FAILURE',
+            'start_time': start_time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'end_time': end_time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'total_records': 0,
+            'execution_time': str(end_time - start_time),
+            'task_name': 'harvest',
+            'repository_name': 'weko',  # TODO: Grab from config
+            'task_id': request.id
+        },
         user_data=args[2])
 
 
+def process_items(records, harvesting, counter, executor=None):
+    """Process the items of a page of harvested records.
+
+    Records are mapped by the executor, if any, and each item is processed
+    in its own savepoint. Every OAIHARVESTER_COMMIT_BATCH_SIZE items, the
+    session is committed and the Elasticsearch documents of the batch are
+    sent in bulk. An item that fails only rolls back its own savepoint and
+    documents, the items processed before it are kept.
+    """
+    batch_size = current_app.config['OAIHARVESTER_COMMIT_BATCH_SIZE']
+    prefix = harvesting.metadata_prefix
+    if executor:
+        mapped_items = executor.map(
+            lambda r: _safe_map_item(r, prefix), records)
+    else:
+        mapped_items = (_safe_map_item(r, prefix) for r in records)
+    items = zip(records, mapped_items)
+    indexer = WekoDeposit.indexer
+    while True:
+        batch = list(islice(items, batch_size))
+        if not batch:
+            break
+        with indexer.buffered() as buffer:
+            for record, (mapped, error) in batch:
+                mark = len(buffer['actions'])
+                try:
+                    if error:
+                        raise error
+                    with db.session.begin_nested():
+                        process_item(record, harvesting, counter, mapped,
+                                     commit=False)
+                except Exception as ex:
+                    del buffer['actions'][mark:]
+                    current_app.logger.error(
+                        'Error occurred while processing harvesting item\n'
+                        + str(ex))
+                    event_counter('error_items', counter)
+            # Committed before the documents are sent on exit
+            db.session.commit()
+        if buffer['stats']['error']:
+            current_app.logger.error(
+                'Could not index {0} harvested items.'.format(
+                    buffer['stats']['error']))
+
+
+def _safe_map_item(record, metadata_prefix):
+    """Map a harvested record, returning the error instead of raising it."""
+    try:
+        return map_item(record, metadata_prefix), None
+    except Exception as ex:
+        return None, ex
+
+
 def is_harvest_running(id, task_id):
     """Check harvest running."""
     actives = inspect().active()
@@ -316,7 +398,8 @@ def run_harvesting(id, start_time, user_data):
         counter['deleted_items'] = 0
         counter['error_items'] = 0
         harvest_log = HarvestLogs(harvest_setting_id=id, status='Running',
-                                  start_time=datetime.utcnow(), counter=counter)
+                                  start_time=datetime.utcnow(),
+                                  counter=counter)
         db.session.add(harvest_log)
     else:
         harvest_log = \
@@ -340,32 +423,33 @@ def run_harvesting(id, start_time, user_data):
             nonlocal pause
             pause = True
         signal.signal(signal.SIGTERM, sigterm_handler)
-        while True:
-            records, rtoken = harvester_list_records(
-                harvesting.base_url,
-                harvesting.from_date.__str__() if harvesting.from_date else None,
-                harvesting.until_date.__str__() if harvesting.until_date else None,
-                harvesting.metadata_prefix,
-                harvesting.set_spec,
-                rtoken)
-            current_app.logger.info('[{0}] [{1}]'.format(
-                                    0, 'Processing records'))
-            for record in records:
-                try:
-                    process_item(record, harvesting, counter)
-                except Exception as ex:
-                    current_app.logger.error(
-                        'Error occurred while processing harvesting item\n' + str(ex))
-                    db.session.rollback()
-                    event_counter('error_items', counter)
-            harvesting.resumption_token = rtoken
-            db.session.commit()
-            if not rtoken:
-                harvest_log.status = 'Successful'
-                break
-            elif pause is True:
-                harvest_log.status = 'Suspended'
-                break
+        workers = current_app.config['OAIHARVESTER_MAP_WORKERS']
+        executor = ThreadPoolExecutor(max_workers=workers) \
+            if workers > 1 else None
+        pages = iter_list_records(
+            harvesting.base_url,
+            harvesting.from_date.__str__() if harvesting.from_date else None,
+            harvesting.until_date.__str__() if harvesting.until_date else None,
+            harvesting.metadata_prefix,
+            harvesting.set_spec,
+            rtoken)
+        try:
+            for records, rtoken in pages:
+                current_app.logger.info('[{0}] [{1}]'.format(
+                                        0, 'Processing records'))
+                process_items(records, harvesting, counter, executor)
+                harvesting.resumption_token = rtoken
+                db.session.commit()
+                if not rtoken:
+                    harvest_log.status = 'Successful'
+                    break
+                elif pause is True:
+                    harvest_log.status = 'Suspended'
+                    break
+        finally:
+            pages.close()
+            if executor:
+                executor.shutdown()
     except Exception as ex:
         harvest_log.status = 'Failed'
         current_app.logger.error(str(ex))
@@ -398,8 +482,10 @@ def check_schedules_and_run():
     now = datetime.utcnow()
     for h in settings:
         if h.schedule_enable is True:
-            if (h.schedule_frequency == 'daily') or \
-               (h.schedule_frequency == 'weekly' and h.schedule_details == now.weekday()) or \
-               (h.schedule_frequency == 'monthly' and h.schedule_details == now.day):
+            if h.schedule_frequency == 'daily' \
+                    or (h.schedule_frequency == 'weekly'
+                        and h.schedule_details == now.weekday()) \
+                    or (h.schedule_frequency == 'monthly'
+                        and h.schedule_details == now.day):
                 run_harvesting.delay(
                     h.id, now.strftime('%Y-%m-%dT%H:%M:%S%z'), {})
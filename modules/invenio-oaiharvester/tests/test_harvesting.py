@@ -212,3 +212,31 @@ def test_get_from_identifiers_with_prefix(app, sample_record_xml):
                 namespaces={"arXiv": "http://arxiv.org/OAI/arXiv/"}
             )[0].text
             assert identifier_in_request == "1507.03011"
+
+
+@responses.activate
+def test_iter_list_records(app):
+    """Test iterating over the pages of records list."""
+    from invenio_oaiharvester.harvester import iter_list_records
+
+    def callback(request):
+        if 'resumptionToken=token1' in request.url:
+            body = '<OAI-PMH><ListRecords><record/>' \
+                   '<resumptionToken/></ListRecords></OAI-PMH>'
+        else:
+            body = '<OAI-PMH><ListRecords><record/><record/>' \
+                   '<resumptionToken>token1</resumptionToken>' \
+                   '</ListRecords></OAI-PMH>'
+        return 200, {}, body
+
+    responses.add_callback(
+        responses.GET,
+        'http://export.arxiv.org/oai2',
+        callback=callback,
+        content_type='text/xml'
+    )
+    with app.app_context():
+        pages = list(iter_list_records('http://export.arxiv.org/oai2',
+                                       metadata_prefix='oai_dc'))
+        assert [(len(r), t) for r, t in pages] == [(2, 'token1'), (1, None)]
+        assert len(responses.calls) == 2
@@ -43,6 +43,15 @@ The legitimate values are ``YYYY-MM-DD`` and ``YYYY-MM-DDThh:mm:ssZ``
 with meanings as defined in ISO8601.
 """
 
+OAISERVER_SEARCH_AFTER = False
+"""Paginate with a ``search_after`` cursor kept in the resumption token.
+
+When enabled, the records are sorted by ``_updated`` and ``_id`` and the
+sort values of the last record are encoded in the resumption token instead
+of an Elasticsearch scroll id, so no search context is kept open between
+requests and a token can be used on any node.
+"""
+
 OAISERVER_RESUMPTION_TOKEN_EXPIRE_TIME = 1 * 60
 """The expiration time of a resumption token in seconds.
 
@@ -56,6 +65,15 @@ OAISERVER_RESUMPTION_TOKEN_EXPIRE_TIME = 1 * 60
     https://www.elastic.co/guide/en/elasticsearch/reference/current/search-request-scroll.html
 """
 
+OAISERVER_SEARCH_AFTER_TOKEN_EXPIRE_TIME = 24 * 60 * 60
+"""The expiration time of a ``search_after`` resumption token in seconds.
+
+Such a token keeps no search context open, so it can live much longer than
+a scroll token and a harvester can resume a list after a pause.
+
+**Default: 86400 seconds = 1 day**.
+"""
+
 OAISERVER_METADATA_FORMATS = {
     'oai_dc': {
         'serializer': (
@@ -207,3 +225,12 @@ OAISERVER_SYSTEM_FILE_MAPPING = {
 
 OAISERVER_FILE_PROPS_MAPPING = "file.URI.@value"
 """Config used to specify system file mapping of jpcoar"""
+
+OAISERVER_RECORD_XML_CACHE = False
+"""Cache the metadata XML of the records rendered for ListRecords."""
+
+OAISERVER_RECORD_XML_CACHE_KEY = 'oaiserver_record_xml_{key}'
+"""Cache key of the rendered metadata XML of a record revision and schema."""
+
+OAISERVER_RECORD_XML_CACHE_TTL = 60 * 60
+"""Cache timeout of the rendered metadata XML (1 hour)."""
@@ -70,33 +70,50 @@ def get_affected_records(spec=None, search_pattern=None):
         yield result.meta.id
 
 
+def _search_records(**kwargs):
+    """Build the search of the records matching the request arguments."""
+    search = OAIServerSearch(
+        index=current_app.config['INDEXER_DEFAULT_INDEX'],
+    ).extra(
+        version='true',
+    )
+
+    if 'set' in kwargs:
+        search = search.query('match', **{'_oai.sets': kwargs['set']})
+
+    time_range = {}
+    if 'from_' in kwargs:
+        time_range['gte'] = kwargs['from_']
+    if 'until' in kwargs:
+        time_range['lte'] = kwargs['until']
+    if time_range:
+        search = search.filter('range', **{'_updated': time_range})
+
+    return search
+
+
 def get_records(**kwargs):
     """Get records paginated."""
     page_ = kwargs.get('resumptionToken', {}).get('page', 1)
     size_ = current_app.config['OAISERVER_PAGE_SIZE']
     scroll = current_app.config['OAISERVER_RESUMPTION_TOKEN_EXPIRE_TIME']
     scroll_id = kwargs.get('resumptionToken', {}).get('scroll_id')
-
-    if scroll_id is None:
-        search = OAIServerSearch(
-            index=current_app.config['INDEXER_DEFAULT_INDEX'],
-        ).params(
+    search_after = kwargs.get('resumptionToken', {}).get('search_after')
+    use_search_after = current_app.config['OAISERVER_SEARCH_AFTER']
+
+    if use_search_after and scroll_id is None:
+        # Stateless cursor: the position is kept in the resumption token
+        search = _search_records(**kwargs).sort(
+            {'_updated': {'order': 'asc'}},
+            {'_id': {'order': 'asc'}},
+        )[0:size_]
+        if search_after:
+            search = search.extra(search_after=search_after)
+        response = search.execute().to_dict()
+    elif scroll_id is None:
+        search = _search_records(**kwargs).params(
             scroll='{0}s'.format(scroll),
-        ).extra(
-            version='true',
         )[(page_ - 1) * size_:page_ * size_]
-
-        if 'set' in kwargs:
-            search = search.query('match', **{'_oai.sets': kwargs['set']})
-
-        time_range = {}
-        if 'from_' in kwargs:
-            time_range['gte'] = kwargs['from_']
-        if 'until' in kwargs:
-            time_range['lte'] = kwargs['until']
-        if time_range:
-            search = search.filter('range', **{'_updated': time_range})
-
         response = search.execute().to_dict()
     else:
         response = current_search_client.scroll(
@@ -115,9 +132,15 @@ def get_records(**kwargs):
             self.response = response
             self.total = response['hits']['total']
             self._scroll_id = response.get('_scroll_id')
+            self._search_after = None
+
+            hits = response['hits']['hits']
+            if use_search_after and self._scroll_id is None \
+                    and self.has_next and hits:
+                self._search_after = hits[-1]['sort']
 
             # clean descriptor on last page
-            if not self.has_next:
+            if self._scroll_id and not self.has_next:
                 current_search_client.clear_scroll(
                     scroll_id=self._scroll_id
                 )
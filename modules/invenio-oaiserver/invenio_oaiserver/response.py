@@ -10,7 +10,7 @@
 import copy
 from datetime import MINYEAR, datetime, timedelta
 
-from flask import current_app, request, url_for
+from flask import current_app, g, request, url_for
 from invenio_db import db
 from invenio_records.models import RecordMetadata
 from lxml import etree
@@ -181,11 +181,13 @@ def resumption_token(parent, pagination, **kwargs):
     e_resumptionToken = SubElement(parent, etree.QName(NS_OAIPMH,
                                                        'resumptionToken'))
     if pagination.total:
-        expiration_date = datetime.utcnow() + timedelta(
-            seconds=current_app.config[
-                'OAISERVER_RESUMPTION_TOKEN_EXPIRE_TIME'
-            ]
-        )
+        if getattr(pagination, '_search_after', None):
+            expire_time = current_app.config[
+                'OAISERVER_SEARCH_AFTER_TOKEN_EXPIRE_TIME']
+        else:
+            expire_time = current_app.config[
+                'OAISERVER_RESUMPTION_TOKEN_EXPIRE_TIME']
+        expiration_date = datetime.utcnow() + timedelta(seconds=expire_time)
         e_resumptionToken.set('expirationDate', datetime_to_datestamp(
             expiration_date
         ))
@@ -370,7 +372,8 @@ def listrecords(**kwargs):
             sets=record['json']['_source'].get('_oai', {}).get('sets', []),
         )
         e_metadata = SubElement(e_record, etree.QName(NS_OAIPMH, 'metadata'))
-        e_metadata.append(record_dumper(pid, record['json']))
+        e_metadata.append(dump_record_xml(record_dumper, pid, record['json'],
+                                          kwargs['metadataPrefix']))
 
     resumption_token(e_listrecords, result, **kwargs)
     return e_tree
@@ -410,18 +413,82 @@ def create_identifier_index(root, **kwargs):
     return root
 
 
+def get_schema_version(metadata_prefix):
+    """Get the version of the OAI schema of a metadata prefix.
+
+    The version is read once per request.
+
+    :param metadata_prefix: Metadata prefix.
+    :return: The schema id and version, or None if there is no schema.
+    """
+    from weko_schema_ui.models import OAIServerSchema
+
+    versions = g.setdefault('oaiserver_schema_versions', {})
+    if metadata_prefix not in versions:
+        schema = db.session.query(
+            OAIServerSchema.id, OAIServerSchema.version_id).filter_by(
+            schema_name=metadata_prefix + '_mapping').one_or_none()
+        versions[metadata_prefix] = '{0}.{1}'.format(*schema) \
+            if schema else None
+    return versions[metadata_prefix]
+
+
+def dump_record_xml(record_dumper, pid, hit, metadata_prefix):
+    """Dump the metadata XML of a search hit.
+
+    When OAISERVER_RECORD_XML_CACHE is enabled, the XML is cached per
+    document version, item type mapping version and OAI schema version, so
+    that an edit of the schema in weko-schema-ui invalidates it.
+    """
+    if not current_app.config['OAISERVER_RECORD_XML_CACHE'] \
+            or hit.get('_version') is None:
+        return record_dumper(pid, hit)
+
+    from invenio_cache import current_cache
+    from weko_records.cache import get_cached_mapping
+
+    mapping_version = None
+    item_type_id = hit['_source'].get('_item_metadata', {}).get(
+        'item_type_id')
+    if item_type_id:
+        mapping = get_cached_mapping(item_type_id)
+        if mapping:
+            mapping_version = '{0}.{1}'.format(mapping.id, mapping.version_id)
+    cache_key = current_app.config['OAISERVER_RECORD_XML_CACHE_KEY'].format(
+        key='{0}:{1}:{2}:{3}:{4}:{5}'.format(
+            metadata_prefix, request.host, hit['_id'], hit['_version'],
+            mapping_version, get_schema_version(metadata_prefix)))
+    xml = current_cache.get(cache_key)
+    if xml:
+        return etree.fromstring(xml)
+    root = record_dumper(pid, hit)
+    current_cache.set(cache_key, etree.tostring(root),
+                      timeout=current_app.config[
+                          'OAISERVER_RECORD_XML_CACHE_TTL'])
+    return root
+
+
+def get_item_jpcoar_mapping(object_uuid):
+    """Get the jpcoar mapping of the item type of an item.
+
+    The mapping is computed once per item type mapping version.
+    """
+    from weko_records.cache import get_cached_item_map
+    from weko_records.models import ItemMetadata
+
+    item_type_id = db.session.query(ItemMetadata.item_type_id).filter_by(
+        id=object_uuid).scalar()
+    if not item_type_id:
+        return {}
+    return get_cached_item_map(item_type_id, 'jpcoar_mapping')
+
+
 def check_correct_system_props_mapping(object_uuid, system_mapping_config):
     """Validate and return if selection mapping is correct.
 
     Correct mapping mean item map have the 2 field same with config
     """
-    from weko_records.api import ItemsMetadata, Mapping
-    from weko_records.serializers.utils import get_mapping
-
-    item_type = ItemsMetadata.get_by_object_id(object_uuid)
-    item_type_id = item_type.item_type_id
-    type_mapping = Mapping.get_record(item_type_id)
-    item_map = get_mapping(type_mapping, "jpcoar_mapping")
+    item_map = get_item_jpcoar_mapping(object_uuid)
 
     if system_mapping_config:
         for key in system_mapping_config:
@@ -438,13 +505,7 @@ def combine_record_file_urls(record, object_uuid):
 
     Get file property information by item_mapping and put to metadata.
     """
-    from weko_records.api import ItemsMetadata, Mapping
-    from weko_records.serializers.utils import get_mapping
-
-    item_type = ItemsMetadata.get_by_object_id(object_uuid)
-    item_type_id = item_type.item_type_id
-    type_mapping = Mapping.get_record(item_type_id)
-    item_map = get_mapping(type_mapping, "jpcoar_mapping")
+    item_map = get_item_jpcoar_mapping(object_uuid)
 
     file_keys = item_map.get(current_app.config[
         "OAISERVER_FILE_PROPS_MAPPING"])
@@ -36,6 +36,9 @@ def serialize(pagination, **kwargs):
     scroll_id = getattr(pagination, '_scroll_id', None)
     if scroll_id:
         data['scroll_id'] = scroll_id
+    search_after = getattr(pagination, '_search_after', None)
+    if search_after:
+        data['search_after'] = search_after
 
     return token_builder.dumps(data)
 
@@ -49,8 +52,14 @@ class ResumptionToken(fields.Field):
             current_app.config['SECRET_KEY'],
             salt=data['verb'],
         )
-        result = token_builder.loads(value, max_age=current_app.config[
-            'OAISERVER_RESUMPTION_TOKEN_EXPIRE_TIME'])
+        config = current_app.config
+        result = token_builder.loads(value, max_age=max(
+            config['OAISERVER_RESUMPTION_TOKEN_EXPIRE_TIME'],
+            config['OAISERVER_SEARCH_AFTER_TOKEN_EXPIRE_TIME']))
+        if 'search_after' not in result:
+            # The scroll of the token expires with its search context
+            result = token_builder.loads(value, max_age=config[
+                'OAISERVER_RESUMPTION_TOKEN_EXPIRE_TIME'])
         result['token'] = value
         result['kwargs'] = self.root.load(result['kwargs'], partial=True).data
         return result
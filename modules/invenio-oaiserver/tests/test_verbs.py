@@ -524,6 +524,61 @@ def test_listrecords(app):
                            namespaces=NAMESPACES)) == 10
 
 
+def test_listrecords_search_after(app):
+    """Test ListRecords paginated with a search_after cursor."""
+    total = 12
+    record_ids = []
+    app.config['OAISERVER_SEARCH_AFTER'] = True
+
+    with app.test_request_context():
+        indexer = RecordIndexer()
+
+        with db.session.begin_nested():
+            for idx in range(total):
+                record_id = uuid.uuid4()
+                data = {'title_statement': {'title': 'Test{0}'.format(idx)}}
+                recid_minter(record_id, data)
+                oaiid_minter(record_id, data)
+                Record.create(data, id_=record_id)
+                record_ids.append(record_id)
+
+        db.session.commit()
+
+        for record_id in record_ids:
+            indexer.index_by_id(record_id)
+
+        current_search.flush_and_refresh('_all')
+
+        identifiers = set()
+        with app.test_client() as c:
+            result = c.get('/oai2d?verb=ListRecords&metadataPrefix=oai_dc')
+            tree = etree.fromstring(result.data)
+            identifiers.update(tree.xpath(
+                '/x:OAI-PMH/x:ListRecords/x:record/x:header/x:identifier'
+                '/text()', namespaces=NAMESPACES))
+            resumption_token = tree.xpath(
+                '/x:OAI-PMH/x:ListRecords/x:resumptionToken',
+                namespaces=NAMESPACES)[0]
+            assert resumption_token.text
+            assert len(identifiers) == 10
+
+            # A search_after token outlives the scroll expiration time
+            app.config['OAISERVER_RESUMPTION_TOKEN_EXPIRE_TIME'] = -1
+            result = c.get(
+                '/oai2d?verb=ListRecords&resumptionToken={0}'.format(
+                    resumption_token.text))
+            assert result.status_code == 200
+            tree = etree.fromstring(result.data)
+            identifiers.update(tree.xpath(
+                '/x:OAI-PMH/x:ListRecords/x:record/x:header/x:identifier'
+                '/text()', namespaces=NAMESPACES))
+            resumption_token = tree.xpath(
+                '/x:OAI-PMH/x:ListRecords/x:resumptionToken',
+                namespaces=NAMESPACES)[0]
+            assert not resumption_token.text
+            assert len(identifiers) == total
+
+
 def test_listidentifiers(app):
     """Test verb ListIdentifiers."""
     from invenio_oaiserver.models import OAISet
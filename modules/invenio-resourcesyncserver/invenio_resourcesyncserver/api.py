@@ -30,6 +30,7 @@ import traceback
 from datetime import timedelta
 
 from flask import current_app, request, send_file
+from invenio_cache import current_cache
 from invenio_db import db
 from invenio_pidrelations.contrib.versioning import PIDVersioning
 from invenio_pidstore.models import PersistentIdentifier
@@ -40,7 +41,6 @@ from resync.change_list import ChangeList
 from resync.list_base_with_index import ListBaseWithIndex
 from resync.resource_dump import ResourceDump
 from resync.resource_dump_manifest import ResourceDumpManifest
-from resync.w3c_datetime import str_to_datetime
 from sqlalchemy.exc import SQLAlchemyError
 from weko_deposit.api import ItemTypes, WekoRecord
 from weko_index_tree.api import Indexes
@@ -50,7 +50,7 @@ from weko_records_ui.permissions import check_file_download_permission
 
 from .config import INVENIO_CAPABILITY_URL, VALIDATE_MESSAGE, WEKO_ROOT_INDEX
 from .models import ChangeListIndexes, ResourceListIndexes
-from .query import get_items_by_index_tree
+from .query import get_items_stamp_by_index_tree, iter_items_by_index_tree
 
 
 class ResourceListHandler(object):
@@ -333,29 +333,53 @@ class ResourceListHandler(object):
                     return True
         return False
 
-    def get_resource_list_xml(self, from_date=None, to_date=None):
-        """
-        Get content of resource list.
-
-        :return: (xml) resource list content
-        """
-        if not self._validation():
+    @staticmethod
+    def _es_date(date):
+        """Convert a date argument to a date usable in an ES range."""
+        from .utils import parse_date
+        if not date:
             return None
-        r = get_items_by_index_tree(self.repository_id)
+        parsed = parse_date(date)
+        return parsed.isoformat() if parsed else None
 
-        rl = ResourceList()
-        rl.up = INVENIO_CAPABILITY_URL.format(request.url_root)
+    def _get_cached_list(self, part, from_date, to_date, stamp, render):
+        """Get generated resource (sub)list data, rendering it on a miss.
 
-        for item in r:
+        The cache key contains the number of items and their last update,
+        so any record change yields a new key.
+        """
+        cache_key = current_app.config[
+            'INVENIO_RESOURCESYNCSERVER_SUBLIST_CACHE_KEY'].format(
+            index_id=self.repository_id, part=part, from_date=from_date,
+            to_date=to_date, stamp='{}_{}'.format(*stamp))
+        xml = current_cache.get(cache_key)
+        if xml is None:
+            xml = render()
+            current_cache.set(
+                cache_key, xml,
+                timeout=current_app.config[
+                    'INVENIO_RESOURCESYNCSERVER_SUBLIST_CACHE_TTL'])
+        return xml
+
+    def _get_sublist_boundaries(self, from_date, to_date, stamp):
+        """Get the search_after values starting each resource sublist."""
+        def _scan():
+            size = current_app.config[
+                'INVENIO_RESOURCESYNCSERVER_SUBLIST_SIZE']
+            boundaries = [None]
+            for count, item in enumerate(iter_items_by_index_tree(
+                    self.repository_id, from_date, to_date), 1):
+                if count % size == 0:
+                    boundaries.append(item.get('sort'))
+            return boundaries
+        return self._get_cached_list(
+            'boundaries', from_date, to_date, stamp, _scan)
+
+    def _add_item_resources(self, rl, items):
+        """Add the resource of every item to a resource list."""
+        for item in items:
             if item:
-                resource_date = str_to_datetime(item.get('_source').get(
-                    '_updated'))
-                if from_date and str_to_datetime(from_date) > resource_date:
-                    continue
-                if to_date and str_to_datetime(to_date) < resource_date:
-                    continue
                 id_item = item.get('_source').get('control_number')
-                # url = '{}records/{}'.format(request.url_root, str(id_item))
                 url = '{}resync/{}/records/{}'.format(
                     request.url_root,
                     str(self.repository_id),
@@ -363,7 +387,79 @@ class ResourceListHandler(object):
                 )
                 rl.add(Resource(url, lastmod=item.get('_source').get(
                     '_updated')))
-        return rl.as_xml()
+
+    def get_resource_list_xml(self, from_date=None, to_date=None):
+        """
+        Get content of resource list.
+
+        A resource list index pointing to sublists of
+        INVENIO_RESOURCESYNCSERVER_SUBLIST_SIZE resources is returned
+        when the index holds more items.
+
+        :return: (xml) resource list content
+        """
+        if not self._validation():
+            return None
+        from_date = self._es_date(from_date)
+        to_date = self._es_date(to_date)
+        stamp = get_items_stamp_by_index_tree(
+            self.repository_id, from_date, to_date)
+        size = current_app.config['INVENIO_RESOURCESYNCSERVER_SUBLIST_SIZE']
+        if stamp[0] > size:
+            def _render_index():
+                rli = ListBaseWithIndex(capability_name='resourcelist')
+                rli.sitemapindex = True
+                rli.up = INVENIO_CAPABILITY_URL.format(request.url_root)
+                for part in range(1, -(-stamp[0] // size) + 1):
+                    rli.add(Resource(
+                        '{}resync/{}/resourcelist-{}.xml'.format(
+                            request.url_root, self.repository_id, part),
+                        capability='resourcelist'))
+                return rli.as_xml()
+            return self._get_cached_list(
+                'index', from_date, to_date, stamp, _render_index)
+
+        def _render():
+            rl = ResourceList()
+            rl.up = INVENIO_CAPABILITY_URL.format(request.url_root)
+            self._add_item_resources(rl, iter_items_by_index_tree(
+                self.repository_id, from_date, to_date))
+            return rl.as_xml()
+        return self._get_cached_list(
+            0, from_date, to_date, stamp, _render)
+
+    def get_resource_sublist_xml(self, part, from_date=None, to_date=None):
+        """
+        Get content of a resource sublist of the resource list index.
+
+        :param part: Sublist number, starting from 1.
+        :return: (xml) resource list content
+        """
+        if not self._validation():
+            return None
+        from_date = self._es_date(from_date)
+        to_date = self._es_date(to_date)
+        stamp = get_items_stamp_by_index_tree(
+            self.repository_id, from_date, to_date)
+        size = current_app.config['INVENIO_RESOURCESYNCSERVER_SUBLIST_SIZE']
+        if part < 1 or (part - 1) * size >= stamp[0]:
+            return None
+
+        def _render():
+            boundaries = self._get_sublist_boundaries(
+                from_date, to_date, stamp)
+            if part > len(boundaries):
+                return None
+            rl = ResourceList()
+            rl.up = INVENIO_CAPABILITY_URL.format(request.url_root)
+            rl.index = '{}resync/{}/resourcelist.xml'.format(
+                request.url_root, self.repository_id)
+            self._add_item_resources(rl, iter_items_by_index_tree(
+                self.repository_id, from_date, to_date,
+                search_after=boundaries[part - 1], limit=size))
+            return rl.as_xml()
+        return self._get_cached_list(
+            part, from_date, to_date, stamp, _render)
 
     def get_resource_dump_xml(self, from_date=None, to_date=None):
         """
@@ -374,23 +470,12 @@ class ResourceListHandler(object):
         if not self._validation():
             return None
 
-        from .utils import parse_date
-        if from_date:
-            from_date = parse_date(from_date)
-        if to_date:
-            to_date = parse_date(to_date)
-
-        r = get_items_by_index_tree(self.repository_id)
         rd = ResourceDump()
         rd.up = INVENIO_CAPABILITY_URL.format(request.url_root)
-        for item in r:
+        for item in iter_items_by_index_tree(self.repository_id,
+                                             self._es_date(from_date),
+                                             self._es_date(to_date)):
             if item:
-                resource_date = parse_date(item.get('_source').get(
-                    '_updated'))
-                if from_date and from_date > resource_date:
-                    continue
-                if to_date and to_date < resource_date:
-                    continue
                 id_item = item.get('_source').get('control_number')
                 url = '{}resync/{}/{}/file_content.zip'.format(
                     request.url_root,
@@ -848,10 +933,14 @@ class ChangeListHandler(object):
         )
 
         record_changes = self._get_record_changes_with_interval(from_date)
+        changes_by_version = {
+            (change.get('record_id'), change.get('record_version')): change
+            for change in record_changes
+        }
 
         for data in record_changes:
             try:
-                next_ch = self._next_change(data, record_changes)
+                next_ch = self._next_change(data, changes_by_version)
                 if data.get('status') == 'deleted':
                     continue
                 loc = '{}resync/{}/{}/change_dump_content.zip'.format(
@@ -1263,19 +1352,14 @@ class ChangeListHandler(object):
 
     def _next_change(self, data, changes):
         """
-        Get change list xml.
+        Get the change of the next version of a record.
 
-        :param data     :
-        :param changes  :
-        :return: Updated Change List info
+        :param data     : change of a record version.
+        :param changes  : changes keyed by (record id, record version).
+        :return: The next change or None.
         """
-        for change in changes:
-            if data.get('record_id') == change.get('record_id') and \
-                data.get('record_version') + 1 == \
-                    change.get('record_version'):
-                return change
-
-        return None
+        return changes.get(
+            (data.get('record_id'), data.get('record_version') + 1))
 
     def _get_record_changes_with_interval(self, from_date):
         """
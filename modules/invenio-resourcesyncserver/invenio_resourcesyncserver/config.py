@@ -26,6 +26,19 @@ INVENIO_RESOURCESYNC_CHANGE_LIST_ADMIN = \
     'invenio_resourcesyncserver/change_list.html'
 """Admin template for the demo page."""
 
+INVENIO_RESOURCESYNCSERVER_SEARCH_PAGE_SIZE = 1000
+"""Number of items fetched per search_after request."""
+
+INVENIO_RESOURCESYNCSERVER_SUBLIST_SIZE = 50000
+"""Maximum number of resources in a resource list before it is split."""
+
+INVENIO_RESOURCESYNCSERVER_SUBLIST_CACHE_KEY = \
+    'resync_resourcelist_{index_id}_{part}_{from_date}_{to_date}_{stamp}'
+"""Cache key of a generated resource (sub)list."""
+
+INVENIO_RESOURCESYNCSERVER_SUBLIST_CACHE_TTL = 24 * 60 * 60
+"""Cache timeout of a generated resource (sub)list."""
+
 INVENIO_CAPABILITY_URL = "{}resync/capability.xml"
 """Temp for capability url."""
 
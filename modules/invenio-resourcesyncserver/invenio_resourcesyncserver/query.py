@@ -45,6 +45,73 @@ def get_items_by_index_tree(index_tree_id):
     return search_result.get('hits').get('hits')
 
 
+def get_items_search_by_index_tree(index_tree_id, from_date=None,
+                                   to_date=None):
+    """Get the search of the items of an index tree.
+
+    The items are sorted by update date and id so that they can be paged
+    with search_after.
+    """
+    records_search = RecordsSearch()
+    records_search = records_search.with_preference_param().params(
+        version=False)
+    records_search._index[0] = current_app.config['SEARCH_UI_SEARCH_INDEX']
+    search_instance = item_path_search_factory(
+        search=records_search,
+        index_id=index_tree_id,
+        from_date=from_date,
+        to_date=to_date
+    )
+    return search_instance.sort(
+        {'_updated': {'order': 'asc'}},
+        {'_id': {'order': 'asc'}}
+    ).source(['_updated', 'control_number'])
+
+
+def get_items_stamp_by_index_tree(index_tree_id, from_date=None,
+                                  to_date=None):
+    """Get the number of items of an index tree and their last update."""
+    search_instance = get_items_search_by_index_tree(
+        index_tree_id, from_date, to_date).sort(
+        {'_updated': {'order': 'desc'}}).extra(size=1)
+    search_result = search_instance.execute().to_dict()
+    hits = search_result.get('hits')
+    last_updated = None
+    if hits.get('hits'):
+        last_updated = hits['hits'][0]['_source'].get('_updated')
+    return hits.get('total'), last_updated
+
+
+def iter_items_by_index_tree(index_tree_id, from_date=None, to_date=None,
+                             search_after=None, limit=None):
+    """Stream the items of an index tree with search_after.
+
+    :param index_tree_id: Index identifier.
+    :param from_date: Only items updated from this date.
+    :param to_date: Only items updated until this date.
+    :param search_after: Sort values of the item preceding the first one.
+    :param limit: Maximum number of items.
+    :returns: Generator of search hits.
+    """
+    page_size = current_app.config[
+        'INVENIO_RESOURCESYNCSERVER_SEARCH_PAGE_SIZE']
+    search_instance = get_items_search_by_index_tree(
+        index_tree_id, from_date, to_date)
+    count = 0
+    while limit is None or count < limit:
+        size = page_size if limit is None else min(page_size, limit - count)
+        page = search_instance.extra(size=size)
+        if search_after:
+            page = page.extra(search_after=search_after)
+        hits = page.execute().to_dict().get('hits').get('hits')
+        for hit in hits:
+            yield hit
+        count += len(hits)
+        if len(hits) < size:
+            break
+        search_after = hits[-1]['sort']
+
+
 def get_item_changes_by_index(index_tree_id, date_from, date_until):
     """Get tree items."""
     records_search = RecordsSearch()
@@ -62,11 +129,14 @@ def get_item_changes_by_index(index_tree_id, date_from, date_until):
     return search_result.get('hits').get('hits')
 
 
-def item_path_search_factory(search, index_id="0"):
+def item_path_search_factory(search, index_id="0", from_date=None,
+                             to_date=None):
     """Parse query using Weko-Query-Parser.
 
     :param search: Elastic search DSL search instance.
     :param index_id: Index Identifier contains item's path
+    :param from_date: Only items updated from this date.
+    :param to_date: Only items updated until this date.
     :returns: Tuple with search instance and URL arguments.
     """
     def _get_index_search_query():
@@ -166,6 +236,17 @@ def item_path_search_factory(search, index_id="0"):
                         }
                     }
                 ]
+        updated_range = {}
+        if from_date:
+            updated_range['gte'] = from_date
+        if to_date:
+            updated_range['lte'] = to_date
+        if updated_range:
+            query_q['post_filter']['bool']['must'].append({
+                "range": {
+                    "_updated": updated_range
+                }
+            })
         return query_q
 
     # create a index search query
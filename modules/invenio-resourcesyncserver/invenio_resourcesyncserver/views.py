@@ -40,6 +40,20 @@ def resource_list(index_id):
         mimetype='application/xml')
 
 
+@blueprint.route("/resync/<index_id>/resourcelist-<int:part>.xml")
+def resource_sublist(index_id, part):
+    """Render a sublist of the resource list index."""
+    resource = ResourceListHandler.get_resource_by_repository_id(index_id)
+    if not resource or not resource.status:
+        abort(404)
+    output_xml = resource.get_resource_sublist_xml(part)
+    if not output_xml:
+        abort(404)
+    return Response(
+        output_xml,
+        mimetype='application/xml')
+
+
 @blueprint.route("/resync/<index_id>/resourcedump.xml")
 def resource_dump(index_id):
     """Render resource dump."""
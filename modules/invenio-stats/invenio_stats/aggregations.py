@@ -129,6 +129,9 @@ class StatAggregator(object):
         self.batch_size = batch_size
         self.event_index = '{0}-events-stats-{1}'.format(
             self.search_index_prefix, self.event)
+        self.last_index_written = None
+        self.aggregated_events = 0
+        self.indices = set()
 
     @property
     def bookmark_doc_type(self):
@@ -211,11 +214,16 @@ class StatAggregator(object):
             d, self.dt_rounding_map[self.aggregation_interval])
 
     def agg_iter(self, lower_limit=None, upper_limit=None):
-        """Aggregate and return dictionary to be indexed in ES."""
+        """Aggregate and return dictionary to be indexed in ES.
+
+        The (interval, term) buckets are paged with a composite aggregation
+        of ``STATS_AGGREGATION_PAGE_SIZE`` buckets per request, instead of
+        returning every bucket of the range in a single response.
+        """
         lower_limit = lower_limit or self.get_bookmark().isoformat()
         upper_limit = upper_limit or (
             datetime.datetime.utcnow().replace(microsecond=0).isoformat())
-        aggregation_data = {}
+        page_size = current_app.config['STATS_AGGREGATION_PAGE_SIZE']
 
         self.agg_query = Search(using=self.client,
                                 index=self.event_index).\
@@ -227,39 +235,49 @@ class StatAggregator(object):
         for modifier in self.query_modifiers:
             self.agg_query = modifier(self.agg_query)
 
-        hist = self.agg_query.aggs.bucket(
-            'histogram',
-            'date_histogram',
-            field='timestamp',
-            interval=self.aggregation_interval
-        )
-        terms = hist.bucket(
-            'terms', 'terms', field=self.aggregation_field,
-            size=current_app.config['STATS_ES_INTEGER_MAX_VALUE']
-        )
-        # FIXME: Paginate?
-        top = terms.metric(
-            'top_hit', 'top_hits', size=1, sort={'timestamp': 'desc'}
-        )
+        sub_aggs = {
+            'top_hit': {
+                'top_hits': {'size': 1, 'sort': {'timestamp': 'desc'}}
+            }
+        }
         for dst, (metric, src, opts) in self.metric_aggregation_fields.items():
-            terms.metric(dst, metric, field=src, **opts)
+            sub_aggs[dst] = {metric: dict(field=src, **opts)}
 
-        results = self.agg_query.execute()
         index_name = None
         bookmark_name = None
-        for interval in results.aggregations['histogram'].buckets:
-            interval_date = datetime.datetime.strptime(
-                interval['key_as_string'], '%Y-%m-%dT%H:%M:%S')
-            for aggregation in interval['terms'].buckets:
+        after = None
+        while True:
+            composite = {
+                'size': page_size,
+                'sources': [
+                    {'timestamp': {'date_histogram': {
+                        'field': 'timestamp',
+                        'interval': self.aggregation_interval}}},
+                    {'term': {'terms': {'field': self.aggregation_field}}},
+                ]
+            }
+            if after:
+                composite['after'] = after
+            query = self.agg_query[0:0].extra(aggs={'composite': {
+                'composite': composite, 'aggs': sub_aggs}})
+            buckets = query.execute().to_dict()[
+                'aggregations']['composite']['buckets']
+
+            for aggregation in buckets:
+                interval_date = datetime.datetime.utcfromtimestamp(
+                    aggregation['key']['timestamp'] / 1000)
+                key = aggregation['key']['term']
+                aggregation_data = {}
                 aggregation_data['timestamp'] = interval_date.isoformat()
-                aggregation_data[self.aggregation_field] = aggregation['key']
+                aggregation_data[self.aggregation_field] = key
                 aggregation_data['count'] = aggregation['doc_count']
+                self.aggregated_events += aggregation['doc_count']
 
                 if self.metric_aggregation_fields:
                     for f in self.metric_aggregation_fields:
                         aggregation_data[f] = aggregation[f]['value']
 
-                doc = aggregation.top_hit.hits.hits[0]['_source']
+                doc = aggregation['top_hit']['hits']['hits'][0]['_source']
                 for destination, source in self.copy_fields.items():
                     if isinstance(source, six.string_types):
                         aggregation_data[destination] = doc[source]
@@ -279,24 +297,34 @@ class StatAggregator(object):
                                            self.index_name_suffix))
                 self.indices.add(index_name)
                 yield dict(_id='{0}-{1}'.
-                           format(aggregation['key'],
+                           format(key,
                                   interval_date.strftime(
                                       self.doc_id_suffix)),
                            _index=index_name,
                            _type=self.aggregation_doc_type,
                            _source=aggregation_data)
-        self.last_index_written = bookmark_name
+
+            if len(buckets) < page_size:
+                break
+            after = buckets[-1]['key']
+        if bookmark_name:
+            self.last_index_written = bookmark_name
 
     def run(self, start_date=None, end_date=None, update_bookmark=True):
-        """Calculate statistics aggregations."""
+        """Calculate statistics aggregations.
+
+        :return: Number of aggregated events and of written documents.
+        """
+        self.aggregated_events = 0
+        written = 0
         # If no events have been indexed there is nothing to aggregate
         if not Index(self.event_index, using=self.client).exists():
-            return
+            return self.aggregated_events, written
 
         lower_limit = start_date or self.get_bookmark()
         # Stop here if no bookmark could be estimated.
         if lower_limit is None:
-            return
+            return self.aggregated_events, written
         upper_limit = min(
             end_date or datetime.datetime.max,  # ignore if `None`
             datetime.datetime.utcnow().replace(microsecond=0),
@@ -304,18 +332,18 @@ class StatAggregator(object):
                 lower_limit + datetime.timedelta(self.batch_size),
                 datetime.datetime.min.time())
         )
+        modified_indices = set()
         while upper_limit <= datetime.datetime.utcnow():
             self.indices = set()
             self.new_bookmark = upper_limit.strftime(self.doc_id_suffix)
-            bulk(self.client,
-                 self.agg_iter(lower_limit, upper_limit),
-                 stats_only=True,
-                 chunk_size=50)
-            # Flush all indices which have been modified
-            current_search_client.indices.flush(
-                index=','.join(self.indices),
-                wait_if_ongoing=True
-            )
+            success, _ = bulk(
+                self.client,
+                self.agg_iter(lower_limit, upper_limit),
+                stats_only=True,
+                chunk_size=current_app.config[
+                    'STATS_AGGREGATION_BULK_CHUNK_SIZE'])
+            written += success
+            modified_indices |= self.indices
             if update_bookmark:
                 self.set_bookmark()
             self.indices = set()
@@ -327,6 +355,11 @@ class StatAggregator(object):
             )
             if lower_limit > upper_limit:
                 break
+        # Make the written aggregations searchable once, instead of flushing
+        # the indices after every batch.
+        if modified_indices:
+            self.client.indices.refresh(index=','.join(modified_indices))
+        return self.aggregated_events, written
 
     def list_bookmarks(self, start_date=None, end_date=None, limit=None):
         """List the aggregation's bookmarks."""
@@ -10,13 +10,18 @@
 
 from __future__ import absolute_import, print_function
 
+import datetime
+import random
+import time
 from functools import wraps
 
 import click
 from dateutil.parser import parse as dateutil_parse
+from elasticsearch.serializer import JSONSerializer
 from flask.cli import with_appcontext
 from werkzeug.local import LocalProxy
 
+from .processors import EventsIndexer
 from .proxies import current_stats
 from .tasks import aggregate_events, process_events
 
@@ -160,3 +165,126 @@ def _aggregations_list_bookmarks(aggregation_types=None,
         click.echo('{}:'.format(a))
         for b in bookmarks:
             click.echo(' - {}'.format(b.date))
+
+
+@aggregations.command('benchmark')
+@aggr_arg
+@click.option('--start-date', callback=_verify_date)
+@click.option('--end-date', callback=_verify_date)
+@with_appcontext
+def _aggregations_benchmark(aggregation_types=None,
+                            start_date=None, end_date=None):
+    """Run stats aggregations and report the aggregated events per second.
+
+    Bookmarks are not updated, so the benchmark can be repeated over the
+    same date range.
+    """
+    aggregation_types = (aggregation_types
+                         or list(current_stats.enabled_aggregations))
+    start = time.time()
+    results = aggregate_events(aggregation_types, start_date=start_date,
+                               end_date=end_date, update_bookmark=False)
+    elapsed = max(time.time() - start, 1e-6)
+    total_events = total_docs = 0
+    for a, (aggregated, written) in zip(aggregation_types, results):
+        total_events += aggregated
+        total_docs += written
+        click.echo('{}: {} events -> {} documents'.format(
+            a, aggregated, written))
+    click.secho('Aggregated {} events into {} documents in {:.2f}s '
+                '({:.0f} events/sec).'.format(
+                    total_events, total_docs, elapsed,
+                    total_events / elapsed), fg='green')
+
+
+class _BenchmarkQueue(object):
+    """Queue stand-in returning synthetic top-view events."""
+
+    routing_key = 'stats-top-view'
+
+    def __init__(self, count, seed=0):
+        """Initialize the queue.
+
+        :param count: number of events.
+        :param seed: random seed.
+        """
+        self.count = count
+        self.seed = seed
+
+    def consume(self):
+        """Generate the events."""
+        rand = random.Random(self.seed)
+        start = datetime.datetime.utcnow() - datetime.timedelta(days=3)
+        agents = ['Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/{}.0',
+                  'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15) Safari/{}',
+                  'Mozilla/5.0 (X11; Linux x86_64) Firefox/{}.0']
+        for i in range(self.count):
+            ip = '10.{}.{}.{}'.format(rand.randint(0, 15),
+                                      rand.randint(0, 255),
+                                      rand.randint(1, 254))
+            user_id = str(rand.randint(1, 1000)) if rand.random() < 0.2 \
+                else None
+            yield dict(
+                timestamp=(start + datetime.timedelta(
+                    seconds=i * 259200 // max(self.count, 1))).isoformat(),
+                referrer=None,
+                remote_addr=ip,
+                site_license_flag=False,
+                site_license_name='',
+                ip_address=ip,
+                user_agent=rand.choice(agents).format(rand.randint(60, 99)),
+                user_id=user_id,
+                session_id=None if user_id else str(rand.randint(1, 50000)),
+            )
+
+
+class _BenchmarkClient(object):
+    """Elasticsearch stand-in accepting bulk requests without indexing."""
+
+    class _Transport(object):
+        """Transport stand-in, the bulk helpers use its serializer."""
+
+        serializer = JSONSerializer()
+
+    transport = _Transport()
+
+    def bulk(self, body, *args, **kwargs):
+        """Acknowledge every action of a bulk request."""
+        if isinstance(body, bytes):
+            body = body.decode('utf-8')
+        actions = sum(1 for line in body.splitlines()
+                      if line.startswith('{"index"'))
+        return dict(took=0, errors=False,
+                    items=[{'index': {'status': 201}}
+                           for _ in range(actions)])
+
+
+@events.command('benchmark')
+@click.option('--events', 'count', default=100000,
+              help='Number of synthetic events.')
+@click.option('--chunk-size', type=int, help='Events per bulk request.')
+@click.option('--workers', type=int, help='Parallel bulk requests.')
+@click.option('--live', is_flag=True,
+              help='Index into Elasticsearch instead of a stand-in.')
+@with_appcontext
+def _events_benchmark(count, chunk_size=None, workers=None, live=False):
+    """Process synthetic top-view events and report the events per second.
+
+    By default the bulk requests go to a local stand-in acknowledging every
+    action, so the figure measures the event processing itself.
+    """
+    config = {}
+    if 'top-view' in current_stats.events:
+        config.update(current_stats.events['top-view'].processor_config)
+    config.update(resolve_hostnames=False, chunk_size=chunk_size,
+                  workers=workers)
+    if not live:
+        config['client'] = _BenchmarkClient()
+    indexer = EventsIndexer(_BenchmarkQueue(count), **config)
+    start = time.time()
+    success, failed = indexer.run()
+    elapsed = max(time.time() - start, 1e-6)
+    click.secho('Indexed {} events ({} failed) in {:.2f}s with chunk size '
+                '{} and {} workers ({:.0f} events/sec).'.format(
+                    success, failed, elapsed, indexer.chunk_size,
+                    indexer.workers, count / elapsed), fg='green')
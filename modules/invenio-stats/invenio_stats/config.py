@@ -180,6 +180,68 @@ mimicked the same functonality.
 """
 
 
+STATS_AGGREGATION_PAGE_SIZE = 1000
+"""Number of aggregation buckets fetched per composite aggregation page."""
+
+STATS_AGGREGATION_BULK_CHUNK_SIZE = 1000
+"""Number of aggregation documents written per bulk request."""
+
+STATS_AGGREGATION_WORKERS = 4
+"""Number of aggregations run in parallel by ``aggregate_events``."""
+
+
+STATS_EVENT_BUFFER_ENABLED = False
+"""Publish the events sent by signal receivers in batches.
+
+A background thread of each process publishes the buffered events, so the
+requests do not wait for the message broker.
+"""
+
+STATS_EVENT_BUFFER_SIZE = 100
+"""Number of buffered events of a type that triggers publishing."""
+
+STATS_EVENT_BUFFER_MAX_AGE = 1.0
+"""Seconds an event stays buffered at most."""
+
+STATS_EVENT_BUFFER_MAX_PENDING = 10000
+"""Number of buffered events above which new events are dropped."""
+
+STATS_EVENT_BUFFER_LOG_INTERVAL = 300
+"""Seconds between two logs of the event buffer metrics (0 disables them).
+
+The metrics are counted per process, each process logs its own.
+"""
+
+
+STATS_EVENTS_BULK_CHUNK_SIZE = 500
+"""Number of events indexed per bulk request by the events indexer."""
+
+STATS_EVENTS_BULK_WORKERS = 1
+"""Number of bulk requests sent in parallel by the events indexer."""
+
+STATS_GEOIP_CACHE_SIZE = 10000
+"""Number of IP address countries cached per process."""
+
+
+STATS_HOSTNAME_CACHE_SIZE = 10000
+"""Maximum number of IP addresses whose hostname is cached per process."""
+
+STATS_HOSTNAME_CACHE_TTL = 24 * 60 * 60
+"""Seconds a resolved hostname stays cached."""
+
+STATS_HOSTNAME_NEGATIVE_CACHE_TTL = 60 * 60
+"""Seconds an IP address without hostname stays cached."""
+
+STATS_HOSTNAME_RESOLVER_WORKERS = 16
+"""Number of concurrent reverse DNS lookups."""
+
+STATS_HOSTNAME_RESOLVE_TIMEOUT = 5
+"""Seconds the events indexer waits for the lookups of a batch."""
+
+STATS_HOSTNAME_BATCH_SIZE = 500
+"""Number of events whose hostnames are resolved together."""
+
+
 SEARCH_INDEX_PREFIX = os.environ.get('SEARCH_INDEX_PREFIX', '')
 """Search index prefix which is set in weko config."""
 
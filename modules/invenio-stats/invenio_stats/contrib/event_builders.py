@@ -16,7 +16,7 @@ import uuid
 
 from flask import request
 
-from ..utils import get_user
+from ..utils import get_hostname_resolver, get_user
 
 
 def celery_task_event_builder(
@@ -129,7 +129,6 @@ def build_file_unique_id(doc):
     )
 
     doc['unique_id'] = str(uuid.uuid3(uuid.NAMESPACE_DNS, key))
-    doc['hostname'] = '{}'.format(resolve_address(doc['remote_addr']))
     return doc
 
 
@@ -139,7 +138,6 @@ def build_record_unique_id(doc):
     doc['unique_id'] = '{0}_{1}_{2}_{3}_{4}'.format(
         doc['record_id'], doc['country'], doc['cur_user_id'],
         record_index_names, doc['site_license_name'])
-    doc['hostname'] = '{}'.format(resolve_address(doc['remote_addr']))
     return doc
 
 
@@ -236,28 +234,18 @@ def build_top_unique_id(doc):
     doc['unique_id'] = '{0}_{1}_{2}_{3}'.format("top", "view",
                                                 doc['site_license_name'],
                                                 doc['remote_addr'])
-    doc['hostname'] = '{}'.format(resolve_address(doc['remote_addr']))
     return doc
 
 
 def build_item_create_unique_id(doc):
     """Build item_create unique identifier."""
     doc['unique_id'] = '{0}_{1}_{2}'.format("item", "create", doc['pid_value'])
-    doc['hostname'] = '{}'.format(resolve_address(doc['remote_addr']))
     return doc
 
 
 def resolve_address(addr):
     """Resolve the ip address string addr and return its DNS name. If no name is found, return None."""
-    from socket import gethostbyaddr, herror
-    try:
-        record = gethostbyaddr(addr)
-
-    except herror as exc:
-        print('an error occurred while resolving ', addr, ': ', exc)
-        return None
-
-    return record[0]
+    return get_hostname_resolver().resolve(addr)
 
 
 def search_event_builder(event, sender_app, search_args=None,
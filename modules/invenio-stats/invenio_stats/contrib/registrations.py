@@ -46,7 +46,8 @@ def register_events():
                     flag_robots,
                     anonymize_user,
                     build_file_unique_id
-                ])),
+                ],
+                resolve_hostnames=True)),
         dict(
             event_type='file-preview',
             templates='invenio_stats.contrib.file_preview',
@@ -57,7 +58,8 @@ def register_events():
                     flag_robots,
                     anonymize_user,
                     build_file_unique_id
-                ])),
+                ],
+                resolve_hostnames=True)),
         dict(
             event_type='item-create',
             templates='invenio_stats.contrib.item_create',
@@ -68,7 +70,8 @@ def register_events():
                     flag_robots,
                     anonymize_user,
                     build_item_create_unique_id
-                ])),
+                ],
+                resolve_hostnames=True)),
         dict(
             event_type='record-view',
             templates='invenio_stats.contrib.record_view',
@@ -79,7 +82,8 @@ def register_events():
                     flag_robots,
                     anonymize_user,
                     build_record_unique_id
-                ])),
+                ],
+                resolve_hostnames=True)),
         dict(
             event_type='top-view',
             templates='invenio_stats.contrib.top_view',
@@ -90,7 +94,8 @@ def register_events():
                     flag_robots,
                     anonymize_user,
                     build_top_unique_id
-                ])),
+                ],
+                resolve_hostnames=True)),
         dict(
             event_type='search',
             templates='invenio_stats.contrib.search',
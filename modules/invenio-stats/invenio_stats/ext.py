@@ -20,6 +20,7 @@ from . import config
 from .errors import DuplicateAggregationError, DuplicateEventError, \
     DuplicateQueryError, UnknownAggregationError, UnknownEventError, \
     UnknownQueryError
+from .publisher import EventBuffer
 from .receivers import register_receivers
 from .utils import load_or_import_from_config
 
@@ -39,6 +40,13 @@ class _InvenioStatsState(object):
         self.entry_point_group_events = entry_point_group_events
         self.entry_point_group_aggs = entry_point_group_aggs
         self.entry_point_group_queries = entry_point_group_queries
+        self.event_buffer = EventBuffer(
+            app,
+            max_size=app.config['STATS_EVENT_BUFFER_SIZE'],
+            max_age=app.config['STATS_EVENT_BUFFER_MAX_AGE'],
+            max_pending=app.config['STATS_EVENT_BUFFER_MAX_PENDING'],
+            log_interval=app.config['STATS_EVENT_BUFFER_LOG_INTERVAL'],
+        ) if app.config['STATS_EVENT_BUFFER_ENABLED'] else None
 
     @cached_property
     def _events_config(self):
@@ -191,6 +199,17 @@ class _InvenioStatsState(object):
         assert event_type in self.events
         current_queues.queues['stats-{}'.format(event_type)].publish(events)
 
+    def publish_buffered(self, event_type, event):
+        """Publish an event from a request, batched with other events.
+
+        The event is published at once if the buffer is disabled.
+        """
+        assert event_type in self.events
+        if self.event_buffer is None:
+            self.publish(event_type, [event])
+        else:
+            self.event_buffer.add(event_type, event)
+
     def consume(self, event_type, no_ack=True, payload=True):
         """Comsume all pending events."""
         assert event_type in self.events
@@ -11,9 +11,11 @@
 from __future__ import absolute_import, print_function
 
 import hashlib
+import threading
+from contextlib import contextmanager
+from itertools import islice
 from time import mktime
 
-import arrow
 import elasticsearch
 from counter_robots import is_machine, is_robot
 from dateutil import parser
@@ -21,8 +23,49 @@ from flask import current_app
 from invenio_search import current_search_client
 from pytz import utc
 from weko_admin.api import is_restricted_user
+from werkzeug.local import LocalProxy
 
-from .utils import get_anonymization_salt, get_geoip, obj_or_import_string
+from .utils import get_anonymization_salt, get_geoip, \
+    get_hostname_resolver, obj_or_import_string
+
+
+_run_cache = threading.local()
+
+
+@contextmanager
+def events_run_cache():
+    """Memoize timestamps and salts while the events of a run are indexed."""
+    _run_cache.value = dict(timestamps={}, salts={})
+    try:
+        yield
+    finally:
+        _run_cache.value = None
+
+
+def parse_timestamp(value):
+    """Parse an event timestamp, once per value within a run."""
+    cache = getattr(_run_cache, 'value', None)
+    if cache is None:
+        return parser.parse(value)
+    timestamps = cache['timestamps']
+    ts = timestamps.get(value)
+    if ts is None:
+        if len(timestamps) >= 10000:
+            timestamps.clear()
+        ts = timestamps[value] = parser.parse(value)
+    return ts
+
+
+def get_event_salt(ts):
+    """Get the anonymization salt of a timestamp, once per day within a run."""
+    cache = getattr(_run_cache, 'value', None)
+    if cache is None:
+        return get_anonymization_salt(ts)
+    day = ts.date()
+    salt = cache['salts'].get(day)
+    if salt is None:
+        salt = cache['salts'][day] = get_anonymization_salt(ts)
+    return salt
 
 
 def anonymize_user(doc):
@@ -59,9 +102,9 @@ def anonymize_user(doc):
     # one hour. timeslice represents the hour of the day in which
     # the event has been generated and together with user info it determines
     # the 'User Session'
-    timestamp = arrow.get(doc.get('timestamp'))
+    timestamp = parse_timestamp(doc.get('timestamp'))
     timeslice = timestamp.strftime('%Y%m%d%H')
-    salt = get_anonymization_salt(timestamp)
+    salt = get_event_salt(timestamp)
 
     visitor_id = hashlib.sha224(salt.encode('utf-8'))
     # TODO: include random salt here, that changes once a day.
@@ -157,7 +200,8 @@ class EventsIndexer(object):
     """Default preprocessors ran on every event."""
 
     def __init__(self, queue, prefix='events', suffix='%Y-%m-%d', client=None,
-                 preprocessors=None, double_click_window=10):
+                 preprocessors=None, double_click_window=10,
+                 resolve_hostnames=False, chunk_size=None, workers=None):
         """Initialize indexer.
 
         :param prefix: prefix appended to elasticsearch indices' name.
@@ -169,6 +213,13 @@ class EventsIndexer(object):
             event before it is indexed. Each function should return the
             processed event. If it returns None, the event is filtered and
             won't be indexed.
+        :param resolve_hostnames: set the ``hostname`` of the events from
+            their ``remote_addr``. The addresses are resolved concurrently,
+            in batches of ``STATS_HOSTNAME_BATCH_SIZE`` events.
+        :param chunk_size: number of events per bulk request, defaults to
+            ``STATS_EVENTS_BULK_CHUNK_SIZE``.
+        :param workers: number of bulk requests sent in parallel, defaults to
+            ``STATS_EVENTS_BULK_WORKERS``.
         """
         self.queue = queue
         self.client = client or current_search_client
@@ -183,9 +234,40 @@ class EventsIndexer(object):
             obj_or_import_string(preproc) for preproc in preprocessors
         ] if preprocessors is not None else self.default_preprocessors
         self.double_click_window = double_click_window
+        self.resolve_hostnames = resolve_hostnames
+        self.hostname_stats = {}
+        self.chunk_size = chunk_size \
+            or current_app.config['STATS_EVENTS_BULK_CHUNK_SIZE']
+        self.workers = workers \
+            or current_app.config['STATS_EVENTS_BULK_WORKERS']
+
+    def _resolve_hostnames(self, actions):
+        """Set the hostname of a batch of events."""
+        addresses = [action['_source'].get('remote_addr')
+                     for action in actions]
+        hostnames = get_hostname_resolver().resolve_many(
+            [addr for addr in addresses if addr], stats=self.hostname_stats)
+        for action, addr in zip(actions, addresses):
+            action['_source']['hostname'] = '{}'.format(hostnames.get(addr))
+        return actions
 
     def actionsiter(self):
         """Iterator."""
+        if not self.resolve_hostnames:
+            yield from self._actionsiter()
+            return
+        batch_size = current_app.config['STATS_HOSTNAME_BATCH_SIZE']
+        actions = []
+        for action in self._actionsiter():
+            actions.append(action)
+            if len(actions) >= batch_size:
+                yield from self._resolve_hostnames(actions)
+                actions = []
+        if actions:
+            yield from self._resolve_hostnames(actions)
+
+    def _actionsiter(self):
+        """Iterate over the preprocessed events."""
         for msg in self.queue.consume():
             try:
                 for preproc in self.preprocessors:
@@ -194,8 +276,8 @@ class EventsIndexer(object):
                         break
                 if msg is None:
                     continue
-                suffix = arrow.get(msg.get('timestamp')).strftime(self.suffix)
-                ts = parser.parse(msg.get('timestamp'))
+                ts = parse_timestamp(msg.get('timestamp'))
+                suffix = ts.strftime(self.suffix)
                 # Truncate timestamp to keep only seconds. This is to improve
                 # elasticsearch performances.
                 ts = ts.replace(microsecond=0)
@@ -218,11 +300,52 @@ class EventsIndexer(object):
             except Exception:
                 current_app.logger.exception(u'Error while processing event')
 
+    def _parallel_bulk(self, actions):
+        """Index the actions with parallel bulk requests.
+
+        The actions are preprocessed in this thread, which holds the
+        application context, and handed to the workers in windows of
+        ``chunk_size * workers`` actions.
+        """
+        client = self.client
+        if isinstance(client, LocalProxy):
+            # The workers have no application context to resolve it
+            client = client._get_current_object()
+        success = failed = 0
+        window = self.chunk_size * self.workers
+        while True:
+            batch = list(islice(actions, window))
+            if not batch:
+                break
+            for ok, _ in elasticsearch.helpers.parallel_bulk(
+                    client, batch, thread_count=self.workers,
+                    chunk_size=self.chunk_size):
+                if ok:
+                    success += 1
+                else:
+                    failed += 1
+        return success, failed
+
     def run(self):
         """Process events queue."""
-        return elasticsearch.helpers.bulk(
-            self.client,
-            self.actionsiter(),
-            stats_only=True,
-            chunk_size=50
-        )
+        self.hostname_stats = dict(hits=0, misses=0, timeouts=0)
+        with events_run_cache():
+            if self.workers > 1:
+                result = self._parallel_bulk(self.actionsiter())
+            else:
+                result = elasticsearch.helpers.bulk(
+                    self.client,
+                    self.actionsiter(),
+                    stats_only=True,
+                    chunk_size=self.chunk_size
+                )
+        if self.resolve_hostnames:
+            lookups = self.hostname_stats['hits'] \
+                + self.hostname_stats['misses']
+            current_app.logger.info(
+                '{0}: hostname cache hits {1}/{2} ({3:.1%}), '
+                '{4} lookups timed out'.format(
+                    self.index, self.hostname_stats['hits'], lookups,
+                    self.hostname_stats['hits'] / lookups if lookups else 0,
+                    self.hostname_stats['timeouts']))
+        return result
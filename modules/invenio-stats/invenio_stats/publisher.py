@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2017-2018 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Buffered publishing of the events sent from requests."""
+
+from __future__ import absolute_import, print_function
+
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+"""Upper bounds in seconds of the publish latency histogram buckets."""
+
+
+class EventBuffer(object):
+    """Buffer events per type and publish them in batches.
+
+    A background thread publishes the buffered events every ``max_age``
+    seconds, or as soon as ``max_size`` events of a type are buffered, so
+    the requests never wait for the message broker. When more than
+    ``max_pending`` events are waiting, new events are dropped. The metrics
+    of the process are logged every ``log_interval`` seconds.
+    """
+
+    def __init__(self, app, max_size=100, max_age=1.0, max_pending=10000,
+                 log_interval=0):
+        """Initialize the buffer.
+
+        :param app: Flask application the events are published with.
+        :param max_size: number of events of a type published together.
+        :param max_age: seconds an event waits at most before publishing.
+        :param max_pending: maximum number of buffered events.
+        :param log_interval: seconds between two logs of the metrics, 0 to
+            never log them.
+        """
+        self.app = app
+        self.max_size = max_size
+        self.max_age = max_age
+        self.max_pending = max_pending
+        self.log_interval = log_interval
+        self._events = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._counters = dict(buffered=0, flushed=0, dropped=0, failed=0,
+                              batches=0)
+        self._latency = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def _start(self):
+        """Start the flushing thread of this process."""
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                # Events buffered before a fork belong to the parent
+                self._events = {}
+                self._pending = 0
+                atexit.register(self.flush)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name='invenio-stats-event-buffer')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        """Publish the buffered events until the process exits."""
+        logged_at = time.time()
+        while True:
+            self._wakeup.wait(self.max_age)
+            self._wakeup.clear()
+            self.flush()
+            if self.log_interval and \
+                    time.time() - logged_at >= self.log_interval:
+                self.log_metrics()
+                logged_at = time.time()
+
+    def add(self, event_type, event):
+        """Buffer an event.
+
+        :param event_type: type of the event.
+        :param event: the event.
+        :returns: False if the event was dropped.
+        """
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            self._start()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counters['dropped'] += 1
+                return False
+            events = self._events.setdefault(event_type, [])
+            events.append(event)
+            self._pending += 1
+            self._counters['buffered'] += 1
+            full = len(events) >= self.max_size
+        if full:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """Publish all the buffered events."""
+        with self._lock:
+            batches, self._events = self._events, {}
+            self._pending = 0
+        if not batches:
+            return
+        with self.app.app_context():
+            state = self.app.extensions['invenio-stats']
+            for event_type, events in batches.items():
+                start = time.time()
+                try:
+                    for i in range(0, len(events), self.max_size):
+                        state.publish(event_type, events[i:i + self.max_size])
+                except Exception:
+                    self.app.logger.exception(
+                        u'Error publishing {} events'.format(event_type))
+                    with self._lock:
+                        self._counters['failed'] += len(events)
+                    continue
+                latency = time.time() - start
+                with self._lock:
+                    self._counters['flushed'] += len(events)
+                    self._counters['batches'] += 1
+                    self._latency[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    @property
+    def metrics(self):
+        """Counters and publish latency histogram of this process."""
+        with self._lock:
+            metrics = dict(self._counters, pending=self._pending)
+            metrics['latency'] = dict(
+                zip([str(b) for b in LATENCY_BUCKETS] + ['+Inf'],
+                    self._latency))
+        return metrics
+
+    def log_metrics(self):
+        """Log the metrics of this process."""
+        self.app.logger.info(u'Event buffer metrics of process {}: {}'.format(
+            os.getpid(), json.dumps(self.metrics, sort_keys=True)))
@@ -34,7 +34,7 @@ class EventEmmiter(object):
                     event = builder(event, *args, **kwargs)
                     if event is None:
                         return
-                current_stats.publish(self.name, [event])
+                current_stats.publish_buffered(self.name, event)
         except Exception:
             current_app.logger.exception(u'Error building event')
 
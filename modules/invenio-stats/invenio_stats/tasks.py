@@ -10,8 +10,11 @@
 
 from __future__ import absolute_import, print_function
 
+from concurrent.futures import ThreadPoolExecutor
+
 from celery import shared_task
 from dateutil.parser import parse as dateutil_parse
+from flask import current_app
 
 from .proxies import current_stats
 
@@ -27,16 +30,35 @@ def process_events(event_types):
     return results
 
 
+def _run_aggregation(app, name, start_date, end_date, update_bookmark):
+    """Run one configured aggregation inside its own application context."""
+    with app.app_context():
+        aggr_cfg = current_stats.aggregations[name]
+        aggregator = aggr_cfg.aggregator_class(
+            name=aggr_cfg.name, **aggr_cfg.aggregator_config)
+        return aggregator.run(start_date, end_date, update_bookmark)
+
+
 @shared_task
 def aggregate_events(aggregations, start_date=None, end_date=None,
                      update_bookmark=True):
-    """Aggregate indexed events."""
+    """Aggregate indexed events.
+
+    The aggregations are independent from each other (each has its own
+    event index, aggregation indices and bookmarks), so they are run in
+    parallel by up to ``STATS_AGGREGATION_WORKERS`` threads.
+    """
     start_date = dateutil_parse(start_date) if start_date else None
     end_date = dateutil_parse(end_date) if end_date else None
-    results = []
-    for a in aggregations:
-        aggr_cfg = current_stats.aggregations[a]
-        aggregator = aggr_cfg.aggregator_class(
-            name=aggr_cfg.name, **aggr_cfg.aggregator_config)
-        results.append(aggregator.run(start_date, end_date, update_bookmark))
-    return results
+    app = current_app._get_current_object()
+    workers = min(len(aggregations),
+                  app.config.get('STATS_AGGREGATION_WORKERS', 1))
+    if workers <= 1:
+        return [_run_aggregation(app, a, start_date, end_date,
+                                 update_bookmark)
+                for a in aggregations]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_aggregation, app, a, start_date,
+                                   end_date, update_bookmark)
+                   for a in aggregations]
+        return [f.result() for f in futures]
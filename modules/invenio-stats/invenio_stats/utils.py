@@ -12,8 +12,14 @@ from __future__ import absolute_import, print_function
 
 import calendar
 import os
+import socket
+import threading
+import time
 from base64 import b64encode
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from functools import lru_cache
 from math import ceil
 
 import six
@@ -42,13 +48,159 @@ def get_anonymization_salt(ts):
     return salt
 
 
-def get_geoip(ip):
-    """Lookup country for IP address."""
-    reader = geolite2.reader()
-    ip_data = reader.get(ip) or {}
+_geoip_reader = None
+
+
+def _lookup_country(ip):
+    """Lookup country for IP address in the GeoIP database."""
+    global _geoip_reader
+    if _geoip_reader is None:
+        _geoip_reader = geolite2.reader()
+    ip_data = _geoip_reader.get(ip) or {}
     return ip_data.get('country', {}).get('iso_code')
 
 
+def get_geoip(ip):
+    """Lookup country for IP address.
+
+    The GeoIP database is opened once per process and the countries of the
+    ``STATS_GEOIP_CACHE_SIZE`` most recent addresses are cached.
+    """
+    app = current_app._get_current_object()
+    lookup = app.extensions.get('invenio-stats-geoip')
+    if lookup is None:
+        lookup = app.extensions.setdefault(
+            'invenio-stats-geoip',
+            lru_cache(maxsize=app.config['STATS_GEOIP_CACHE_SIZE'])(
+                _lookup_country))
+    return lookup(ip)
+
+
+class HostnameResolver(object):
+    """Reverse DNS resolver with a TTL LRU cache and a pool of threads.
+
+    Failed lookups are cached as well, for ``negative_ttl`` seconds.
+    """
+
+    def __init__(self, max_size=10000, ttl=86400, negative_ttl=3600,
+                 workers=16, timeout=5):
+        """Initialize the resolver.
+
+        :param max_size: maximum number of cached addresses.
+        :param ttl: seconds a resolved hostname stays cached.
+        :param negative_ttl: seconds a failed lookup stays cached.
+        :param workers: number of concurrent lookups.
+        :param timeout: seconds ``resolve_many`` waits for the lookups.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def _get(self, addr):
+        """Get the cached hostname of an address as ``(hit, hostname)``."""
+        with self._lock:
+            entry = self._cache.get(addr)
+            if entry is None:
+                return False, None
+            if entry[1] < time.time():
+                del self._cache[addr]
+                return False, None
+            self._cache.move_to_end(addr)
+            return True, entry[0]
+
+    def _put(self, addr, hostname):
+        """Cache the hostname of an address."""
+        ttl = self.ttl if hostname else self.negative_ttl
+        with self._lock:
+            self._cache[addr] = (hostname, time.time() + ttl)
+            self._cache.move_to_end(addr)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def _lookup(self, addr):
+        """Resolve an address and cache the result."""
+        try:
+            hostname = socket.gethostbyaddr(addr)[0]
+        except (OSError, UnicodeError, ValueError):
+            hostname = None
+        self._put(addr, hostname)
+        return hostname
+
+    def _submit(self, addr):
+        """Start the lookup of an address unless one is already running."""
+        with self._lock:
+            future = self._pending.get(addr)
+            if future is None:
+                future = self._executor.submit(self._lookup, addr)
+                self._pending[addr] = future
+                future.add_done_callback(
+                    lambda f, addr=addr: self._pending.pop(addr, None))
+        return future
+
+    def resolve(self, addr):
+        """Resolve an address, waiting at most ``timeout`` seconds.
+
+        :param addr: IP address.
+        :returns: The hostname or None.
+        """
+        return self.resolve_many([addr])[addr]
+
+    def resolve_many(self, addresses, stats=None):
+        """Resolve addresses concurrently.
+
+        Lookups still running after ``timeout`` seconds are reported as
+        unresolved, their results are cached when they complete.
+
+        :param addresses: IP addresses, one per event.
+        :param stats: optional dictionary where the ``hits``, ``misses``
+            and ``timeouts`` of the events are counted.
+        :returns: Dictionary of address to hostname.
+        """
+        stats = stats if stats is not None else {}
+        counts = {}
+        for addr in addresses:
+            counts[addr] = counts.get(addr, 0) + 1
+        results = {}
+        futures = {}
+        for addr, count in counts.items():
+            hit, hostname = self._get(addr)
+            if hit:
+                results[addr] = hostname
+                stats['hits'] = stats.get('hits', 0) + count
+            else:
+                futures[addr] = self._submit(addr)
+                stats['misses'] = stats.get('misses', 0) + count
+        if futures:
+            wait(list(futures.values()), timeout=self.timeout)
+        for addr, future in futures.items():
+            if future.done():
+                results[addr] = future.result()
+            else:
+                results[addr] = None
+                stats['timeouts'] = stats.get('timeouts', 0) + counts[addr]
+        return results
+
+
+def get_hostname_resolver():
+    """Get the hostname resolver of the application."""
+    app = current_app._get_current_object()
+    resolver = app.extensions.get('invenio-stats-hostname-resolver')
+    if resolver is None:
+        resolver = app.extensions.setdefault(
+            'invenio-stats-hostname-resolver', HostnameResolver(
+                max_size=app.config['STATS_HOSTNAME_CACHE_SIZE'],
+                ttl=app.config['STATS_HOSTNAME_CACHE_TTL'],
+                negative_ttl=app.config['STATS_HOSTNAME_NEGATIVE_CACHE_TTL'],
+                workers=app.config['STATS_HOSTNAME_RESOLVER_WORKERS'],
+                timeout=app.config['STATS_HOSTNAME_RESOLVE_TIMEOUT']))
+    return resolver
+
+
 def get_user():
     """User information.
 
@@ -228,6 +228,25 @@ def test_date_range(app, es, event_queues, indexed_events):
     assert total_count == 30
 
 
+@pytest.mark.parametrize('indexed_events',
+                         [dict(file_number=5,
+                               event_number=1,
+                               start_date=datetime.date(2015, 1, 28),
+                               end_date=datetime.date(2015, 2, 3))],
+                         indirect=['indexed_events'])
+def test_composite_paging(app, es, event_queues, indexed_events):
+    """Test that every composite aggregation page is written."""
+    app.config['STATS_AGGREGATION_PAGE_SIZE'] = 2
+    results = aggregate_events(['file-download-agg'])
+    assert results == [(35, 35)]
+    current_search_client.indices.refresh(index='*')
+
+    query = Search(using=current_search_client,
+                   index='stats-file-download',
+                   doc_type='file-download-day-aggregation')[0:50]
+    assert len(query.execute()) == 35
+
+
 @pytest.mark.parametrize('indexed_events',
                          [dict(file_number=1,
                                event_number=2,
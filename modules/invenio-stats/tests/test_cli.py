@@ -221,3 +221,15 @@ def test_aggregations_list_bookmarks(script_info, event_queues, es,
     bookmarks_query = agg_alias.doc_type('file-download-agg-bookmark')
     bookmarks = [b.date for b in bookmarks_query.scan()]
     assert all(b in result.output for b in bookmarks)
+
+
+def test_events_benchmark(script_info):
+    """Test "events benchmark" CLI command without Elasticsearch."""
+    runner = CliRunner()
+    for workers in ('1', '2'):
+        result = runner.invoke(
+            stats, ['events', 'benchmark', '--events', '10',
+                    '--chunk-size', '4', '--workers', workers],
+            obj=script_info)
+        assert result.exit_code == 0, result.output
+        assert 'Indexed 10 events (0 failed)' in result.output
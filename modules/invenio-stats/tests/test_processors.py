@@ -9,6 +9,7 @@
 """Event processor tests."""
 
 import logging
+import threading
 from datetime import datetime
 
 import pytest
@@ -245,6 +246,45 @@ def test_events_indexer_id_windowing(app, mock_event_queue):
     assert len(ids) == 3
 
 
+def test_events_indexer_parallel_bulk(app, mock_event_queue):
+    """Check that EventsIndexer sends windows of actions in parallel."""
+    # The default client is the current_search_client proxy
+    indexer = EventsIndexer(mock_event_queue, preprocessors=[],
+                            chunk_size=2, workers=2)
+
+    received_batches = []
+    thread_errors = []
+
+    def use_client(client):
+        try:
+            client.transport
+        except RuntimeError as e:
+            thread_errors.append(e)
+
+    def parallel_bulk(client, actions, thread_count, chunk_size, **kwargs):
+        assert thread_count == 2
+        assert chunk_size == 2
+        # The client is used from threads without application context
+        thread = threading.Thread(target=use_client, args=(client,))
+        thread.start()
+        thread.join()
+        received_batches.append(list(actions))
+        return [(True, {})] * len(received_batches[-1])
+
+    mock_event_queue.consume.return_value = [
+        _create_file_download_event(date) for date in
+        [(2017, 6, 1), (2017, 6, 2), (2017, 6, 3), (2017, 6, 4),
+         (2017, 6, 5)]
+    ]
+
+    with patch('elasticsearch.helpers.parallel_bulk',
+               side_effect=parallel_bulk):
+        assert indexer.run() == (5, 0)
+
+    assert [len(batch) for batch in received_batches] == [4, 1]
+    assert not thread_errors
+
+
 def test_double_clicks(app, mock_event_queue, es):
     """Test that events occurring within a time window are counted as 1."""
     event_type = 'file-download'
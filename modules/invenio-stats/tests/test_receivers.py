@@ -13,6 +13,7 @@ import logging
 from blinker import Namespace
 from helpers import get_queue_size
 from invenio_queues.proxies import current_queues
+from mock import patch
 
 from invenio_stats import InvenioStats
 from invenio_stats.proxies import current_stats
@@ -84,3 +85,47 @@ def test_failing_receiver(base_app, event_entrypoints, caplog):
         assert get_queue_size('stats-event_0') == 0
     finally:
         current_queues.delete()
+
+
+def test_buffered_receivers(base_app, event_entrypoints):
+    """Test events published in batches by the event buffer."""
+    try:
+        _signals = Namespace()
+        my_signal = _signals.signal('my-signal')
+
+        def event_builder(event, sender_app, signal_param, *args, **kwargs):
+            event.update(dict(event_param=signal_param))
+            return event
+
+        base_app.config.update(dict(
+            STATS_EVENT_BUFFER_ENABLED=True,
+            STATS_EVENT_BUFFER_MAX_AGE=3600,
+            STATS_EVENTS=dict(
+                event_0=dict(
+                    signal=my_signal,
+                    event_builders=[event_builder]
+                )
+            )
+        ))
+        InvenioStats(base_app)
+        current_queues.declare()
+        my_signal.send(base_app, signal_param=1)
+        my_signal.send(base_app, signal_param=2)
+        event_buffer = current_stats.event_buffer
+        assert event_buffer.metrics['pending'] == 2
+
+        event_buffer.flush()
+        events = [event for event in current_stats.consume('event_0')]
+        assert events == [{'event_param': 1}, {'event_param': 2}]
+        metrics = event_buffer.metrics
+        assert metrics['buffered'] == 2
+        assert metrics['flushed'] == 2
+        assert metrics['batches'] == 1
+        assert metrics['dropped'] == 0
+        assert sum(metrics['latency'].values()) == 1
+
+        with patch.object(base_app.logger, 'info') as info:
+            event_buffer.log_metrics()
+        assert '"flushed": 2' in info.call_args[0][0]
+    finally:
+        current_queues.delete()
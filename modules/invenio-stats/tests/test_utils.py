@@ -8,9 +8,12 @@
 
 """Test utility functions."""
 
+import socket
+
 from mock import patch
 
-from invenio_stats.utils import get_geoip, get_user, obj_or_import_string
+from invenio_stats.utils import HostnameResolver, get_geoip, get_user, \
+    obj_or_import_string
 
 
 def myfunc():
@@ -33,9 +36,44 @@ def test_get_user(app, mock_users, request_headers):
     assert user['ip_address'] == '142.0.0.1'
 
 
-def test_get_geoip():
+def test_get_geoip(app):
     """Test looking up IP address."""
+    app.config['STATS_GEOIP_CACHE_SIZE'] = 2
+    app.extensions.pop('invenio-stats-geoip', None)
+    assert get_geoip("74.125.67.100") == 'US'
     assert get_geoip("74.125.67.100") == 'US'
+    info = app.extensions['invenio-stats-geoip'].cache_info()
+    assert (info.hits, info.maxsize) == (1, 2)
+
+
+def test_hostname_resolver(app):
+    """Test the cached reverse DNS lookups."""
+    def gethostbyaddr(addr):
+        if addr == '10.0.0.1':
+            return ('host.example.org', [], [addr])
+        raise socket.herror('unknown host')
+
+    resolver = HostnameResolver(max_size=2)
+    with patch('invenio_stats.utils.socket.gethostbyaddr',
+               side_effect=gethostbyaddr) as mock_lookup:
+        stats = {}
+        assert resolver.resolve_many(
+            ['10.0.0.1', '10.0.0.1', '10.0.0.2'], stats=stats) == {
+                '10.0.0.1': 'host.example.org', '10.0.0.2': None}
+        assert stats == {'misses': 3}
+        assert mock_lookup.call_count == 2
+
+        # Failed lookups are cached too
+        stats = {}
+        resolver.resolve_many(['10.0.0.1', '10.0.0.2'], stats=stats)
+        assert stats == {'hits': 2}
+        assert mock_lookup.call_count == 2
+
+        # The least recently used address is evicted
+        assert resolver.resolve('10.0.0.3') is None
+        stats = {}
+        resolver.resolve_many(['10.0.0.1'], stats=stats)
+        assert stats == {'misses': 1}
 
 
 def test_obj_or_import_string(app):
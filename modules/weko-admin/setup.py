@@ -97,7 +97,8 @@ setup(
             'report = weko_admin.cli:report',
             'billing = weko_admin.cli:billing',
             'admin_settings = weko_admin.cli:admin_settings',
-            'authors_prefix = weko_admin.cli:authors_prefix'
+            'authors_prefix = weko_admin.cli:authors_prefix',
+            'restricted_access = weko_admin.cli:restricted_access'
         ],
         'invenio_celery.tasks': [
             'weko_admin = weko_admin.tasks',
@@ -28,7 +28,6 @@ import sys
 import unicodedata
 from datetime import datetime, timedelta
 
-import redis
 from flask import abort, current_app, flash, jsonify, make_response, \
     redirect, render_template, request, url_for
 from flask_admin import BaseView, expose
@@ -42,9 +41,9 @@ from invenio_communities.models import Community
 from invenio_db import db
 from invenio_files_rest.storage.pyfs import remove_dir_with_file
 from invenio_mail.api import send_mail
-from simplekv.memory.redisstore import RedisStore
 from weko_records.api import ItemTypes, SiteLicense
 from weko_records.models import SiteLicenseInfo
+from weko_records.redis_client import get_redis_store
 from wtforms.fields import StringField
 from wtforms.validators import ValidationError
 
@@ -54,6 +53,7 @@ from .models import AdminSettings, Identifier, \
     LogAnalysisRestrictedCrawlerList, LogAnalysisRestrictedIpAddress, \
     RankingSettings, SearchManagement, StatisticsEmail
 from .permissions import admin_permission_factory
+from .tasks import update_restricted_lists
 from .utils import get_redis_cache, get_response_json, get_search_setting
 from .utils import get_user_report_data as get_user_report
 from .utils import package_reports, reset_redis_cache, str_to_bool
@@ -392,8 +392,7 @@ class StatsSettingsView(BaseView):
             format(name='display_stats')
 
         current_display_setting = True  # Default
-        datastore = RedisStore(redis.StrictRedis.from_url(
-            current_app.config['CACHE_REDIS_URL']))
+        datastore = get_redis_store()
         if datastore.redis.exists(cache_key):
             curr_display_setting = datastore.get(cache_key).decode('utf-8')
             current_display_setting = True if curr_display_setting == 'True' \
@@ -421,6 +420,7 @@ class LogAnalysisSettings(BaseView):
                 LogAnalysisRestrictedIpAddress.update_table(new_ip_addresses)
                 LogAnalysisRestrictedCrawlerList.update_or_insert_list(
                     crawler_lists)
+                update_restricted_lists.delay()
             except Exception as e:
                 current_app.logger.error(
                     'Could not save restricted data: ', e)
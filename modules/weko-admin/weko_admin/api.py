@@ -21,16 +21,14 @@
 
 from __future__ import absolute_import, print_function
 
-import requests
 from flask import current_app, render_template
 from flask_babelex import lazy_gettext as _
-from invenio_db import db
 from invenio_mail.api import send_mail
 from invenio_stats.utils import QueryCommonReportsHelper
 from sqlalchemy import text
 
-from .models import AdminLangSettings, LogAnalysisRestrictedCrawlerList, \
-    LogAnalysisRestrictedIpAddress
+from .models import AdminLangSettings
+from .restricted import get_restricted_matcher
 from .utils import get_system_default_language
 
 
@@ -42,36 +40,12 @@ def is_restricted_user(user_info):
     :return: Boolean.
     """
     try:
-        restricted_ip = db.session.query(LogAnalysisRestrictedIpAddress) \
-            .filter_by(ip_address=user_info['ip_address']).one_or_none()
-        is_crawler = _is_crawler(user_info)
+        return get_restricted_matcher().is_restricted(
+            user_info['ip_address'], user_info['user_agent'])
     except Exception as e:
         current_app.logger.error('Could not check for restricted users: ')
         current_app.logger.error(e)
         return False
-    restricted_ip = False if restricted_ip is None else True
-    return (restricted_ip or is_crawler)
-
-
-def _is_crawler(user_info):
-    """Check if user agent is contained in URLs.
-
-    :param user_agent: User agent.
-
-    :return: Boolean.
-    """
-    restricted_agent_lists = LogAnalysisRestrictedCrawlerList.get_all_active()
-    for restricted_agent_list in restricted_agent_lists:
-        raw_res = requests.get(restricted_agent_list.list_url).text
-        if not raw_res:
-            continue
-        restrict_list = raw_res.split('\n')
-        restrict_list = [
-            agent for agent in restrict_list if not agent.startswith('#')]
-        if user_info['user_agent'] in restrict_list or \
-           user_info['ip_address'] in restrict_list:
-            return True
-    return False
 
 
 def send_site_license_mail(organization_name, mail_list, agg_date, data):
@@ -20,6 +20,8 @@
 
 """Command line interface creation kit."""
 import ast
+import random
+import time
 
 import click
 from flask.cli import with_appcontext
@@ -27,6 +29,7 @@ from weko_authors.models import AuthorsPrefixSettings
 
 from .models import AdminLangSettings, AdminSettings, ApiCertificate, \
     BillingPermission, SessionLifetime, StatisticTarget, StatisticUnit
+from .restricted import get_restricted_matcher, refresh_restricted_lists
 
 
 @click.group()
@@ -225,3 +228,67 @@ def create_default_settings(name, scheme, url):
         click.secho('insert setting success')
     except Exception as ex:
         click.secho(str(ex))
+
+
+@click.group()
+def restricted_access():
+    """Restricted IP addresses and crawlers commands."""
+
+
+@restricted_access.command('refresh')
+@with_appcontext
+def refresh_restricted_access():
+    """Download the crawler lists and publish the restricted lists."""
+    data = refresh_restricted_lists()
+    click.secho('{} IP addresses and {} user agents published.'.format(
+        len(data['ip_addresses']), len(data['user_agents'])), fg='green')
+
+
+@restricted_access.command('benchmark')
+@click.option('--events', default=1000000, help='Number of events.')
+@click.option('--restricted-ratio', default=0.1,
+              help='Ratio of events from restricted clients.')
+@click.option('--seed', default=0, help='Random seed.')
+@with_appcontext
+def benchmark_restricted_access(events, restricted_ratio, seed):
+    """Classify synthetic events and report the events per second."""
+    matcher = get_restricted_matcher()
+    rand = random.Random(seed)
+    agents = [
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/{}.0.{}.100 Safari/537.36',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_{}) '
+        'AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.{} Safari/605',
+        'Mozilla/5.0 (X11; Linux x86_64; rv:{}.0) Gecko/20100101 '
+        'Firefox/{}.0',
+    ]
+    restricted_ips = list(matcher.ip_addresses)
+    restricted_agents = list(matcher.user_agents)
+    samples = []
+    for _ in range(events):
+        ip_address = '{}.{}.{}.{}'.format(*(rand.randint(1, 254)
+                                            for _ in range(4)))
+        user_agent = rand.choice(agents).format(rand.randint(60, 99),
+                                                rand.randint(0, 9999))
+        if rand.random() < restricted_ratio:
+            if restricted_agents and (not restricted_ips
+                                      or rand.random() < 0.5):
+                user_agent = rand.choice(restricted_agents)
+            elif restricted_ips:
+                ip_address = rand.choice(restricted_ips)
+        samples.append((ip_address, user_agent))
+
+    is_restricted = matcher.is_restricted
+    start = time.perf_counter()
+    restricted = 0
+    for ip_address, user_agent in samples:
+        if is_restricted(ip_address, user_agent):
+            restricted += 1
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    click.secho('Classified {} events ({} restricted) in {:.2f}s '
+                '({:.0f} events/sec, {:.2f} us/event) against {} IP '
+                'addresses and {} user agents.'.format(
+                    events, restricted, elapsed, events / elapsed,
+                    elapsed * 1e6 / max(events, 1),
+                    len(matcher.ip_addresses), len(matcher.user_agents)),
+                fg='green')
@@ -112,6 +112,15 @@ WEKO_ADMIN_DEFAULT_CRAWLER_LISTS = [
 ]
 """Default crawler files for restricting IP addresses and user agents."""
 
+WEKO_ADMIN_RESTRICTED_CACHE_KEY = 'weko_admin_restricted_lists'
+"""Cache key of the restricted IP addresses and user agents."""
+
+WEKO_ADMIN_RESTRICTED_CHECK_INTERVAL = 60
+"""Seconds between checks for a new version of the restricted lists."""
+
+WEKO_ADMIN_RESTRICTED_LIST_TIMEOUT = 10
+"""Timeout in seconds of a crawler list download."""
+
 WEKO_ADMIN_REPORT_FREQUENCIES = ['daily', 'weekly', 'monthly']
 """Email schedule frequency options."""
 
@@ -669,6 +678,12 @@ WEKO_ADMIN_NUMBER_OF_SEND_MAIL_HISTORY = 20
 WEKO_ADMIN_NUMBER_OF_FAILED_MAIL = 10
 """Number of failed mail display per page."""
 
+WEKO_ADMIN_FEEDBACK_MAIL_STATS_CHUNK_SIZE = 1000
+"""Number of items per statistics/metadata query of the feedback mail."""
+
+WEKO_ADMIN_FEEDBACK_MAIL_SEND_WORKERS = 4
+"""Number of threads (one SMTP connection each) sending feedback mails."""
+
 WEKO_PIDSTORE_IDENTIFIER_TEMPLATE_CREATOR = 'weko_records_ui/admin/pidstore_identifier_creator.html'
 """ Pidstore identifier creator template. """
 
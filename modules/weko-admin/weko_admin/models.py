@@ -1424,6 +1424,22 @@ class FeedbackMailHistory(db.Model):
         nullable=False
     )
 
+    stage_times = db.Column(
+        db.JSON().with_variant(
+            postgresql.JSONB(none_as_null=True),
+            'postgresql',
+        ).with_variant(
+            JSONType(),
+            'sqlite',
+        ).with_variant(
+            JSONType(),
+            'mysql',
+        ),
+        default=lambda: dict(),
+        nullable=True
+    )
+    """ Seconds spent in each stage of the sending"""
+
     @classmethod
     def get_by_id(cls, id):
         """Get history by id.
@@ -1478,7 +1494,8 @@ class FeedbackMailHistory(db.Model):
                count,
                error,
                parent_id=None,
-               is_latest=True):
+               is_latest=True,
+               stage_times=None):
         """Create history record.
 
         Arguments:
@@ -1490,6 +1507,8 @@ class FeedbackMailHistory(db.Model):
 
         Keyword Arguments:
             parent_id {integer} -- Parent id if resend (default: {None})
+            stage_times {dictionary} -- Seconds spent per stage
+                                        (default: {None})
 
         """
         if not session:
@@ -1506,6 +1525,7 @@ class FeedbackMailHistory(db.Model):
                 data.count = count
                 data.error = error
                 data.is_latest = is_latest
+                data.stage_times = stage_times or {}
                 session.add(data)
             session.commit()
         except BaseException as ex:
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of WEKO3.
+# Copyright (C) 2017 National Institute of Informatics.
+#
+# WEKO3 is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# WEKO3 is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WEKO3; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+
+"""Compiled matcher of the restricted IP addresses and crawlers."""
+
+import ipaddress
+import re
+import threading
+import time
+import uuid
+
+import requests
+from flask import current_app
+from invenio_cache import current_cache
+
+from .models import LogAnalysisRestrictedCrawlerList, \
+    LogAnalysisRestrictedIpAddress
+
+_matcher = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _trie_regex(node):
+    """Build the regular expression of a trie node."""
+    if '' in node:
+        # A shorter entry already matches, the longer ones are redundant
+        return ''
+    branches = [re.escape(char) + _trie_regex(child)
+                for char, child in sorted(node.items())]
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:' + '|'.join(branches) + ')'
+
+
+def compile_substring_pattern(words):
+    """Compile words into one pattern matching any of them as a substring.
+
+    The words are merged into a trie first, so the alternatives share their
+    common prefixes and the pattern is tried once per position of the
+    searched string instead of once per word.
+
+    :param words: Iterable of strings.
+    :return: Compiled pattern, or None if there are no words.
+    """
+    trie = {}
+    for word in words:
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    if not trie:
+        return None
+    return re.compile(_trie_regex(trie))
+
+
+class RestrictedMatcher(object):
+    """Classify access by IP address and user agent."""
+
+    def __init__(self, ip_addresses=(), user_agents=(), version=None):
+        """Compile the restricted IP addresses and user agents.
+
+        :param ip_addresses: Restricted IP addresses.
+        :param user_agents: Restricted user agents, matched as substrings.
+        :param version: Version of the lists.
+        """
+        self.version = version
+        self.ip_addresses = frozenset(ip_addresses)
+        self.user_agents = frozenset(user_agents)
+        self._pattern = compile_substring_pattern(self.user_agents)
+
+    def is_restricted(self, ip_address, user_agent):
+        """Check if the access is restricted.
+
+        :param ip_address: IP address of the access.
+        :param user_agent: User agent of the access.
+        :return: Boolean.
+        """
+        if ip_address in self.ip_addresses:
+            return True
+        if not user_agent:
+            return False
+        if user_agent in self.user_agents:
+            return True
+        return self._pattern is not None \
+            and self._pattern.search(user_agent) is not None
+
+
+def _is_ip_address(value):
+    """Check if the value is an IP address."""
+    try:
+        ipaddress.ip_address(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _download_crawler_list(list_url):
+    """Download a crawler list and return its entries."""
+    try:
+        res = requests.get(
+            list_url,
+            timeout=current_app.config['WEKO_ADMIN_RESTRICTED_LIST_TIMEOUT'])
+        res.raise_for_status()
+    except requests.RequestException as e:
+        current_app.logger.error(
+            'Could not download crawler list {}: {}'.format(list_url, e))
+        return []
+    entries = []
+    for line in res.text.split('\n'):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            entries.append(line)
+    return entries
+
+
+def build_restricted_lists():
+    """Collect the restricted IP addresses and user agents.
+
+    The IP addresses come from the database, the active crawler lists are
+    downloaded. An entry of a crawler list is an IP address or a user agent.
+
+    :return: Dictionary with the IP addresses and user agents.
+    """
+    ip_addresses = set(
+        ip.ip_address for ip in LogAnalysisRestrictedIpAddress.get_all())
+    user_agents = set()
+    for crawler_list in LogAnalysisRestrictedCrawlerList.get_all_active():
+        for entry in _download_crawler_list(crawler_list.list_url):
+            if _is_ip_address(entry):
+                ip_addresses.add(entry)
+            else:
+                user_agents.add(entry)
+    return dict(ip_addresses=sorted(ip_addresses),
+                user_agents=sorted(user_agents))
+
+
+def refresh_restricted_lists():
+    """Rebuild the restricted lists and publish them with a new version.
+
+    :return: The published lists.
+    """
+    data = build_restricted_lists()
+    data['version'] = uuid.uuid4().hex
+    current_cache.set(current_app.config['WEKO_ADMIN_RESTRICTED_CACHE_KEY'],
+                      data, timeout=0)
+    return data
+
+
+def _database_restricted_lists():
+    """Get the restricted lists of the database only, without downloads.
+
+    :return: Unpublished lists, with no version.
+    """
+    return dict(
+        ip_addresses=[ip.ip_address
+                      for ip in LogAnalysisRestrictedIpAddress.get_all()],
+        user_agents=[],
+        version=None)
+
+
+def _schedule_refresh():
+    """Queue the refresh of the restricted lists once per check interval."""
+    from .tasks import update_restricted_lists
+    config = current_app.config
+    if current_cache.add(config['WEKO_ADMIN_RESTRICTED_CACHE_KEY'] + '_lock',
+                         True,
+                         timeout=config[
+                             'WEKO_ADMIN_RESTRICTED_CHECK_INTERVAL']):
+        update_restricted_lists.delay()
+
+
+def get_restricted_matcher():
+    """Get the restricted matcher of this process.
+
+    The published version is checked every
+    ``WEKO_ADMIN_RESTRICTED_CHECK_INTERVAL`` seconds and the matcher is
+    recompiled only when it changed, so a classification is a local lookup.
+    While no lists are published, the matcher only holds the IP addresses
+    of the database and the crawler lists are downloaded by the
+    ``update_restricted_lists`` task, so no request waits for them.
+
+    :return: RestrictedMatcher.
+    """
+    global _matcher, _checked_at
+    interval = current_app.config['WEKO_ADMIN_RESTRICTED_CHECK_INTERVAL']
+    if _matcher is not None and time.monotonic() - _checked_at < interval:
+        return _matcher
+    with _lock:
+        if _matcher is not None \
+                and time.monotonic() - _checked_at < interval:
+            return _matcher
+        data = current_cache.get(
+            current_app.config['WEKO_ADMIN_RESTRICTED_CACHE_KEY'])
+        if data is None:
+            data = _database_restricted_lists()
+            _schedule_refresh()
+        if _matcher is None or _matcher.version != data['version']:
+            _matcher = RestrictedMatcher(data['ip_addresses'],
+                                         data['user_agents'],
+                                         version=data['version'])
+        _checked_at = time.monotonic()
+    return _matcher
@@ -100,6 +100,10 @@
         var dbjosn = $scope.dbJson;
         for(var chk1 in dbjosn.site_license){
            for(var chk2 in dbjosn.site_license[chk1].addresses){
+             if ($scope.isIPv6Range(dbjosn.site_license[chk1].addresses[chk2])) {
+               // IPv6 ranges are kept as strings, they are set with the API
+               continue;
+             }
              var saddr = "";
              var faddr = "";
              for(var i=0; i<4; i++){
@@ -136,6 +140,12 @@
         }
       }
 
+      // IPv6 addresses are strings instead of lists of octets
+      $scope.isIPv6Range=function(range){
+        return typeof range.start_ip_address === 'string' ||
+          typeof range.finish_ip_address === 'string';
+      }
+
       //入力チェック
       $scope.chcckStr=function(str,p_index){
         var checkStr1 = /^(\d{1,2}|1\d\d|2[0-4]\d|25[0-5])$/; //正整数
@@ -35,6 +35,7 @@ from invenio_stats.utils import QueryCommonReportsHelper, \
 
 from . import config
 from .models import AdminSettings, StatisticsEmail
+from .restricted import refresh_restricted_lists
 from .utils import StatisticMail, get_redis_cache, get_user_report_data, \
     package_reports
 from .views import manual_send_site_license_mail
@@ -119,6 +120,15 @@ def send_feedback_mail():
         StatisticMail.send_mail_to_all()
 
 
+@shared_task(ignore_results=True)
+def update_restricted_lists():
+    """Download the crawler lists and publish the restricted lists."""
+    data = refresh_restricted_lists()
+    logger.info('Restricted lists updated: {} IP addresses, '
+                '{} user agents'.format(len(data['ip_addresses']),
+                                        len(data['user_agents'])))
+
+
 def _due_to_run(schedule):
     """Check if a task needs to be ran."""
     if not schedule['enabled']:
@@ -19,13 +19,15 @@
 # MA 02111-1307, USA.
 
 """Utilities for convert response json."""
+import calendar
 import csv
+import json
 import os
+import time
 import zipfile
 from datetime import datetime
 from io import BytesIO, StringIO
 
-import redis
 import requests
 from flask import current_app
 from flask_babelex import gettext as __
@@ -38,10 +40,10 @@ from invenio_mail.admin import MailSettingView
 from invenio_records.models import RecordMetadata
 from invenio_stats.views import QueryFileStatsCount, QueryRecordViewCount
 from jinja2 import Template
-from simplekv.memory.redisstore import RedisStore
 from sqlalchemy import func
 from weko_authors.models import Authors
 from weko_records.api import ItemsMetadata
+from weko_records.redis_client import get_redis_store
 
 from . import config
 from .models import AdminLangSettings, ApiCertificate, FeedbackMailFailed, \
@@ -63,10 +65,11 @@ def get_response_json(result_list, n_lst):
             adr_lst = rlst.get('addresses')
             if isinstance(adr_lst, list):
                 for alst in adr_lst:
-                    alst['start_ip_address'] = alst['start_ip_address'].split(
-                        '.')
-                    alst['finish_ip_address'] = alst[
-                        'finish_ip_address'].split('.')
+                    # The UI edits IPv4 addresses as lists of octets, IPv6
+                    # addresses are kept as strings
+                    for key in ('start_ip_address', 'finish_ip_address'):
+                        if ':' not in alst[key]:
+                            alst[key] = alst[key].split('.')
             newlst.append(rlst.dumps())
         result.update(dict(site_license=newlst))
         del result_list
@@ -478,8 +481,7 @@ def write_report_tsv_rows(writer, records, file_type=None, other_info=None):
 def reset_redis_cache(cache_key, value):
     """Delete and then reset a cache value to Redis."""
     try:
-        datastore = RedisStore(redis.StrictRedis.from_url(
-            current_app.config['CACHE_REDIS_URL']))
+        datastore = get_redis_store()
         datastore.delete(cache_key)
         datastore.put(cache_key, value.encode('utf-8'))
     except Exception as e:
@@ -490,8 +492,7 @@ def reset_redis_cache(cache_key, value):
 def get_redis_cache(cache_key):
     """Check and then retrieve the value of a Redis cache key."""
     try:
-        datastore = RedisStore(redis.StrictRedis.from_url(
-            current_app.config['CACHE_REDIS_URL']))
+        datastore = get_redis_store()
         if datastore.redis.exists(cache_key):
             return datastore.get(cache_key).decode('utf-8')
     except Exception as e:
@@ -530,7 +531,13 @@ class StatisticMail:
 
     @classmethod
     def send_mail_to_all(cls, list_mail_data=None, stats_date=None):
-        """Send mail to all setting email."""
+        """Send mail to all setting email.
+
+        The statistics and metadata of all items are fetched in bulk before
+        the mails are rendered, then the mails are sent by a pool of workers
+        which each reuse one SMTP connection. The seconds spent in each stage
+        are stored in the history record.
+        """
         # Load setting:
         setting = FeedbackMail.get_feed_back_email_setting()
         if not setting.get('is_sending_feedback') and not stats_date:
@@ -544,6 +551,15 @@ class StatisticMail:
             stats_date = cls.get_send_time()
         failed_mail = 0
         total_mail = 0
+        stage_times = {}
+        stage_start = time.time()
+
+        def _end_stage(name):
+            nonlocal stage_start
+            now = time.time()
+            stage_times[name] = round(now - stage_start, 3)
+            stage_start = now
+
         try:
             from weko_theme import config as theme_config
             if not list_mail_data:
@@ -554,36 +570,58 @@ class StatisticMail:
                     return
                 list_mail_data = parse_feedback_mail_data(
                     feedback_mail_data)
+            list_mail_data = {k: v for k, v in list_mail_data.items()
+                              if str(k) not in banned_mail}
+            _end_stage('collect')
+
+            list_item_id = set()
+            for v in list_mail_data.values():
+                list_item_id.update(v.get('item') or [])
+            statistics = cls.get_bulk_statistic_data(
+                list(list_item_id), stats_date)
+            author_names = cls.get_author_names(list_mail_data)
+            _end_stage('statistics')
+
             title = theme_config.THEME_SITENAME
+            subject = str(cls.build_statistic_mail_subject(title, stats_date))
+            list_rf = []
+            list_author = []
             for k, v in list_mail_data.items():
                 mail_data = {
-                    'user_name': cls.get_author_name(
-                        str(k),
-                        v.get('author_id')),
+                    'user_name': author_names.get(str(k), str(k)),
                     'organization': title,
                     'time': stats_date
                 }
-                recipient = str(k)
-                subject = str(
-                    cls.build_statistic_mail_subject(title, stats_date))
                 body = str(cls.fill_email_data(
                     cls.get_list_statistic_data(
                         v.get("item"),
                         stats_date,
-                        setting.get('root_url')),
+                        setting.get('root_url'),
+                        statistics),
                     mail_data))
-                if recipient in banned_mail:
-                    continue
-                send_result = cls.send_mail(recipient, body, subject)
-                total_mail += 1
+                list_rf.append({
+                    'subject': subject,
+                    'body': body,
+                    'recipient': str(k)
+                })
+                list_author.append(v.get('author_id'))
+            _end_stage('render')
+
+            send_results = MailSettingView.send_statistic_mails(
+                list_rf,
+                current_app.config['WEKO_ADMIN_FEEDBACK_MAIL_SEND_WORKERS'])
+            total_mail = len(send_results)
+            for rf, author_id, send_result in zip(list_rf, list_author,
+                                                  send_results):
                 if not send_result:
                     FeedbackMailFailed.create(
                         session,
                         id,
-                        v.get('author_id'),
-                        str(k)
+                        author_id,
+                        rf['recipient']
                     )
                     failed_mail += 1
+            _end_stage('send')
         except Exception as ex:
             current_app.logger.error('Error has occurred', ex)
         end_time = datetime.now()
@@ -594,9 +632,142 @@ class StatisticMail:
             end_time,
             stats_date,
             total_mail,
-            failed_mail
+            failed_mail,
+            stage_times=stage_times
         )
 
+    @classmethod
+    def get_author_names(cls, list_mail_data):
+        """Get the author name of every mail in bulk.
+
+        Arguments:
+            list_mail_data {dictionary} -- mail data keyed by email
+
+        Returns:
+            dictionary -- author name keyed by email
+
+        """
+        mail_by_author = {}
+        for k, v in list_mail_data.items():
+            author_id = v.get('author_id')
+            if author_id and str(author_id).isdigit():
+                mail_by_author.setdefault(int(author_id), []).append(str(k))
+        result = {}
+        author_ids = list(mail_by_author)
+        chunk_size = current_app.config[
+            'WEKO_ADMIN_FEEDBACK_MAIL_STATS_CHUNK_SIZE']
+        for i in range(0, len(author_ids), chunk_size):
+            authors = Authors.query.filter(
+                Authors.id.in_(author_ids[i:i + chunk_size])).all()
+            for author in authors:
+                try:
+                    author_data = json.loads(author.json)
+                    author_info = author_data.get('authorNameInfo')
+                except Exception:
+                    continue
+                if not author_info:
+                    continue
+                for mail in mail_by_author[author.id]:
+                    result[mail] = author_info[0].get('fullName')
+        return result
+
+    @classmethod
+    def get_bulk_statistic_data(cls, list_item_id, time):
+        """Get metadata, view and download counts of items in bulk.
+
+        The view and download counts of a whole chunk of items are read with
+        one aggregation query each, instead of one query per item and file.
+
+        Arguments:
+            list_item_id {list} -- item ids
+            time {string} -- statistic time with format yyyy-MM
+
+        Returns:
+            dictionary -- statistic data keyed by item id
+
+        """
+        from elasticsearch_dsl import Search
+        from invenio_search import current_search_client
+        from invenio_stats.proxies import current_stats
+
+        year = int(time[0: 4])
+        month = int(time[5: 7])
+        _, lastday = calendar.monthrange(year, month)
+        time_range = {
+            'gte': datetime(year, month, 1).isoformat(),
+            'lte': datetime(year, month, lastday, 23, 59, 59).isoformat()
+        }
+        max_size = current_app.config['STATS_ES_INTEGER_MAX_VALUE']
+        view_cfg = current_stats.queries[
+            'bucket-record-view-total'].query_config
+        download_cfg = current_stats.queries[
+            'bucket-file-download-total'].query_config
+
+        def _search(cfg):
+            return Search(using=current_search_client,
+                          index=cfg['index'],
+                          doc_type=cfg['doc_type'])[0:0].filter(
+                'range', timestamp=time_range)
+
+        result = {}
+        chunk_size = current_app.config[
+            'WEKO_ADMIN_FEEDBACK_MAIL_STATS_CHUNK_SIZE']
+        for i in range(0, len(list_item_id), chunk_size):
+            chunk = list_item_id[i:i + chunk_size]
+            records = db.session.query(RecordMetadata).filter(
+                RecordMetadata.id.in_(chunk)).all()
+            bucket_ids = {}
+            for record in records:
+                data = record.json
+                list_file = cls.get_file_in_item(data)
+                result[str(record.id)] = {
+                    'json': data,
+                    'detail_view': '0',
+                    'file_download': {
+                        key: '0' for key in list_file['list_file_key']}
+                }
+                if list_file['bucket_id']:
+                    bucket_ids[list_file['bucket_id']] = str(record.id)
+
+            try:
+                view_query = _search(view_cfg).filter(
+                    'terms', record_id=chunk)
+                view_query.aggs.bucket(
+                    'items', 'terms', field='record_id', size=len(chunk)
+                ).metric('count', 'sum', field='count')
+                res = view_query.execute().to_dict()
+                for bucket in res['aggregations']['items']['buckets']:
+                    if bucket['key'] in result:
+                        result[bucket['key']]['detail_view'] = str(
+                            bucket['count']['value'])
+            except Exception as ex:
+                current_app.logger.error(
+                    'Cannot get view counts of items', ex)
+
+            if not bucket_ids:
+                continue
+            try:
+                download_query = _search(download_cfg).filter(
+                    'terms', bucket_id=list(bucket_ids))
+                download_query.aggs.bucket(
+                    'buckets', 'terms', field='bucket_id',
+                    size=len(bucket_ids)
+                ).bucket(
+                    'files', 'terms', field='file_key', size=max_size
+                ).metric('count', 'sum', field='count')
+                res = download_query.execute().to_dict()
+                for bucket in res['aggregations']['buckets']['buckets']:
+                    file_download = result[bucket_ids[bucket['key']]][
+                        'file_download']
+                    for file_bucket in bucket['files']['buckets']:
+                        if file_bucket['key'] in file_download:
+                            file_download[file_bucket['key']] = str(
+                                file_bucket['count']['value'])
+            except Exception as ex:
+                current_app.logger.error(
+                    'Cannot get download counts of items', ex)
+        return result
+
     @classmethod
     def get_banned_mail(cls, list_banned_mail):
         """Get banned mail from list of setting.
@@ -637,13 +808,18 @@ class StatisticMail:
             return 0
 
     @classmethod
-    def get_list_statistic_data(cls, list_item_id, time, root_url):
+    def get_list_statistic_data(cls, list_item_id, time, root_url,
+                                statistics=None):
         """Get list statistic data for user.
 
         Arguments:
             list_item_id {list} -- item id
             time {string} -- statistic time
 
+        Keyword Arguments:
+            statistics {dictionary} -- prefetched statistic data keyed by
+                                       item id (default: {None})
+
         Returns:
             dictionary -- The statistic data
 
@@ -658,7 +834,13 @@ class StatisticMail:
         total_view = 0
         total_download = 0
         for item_id in list_item_id:
-            data = cls.get_item_information(item_id, time, root_url)
+            if statistics is not None:
+                if item_id not in statistics:
+                    continue
+                data = cls.get_item_information(
+                    item_id, time, root_url, statistics[item_id])
+            else:
+                data = cls.get_item_information(item_id, time, root_url)
             file_download = data.get('file_download')
             list_file_download = list()
             for k, v in file_download.items():
@@ -682,22 +864,31 @@ class StatisticMail:
         return list_result
 
     @classmethod
-    def get_item_information(cls, item_id, time, root_url):
+    def get_item_information(cls, item_id, time, root_url, item_stats=None):
         """Get information of item.
 
         Arguments:
             item_id {string} -- id of item
             time {string} -- time to statistic data
 
+        Keyword Arguments:
+            item_stats {dictionary} -- prefetched data of the item
+                                       (default: {None})
+
         Returns:
             [dictionary] -- data template insert to email
 
         """
-        result = db.session.query(RecordMetadata).filter(
-            RecordMetadata.id == item_id).one_or_none()
-        data = result.json
-        count_item_view = cls.get_item_view(item_id, time)
-        count_item_download = cls.get_item_download(data, time)
+        if item_stats is not None:
+            data = item_stats['json']
+            count_item_view = item_stats['detail_view']
+            count_item_download = dict(item_stats['file_download'])
+        else:
+            result = db.session.query(RecordMetadata).filter(
+                RecordMetadata.id == item_id).one_or_none()
+            data = result.json
+            count_item_view = cls.get_item_view(item_id, time)
+            count_item_download = cls.get_item_download(data, time)
         title = data.get("item_title")
         url = root_url + '/records/' + data.get('control_number')
         result = {
@@ -1232,6 +1423,7 @@ class FeedbackMail:
                 new_data['success'] = int(
                     data[index].count) - int(data[index].error)
                 new_data['is_latest'] = data[index].is_latest
+                new_data['stage_times'] = data[index].stage_times or {}
                 list_history.append(new_data)
             result['data'] = list_history
             result['total_page'] = cls.get_total_page(
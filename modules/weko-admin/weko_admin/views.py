@@ -22,6 +22,7 @@
 
 import calendar
 import json
+import os
 import sys
 from datetime import timedelta
 
@@ -32,9 +33,11 @@ from flask_breadcrumbs import register_breadcrumb
 from flask_login import current_user, login_required
 from flask_menu import register_menu
 from invenio_admin.proxies import current_admin
+from invenio_stats.proxies import current_stats
 from invenio_stats.utils import QueryCommonReportsHelper
 from sqlalchemy.orm import session
 from weko_records.models import SiteLicenseInfo
+from weko_records.redis_client import get_redis_metrics
 from werkzeug.local import LocalProxy
 
 from .api import send_site_license_mail
@@ -536,6 +539,33 @@ def get_avatar():
     return Response(b, mimetype="image/x-icon", direct_passthrough=True)
 
 
+@blueprint_api.route('/redis_metrics', methods=['GET'])
+@login_required
+def get_redis_metrics_data():
+    """Get the Redis command and connection counters of this process.
+
+    :return: The counters by Redis URL, with the process id.
+    """
+    if not _has_admin_access():
+        return abort(403)
+    return jsonify(pid=os.getpid(), clients=get_redis_metrics())
+
+
+@blueprint_api.route('/stats_event_metrics', methods=['GET'])
+@login_required
+def get_stats_event_metrics_data():
+    """Get the statistics event buffer counters of this process.
+
+    :return: The counters and publish latency histogram, with the process
+        id. ``metrics`` is null when the event buffer is disabled.
+    """
+    if not _has_admin_access():
+        return abort(403)
+    event_buffer = current_stats.event_buffer
+    return jsonify(pid=os.getpid(),
+                   metrics=event_buffer.metrics if event_buffer else None)
+
+
 @blueprint_api.route('/search_control/display_control', methods=['GET'])
 def display_control_function():
     """Get display control.
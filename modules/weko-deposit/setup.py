@@ -100,6 +100,9 @@ setup(
         'invenio_celery.tasks': [
             'weko_deposit = weko_deposit.tasks',
         ],
+        'flask.commands': [
+            'weko_deposit = weko_deposit.cli:weko_deposit',
+        ],
     },
     extras_require=extras_require,
     install_requires=install_requires,
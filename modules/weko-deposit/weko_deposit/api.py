@@ -20,16 +20,20 @@
 
 """Weko Deposit API."""
 import copy
+import threading
 import uuid
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from itertools import chain, islice
 from typing import NoReturn, Union
 
-import redis
 from dictdiffer import patch
 from dictdiffer.merge import Merger, UnresolvedConflictsException
+from elasticsearch.helpers import parallel_bulk, streaming_bulk
 from flask import abort, current_app, has_request_context, json, request, \
     session
 from flask_security import current_user
+from invenio_cache import current_cache
 from invenio_db import db
 from invenio_deposit.api import Deposit, index, preserve
 from invenio_deposit.errors import MergeConflict
@@ -46,15 +50,16 @@ from invenio_records.models import RecordMetadata
 from invenio_records_files.api import FileObject, Record
 from invenio_records_files.models import RecordsBuckets
 from invenio_records_rest.errors import PIDResolveRESTError
-from simplekv.memory.redisstore import RedisStore
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm.attributes import flag_modified
 from weko_index_tree.api import Indexes
 from weko_records.api import FeedbackMailList, ItemsMetadata, ItemTypes
 from weko_records.models import ItemMetadata
+from weko_records.redis_client import get_redis_store
 from weko_records.utils import get_all_items, get_attribute_value_all_items, \
     get_options_and_order_list, json_loader, set_timestamp
 from weko_user_profiles.models import UserProfile
+from werkzeug.local import LocalProxy
 
 from .config import WEKO_DEPOSIT_BIBLIOGRAPHIC_INFO, \
     WEKO_DEPOSIT_BIBLIOGRAPHIC_INFO_KEY, \
@@ -62,6 +67,7 @@ from .config import WEKO_DEPOSIT_BIBLIOGRAPHIC_INFO, \
 from .pidstore import get_latest_version_id, get_record_without_version, \
     weko_deposit_fetcher, weko_deposit_minter
 from .signals import item_created
+from .utils import get_file_content, is_pipeline_required
 
 PRESERVE_FIELDS = (
     '_deposit',
@@ -107,12 +113,68 @@ class WekoIndexer(RecordIndexer):
         self.es_doc_type = current_app.config['INDEXER_DEFAULT_DOCTYPE']
         self.file_doc_type = current_app.config['INDEXER_FILE_DOC_TYPE']
 
+    def _get_buffer(self):
+        """Get the bulk buffer of the current thread, if any."""
+        local = self.__dict__.setdefault('_local', threading.local())
+        return getattr(local, 'buffer', None)
+
+    @contextmanager
+    def buffered(self, chunk_size=None, thread_count=None):
+        """Collect the item uploads and updates and send them in bulk.
+
+        While the context is active, ``upload_metadata`` and
+        ``update_relation_version_is_last`` called from the same thread
+        append bulk actions to the buffer instead of calling Elasticsearch.
+        The actions are sent with :meth:`bulk` when the context exits
+        without error. Callers can drop the actions of a failed item by
+        truncating ``buffer['actions']``.
+
+        :param chunk_size: Number of actions per bulk request.
+        :param thread_count: Number of concurrent bulk requests.
+        :return: Buffer dict with the ``actions`` and, after the context
+            exits, the ``stats`` of the bulk requests.
+        """
+        buffer = self._get_buffer()
+        if buffer is not None:
+            yield buffer
+            return
+        buffer = dict(actions=[], stats=dict(success=0, conflict=0, error=0,
+                                             errors=[]))
+        self._local.buffer = buffer
+        try:
+            yield buffer
+        finally:
+            self._local.buffer = None
+        if buffer['actions']:
+            buffer['stats'] = self.bulk(buffer['actions'], chunk_size,
+                                        thread_count)
+
     def upload_metadata(self, jrc, item_id, revision_id):
         """Upload the item data to ElasticSearch.
 
         :param jrc:
         :param item_id: item id.
         """
+        buffer = self._get_buffer()
+        if buffer is not None:
+            self.get_es_index()
+            # The caller strips the file contents from jrc afterwards
+            body = dict(jrc)
+            if jrc.get('content'):
+                body['content'] = [dict(c) for c in jrc['content']]
+            action = {
+                '_op_type': 'index',
+                '_index': self.es_index,
+                '_type': self.es_doc_type,
+                '_id': str(item_id),
+                '_version': revision_id + 1,
+                '_version_type': self._version_type,
+                '_source': body
+            }
+            if is_pipeline_required(body.get('content')):
+                action['pipeline'] = 'item-file-pipeline'
+            buffer['actions'].append(action)
+            return
         # delete the item when it is exist
         # if self.client.exists(id=str(item_id), index=self.es_index,
         #                       doc_type=self.es_doc_type):
@@ -125,7 +187,8 @@ class WekoIndexer(RecordIndexer):
                          version_type=self._version_type,
                          body=jrc)
 
-        if 'content' in jrc:  # Only pass through pipeline if file exists
+        # Only pass through pipeline if a base64 encoded file exists
+        if is_pipeline_required(jrc.get('content')):
             full_body['pipeline'] = 'item-file-pipeline'
 
         self.client.index(**full_body)
@@ -161,6 +224,11 @@ class WekoIndexer(RecordIndexer):
         """Update relation version is_last."""
         self.get_es_index()
         pst = 'relation_version_is_last'
+        buffer = self._get_buffer()
+        if buffer is not None:
+            buffer['actions'].append(self._update_action(
+                version.get('id'), {pst: version.get('is_last')}))
+            return
         body = {'doc': {pst: version.get('is_last')}}
         return self.client.update(
             index=self.es_index,
@@ -203,6 +271,235 @@ class WekoIndexer(RecordIndexer):
         """
         self.get_es_index()
 
+    def bulk(self, actions, chunk_size=None, thread_count=None):
+        """Send actions to Elasticsearch using the bulk API.
+
+        Version conflicts are counted instead of raised: with external
+        versioning they mean a newer revision has already been indexed.
+
+        :param actions: Iterable of bulk actions.
+        :param chunk_size: Number of actions per bulk request.
+        :param thread_count: Number of concurrent bulk requests.
+        :return: Dict of success, conflict and error counts, with the
+            (document id, error) pairs of the failed actions in ``errors``.
+        """
+        config = current_app.config
+        kwargs = dict(
+            chunk_size=chunk_size or config[
+                'WEKO_DEPOSIT_BULK_INDEX_CHUNK_SIZE'],
+            raise_on_error=False,
+            raise_on_exception=False,
+            request_timeout=config['INDEXER_BULK_REQUEST_TIMEOUT']
+        )
+        thread_count = thread_count or config[
+            'WEKO_DEPOSIT_BULK_INDEX_THREAD_COUNT']
+        client = self.client
+        if isinstance(client, LocalProxy):
+            # The threads of parallel_bulk have no application context.
+            client = client._get_current_object()
+        if thread_count > 1:
+            # parallel_bulk consumes the actions from a worker thread, which
+            # has no application context: feed it windows built here so
+            # that actions can be generated lazily.
+            actions = iter(actions)
+            window = kwargs['chunk_size'] * thread_count
+            results = chain.from_iterable(
+                parallel_bulk(client, chunk, thread_count=thread_count,
+                              **kwargs)
+                for chunk in iter(lambda: list(islice(actions, window)), []))
+        else:
+            results = streaming_bulk(client, actions, **kwargs)
+
+        stats = dict(success=0, conflict=0, error=0, errors=[])
+        for ok, item in results:
+            if ok:
+                stats['success'] += 1
+                continue
+            info = next(iter(item.values()), {})
+            if info.get('status') == 409:
+                stats['conflict'] += 1
+            else:
+                stats['error'] += 1
+                stats['errors'].append((info.get('_id'), info.get('error')))
+                current_app.logger.error(
+                    'Failed to bulk index {0}: {1}'.format(
+                        info.get('_id'), info.get('error')))
+        return stats
+
+    def _record_index_action(self, record):
+        """Build the bulk index action of a record.
+
+        The document is built by the before_record_index receivers, in the
+        same way as the record is indexed by invenio-indexer.
+
+        :param record: Record instance.
+        """
+        arguments = {}
+        body = self._prepare_record(record, self.es_index, self.es_doc_type,
+                                    arguments)
+        action = {
+            '_op_type': 'index',
+            '_index': self.es_index,
+            '_type': self.es_doc_type,
+            '_id': str(record.id),
+            '_version': record.revision_id + 1,
+            '_version_type': self._version_type,
+            '_source': body
+        }
+        action.update(arguments)
+        return action
+
+    def _update_action(self, item_id, doc):
+        """Build the bulk partial update action of a document.
+
+        :param item_id: item id.
+        :param doc: Fields to update.
+        """
+        return {
+            '_op_type': 'update',
+            '_index': self.es_index,
+            '_type': self.es_doc_type,
+            '_id': str(item_id),
+            'retry_on_conflict': 3,
+            'doc': doc
+        }
+
+    def _record_index_actions(self, records, errors):
+        """Generate the bulk index actions of records.
+
+        :param records: Iterable of records.
+        :param errors: List the ids of the records that failed are added to.
+        """
+        for record in records:
+            try:
+                yield self._record_index_action(record)
+            except Exception:
+                errors.append(record.id)
+                current_app.logger.exception(
+                    'Failed to prepare record {0}.'.format(record.id))
+
+    def bulk_index_records(self, record_ids, chunk_size=None,
+                           thread_count=None):
+        """Index records using the bulk API.
+
+        The documents are built while they are sent, so that only one
+        window of bulk requests is held in memory at a time.
+
+        :param record_ids: List of record ids.
+        :param chunk_size: Number of actions per bulk request.
+        :param thread_count: Number of concurrent bulk requests.
+        :return: Dict of success, conflict and error counts.
+        """
+        self.get_es_index()
+        errors = []
+        stats = self.bulk(
+            self._record_index_actions(Record.get_records(record_ids),
+                                       errors),
+            chunk_size, thread_count)
+        stats['error'] += len(errors)
+        stats['errors'].extend((str(record_id), 'Failed to prepare record')
+                               for record_id in errors)
+        return stats
+
+    def _iter_record_id_batches(self, key, resume=False, batch_size=None):
+        """Iterate over the ids of the registered items in batches.
+
+        Records are read in batches ordered by id; the last id of each
+        batch is kept as a checkpoint once the batch has been processed, so
+        that an interrupted run can be resumed.
+
+        :param key: Cache key of the checkpoint.
+        :param resume: Start after the saved checkpoint.
+        :param batch_size: Number of record ids per batch.
+        :return: Generator of lists of record ids.
+        """
+        config = current_app.config
+        batch_size = batch_size or config['WEKO_DEPOSIT_BULK_INDEX_BATCH_SIZE']
+        last_id = current_cache.get(key) if resume else None
+        if not resume:
+            current_cache.delete(key)
+
+        pid = PersistentIdentifier
+        query = db.session.query(RecordMetadata.id).join(
+            pid, pid.object_uuid == RecordMetadata.id).filter(
+            pid.pid_type == 'recid',
+            pid.status == PIDStatus.REGISTERED,
+            RecordMetadata.json.isnot(None)).distinct()
+        while True:
+            batch = query
+            if last_id:
+                batch = batch.filter(RecordMetadata.id > last_id)
+            ids = [r.id for r in batch.order_by(
+                RecordMetadata.id).limit(batch_size)]
+            if not ids:
+                break
+            yield ids
+            last_id = ids[-1]
+            current_cache.set(
+                key, last_id,
+                timeout=config['WEKO_DEPOSIT_BULK_INDEX_CHECKPOINT_TTL'])
+            db.session.expunge_all()
+        current_cache.delete(key)
+
+    def bulk_reindex(self, resume=False, batch_size=None, chunk_size=None,
+                     thread_count=None):
+        """Reindex all registered items using the bulk API.
+
+        :param resume: Start after the saved checkpoint.
+        :param batch_size: Number of records loaded per batch.
+        :param chunk_size: Number of actions per bulk request.
+        :param thread_count: Number of concurrent bulk requests.
+        :return: Generator of the stats of each batch.
+        """
+        key = current_app.config['WEKO_DEPOSIT_BULK_INDEX_CHECKPOINT_KEY']
+        for ids in self._iter_record_id_batches(key, resume, batch_size):
+            yield self.bulk_index_records(ids, chunk_size, thread_count)
+
+    def bulk_update_publish_status(self, records, chunk_size=None,
+                                   thread_count=None):
+        """Update publish status of records using the bulk API.
+
+        :param records: Iterable of records.
+        :param chunk_size: Number of actions per bulk request.
+        :param thread_count: Number of concurrent bulk requests.
+        :return: Dict of success, conflict and error counts.
+        """
+        self.get_es_index()
+        pst = 'publish_status'
+        actions = (self._update_action(record.id, {pst: record.get(pst)})
+                   for record in records)
+        return self.bulk(actions, chunk_size, thread_count)
+
+    def bulk_sync_publish_status(self, resume=False, batch_size=None,
+                                 chunk_size=None, thread_count=None):
+        """Update publish status of all registered items using the bulk API.
+
+        :param resume: Start after the saved checkpoint.
+        :param batch_size: Number of records loaded per batch.
+        :param chunk_size: Number of actions per bulk request.
+        :param thread_count: Number of concurrent bulk requests.
+        :return: Generator of the stats of each batch.
+        """
+        key = current_app.config[
+            'WEKO_DEPOSIT_BULK_PUBLISH_STATUS_CHECKPOINT_KEY']
+        for ids in self._iter_record_id_batches(key, resume, batch_size):
+            yield self.bulk_update_publish_status(
+                Record.get_records(ids), chunk_size, thread_count)
+
+    def bulk_update_path_by_id(self, paths, chunk_size=None,
+                               thread_count=None):
+        """Update path of documents using the bulk API.
+
+        :param paths: List of (item id, path) pairs.
+        :return: Dict of success, conflict and error counts.
+        """
+        self.get_es_index()
+        updated = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat()
+        actions = [self._update_action(
+            item_id, {'path': path, '_updated': updated})
+            for item_id, path in paths]
+        return self.bulk(actions, chunk_size, thread_count)
+
     def delete(self, record):
         """Delete a record.
 
@@ -234,11 +531,12 @@ class WekoIndexer(RecordIndexer):
                                           body=search_query)
         return search_result.get('count')
 
-    def get_pid_by_es_scroll(self, path):
+    def get_pid_by_es_scroll(self, path, size=3000):
         """Get pid by es scroll.
 
         :param path:
-        :return: _scroll_id
+        :param size: Number of ids per page.
+        :return: Generator of the ids of each scroll page.
         """
         search_query = {
             "query": {
@@ -247,7 +545,7 @@ class WekoIndexer(RecordIndexer):
                 }
             },
             "_source": "_id",
-            "size": 3000
+            "size": size
         }
 
         def get_result(result):
@@ -266,11 +564,12 @@ class WekoIndexer(RecordIndexer):
         if search_result:
             res = get_result(search_result)
             scroll_id = search_result['_scroll_id']
-            if res:
+            while res:
                 yield res
-                while res:
-                    res = self.client.scroll(scroll_id=scroll_id, scroll='1m')
-                    yield res
+                search_result = self.client.scroll(scroll_id=scroll_id,
+                                                   scroll='1m')
+                scroll_id = search_result['_scroll_id']
+                res = get_result(search_result)
 
             self.client.clear_scroll(scroll_id=scroll_id)
 
@@ -626,17 +925,15 @@ class WekoDeposit(Deposit):
 
                             # upload file metadata to Elasticsearch
                             try:
-                                file_size_max = current_app.config[
-                                    'WEKO_MAX_FILE_SIZE_FOR_ES']
                                 mimetypes = current_app.config[
                                     'WEKO_MIMETYPE_WHITELIST_FOR_ES']
-                                if file.obj.file.size <= file_size_max and \
-                                        file.obj.mimetype in mimetypes:
-
-                                    content = lst.copy()
-                                    content.update(
-                                        {"file": file.obj.file.read_file(lst)})
-                                    contents.append(content)
+                                if file.obj.mimetype in mimetypes:
+                                    file_content = get_file_content(
+                                        file.obj.file, lst)
+                                    if file_content:
+                                        content = lst.copy()
+                                        content.update(file_content)
+                                        contents.append(content)
 
                             except Exception as e:
                                 abort(500, '{}'.format(str(e)))
@@ -704,8 +1001,7 @@ class WekoDeposit(Deposit):
 
         try:
             if not data:
-                datastore = RedisStore(redis.StrictRedis.from_url(
-                    current_app.config['CACHE_REDIS_URL']))
+                datastore = get_redis_store()
                 cache_key = current_app.config[
                     'WEKO_DEPOSIT_ITEMS_CACHE_PREFIX'].format(
                     pid_value=self.pid.pid_value)
@@ -789,28 +1085,73 @@ class WekoDeposit(Deposit):
                 self.jrc[description_key] = _new_description
 
     @classmethod
-    def delete_by_index_tree_id(cls, path):
-        """Delete by index tree id."""
-        # first update target pid when index tree id was deleted
-        # if cls.update_pid_by_index_tree_id(cls, path):
-        #    from .tasks import delete_items_by_id
-        #    delete_items_by_id.delay(path)
-        obj_ids = next(cls.indexer.get_pid_by_es_scroll(path))
-        try:
-            for obj_uuid in obj_ids:
-                r = RecordMetadata.query.filter_by(id=obj_uuid).first()
-                try:
-                    r.json['path'].remove(path)
-                    flag_modified(r, 'json')
-                except BaseException:
-                    pass
-                if not r.json['path']:
-                    from weko_records_ui.utils import soft_delete
-                    soft_delete(obj_uuid)
-            db.session.commit()
-        except Exception as ex:
-            db.session.rollback()
-            raise ex
+    def delete_by_index_tree_id(cls, path, progress_callback=None):
+        """Delete by index tree id.
+
+        Remove the path of the deleted index and of its sub indexes from the
+        items, one scroll page at a time, and soft delete the items which
+        no longer belong to any index. Each page is committed on its own
+        and items already processed no longer match the search, so a failed
+        run can simply be started again.
+
+        :param path: path of the deleted index.
+        :param progress_callback: Called with the number of processed and
+            deleted items after each page.
+        :return: The number of processed and deleted items.
+        """
+        batch_size = current_app.config['WEKO_DEPOSIT_INDEX_TREE_BATCH_SIZE']
+        sub_path = path + '/'
+        processed = deleted = 0
+        for obj_ids in cls.indexer.get_pid_by_es_scroll(path, batch_size):
+            dt = datetime.utcnow()
+            paths = []
+            orphans = []
+            try:
+                # Updated through the ORM so that the record versions are
+                # kept as for any other change of the records.
+                result = RecordMetadata.query.filter(
+                    RecordMetadata.id.in_(obj_ids))
+                for rec in result:
+                    if rec.json is None:
+                        continue
+                    old_path = rec.json.get('path') or []
+                    new_path = [p for p in old_path
+                                if str(p) != path
+                                and not str(p).startswith(sub_path)]
+                    if new_path != old_path:
+                        rec.json = dict(rec.json, path=new_path)
+                        flag_modified(rec, 'json')
+                    paths.append((rec.id, new_path))
+                    if not new_path:
+                        orphans.append(rec.id)
+                if orphans:
+                    pid = PersistentIdentifier
+                    pid.query.filter(
+                        pid.object_uuid.in_(orphans),
+                        pid.status != PIDStatus.DELETED).update(
+                        {pid.status: PIDStatus.DELETED, pid.updated: dt},
+                        synchronize_session=False)
+                db.session.commit()
+            except Exception as ex:
+                db.session.rollback()
+                raise ex
+            db.session.expunge_all()
+            cls.indexer.bulk_update_path_by_id(paths)
+            processed += len(paths)
+            deleted += len(orphans)
+            if progress_callback:
+                progress_callback(processed, deleted)
+        return processed, deleted
+
+    @classmethod
+    def delete_by_index_tree_id_task(cls, path):
+        """Delete by index tree id in a background task.
+
+        :param path: path of the deleted index.
+        :return: The identifier of the task.
+        """
+        from .tasks import delete_items_by_index_tree_id
+        return delete_items_by_index_tree_id.delay(path).id
 
     @classmethod
     def update_by_index_tree_id(cls, path, target):
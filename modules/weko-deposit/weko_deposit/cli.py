@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of WEKO3.
+# Copyright (C) 2017 National Institute of Informatics.
+#
+# WEKO3 is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# WEKO3 is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WEKO3; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+
+
+"""Command line interface creation kit."""
+import time
+
+import click
+from flask.cli import with_appcontext
+
+from .api import WekoIndexer
+
+
+@click.group()
+def weko_deposit():
+    """Weko deposit commands."""
+
+
+def _run_bulk(name, batches):
+    """Print the throughput and totals of a bulk operation."""
+    total = dict(success=0, conflict=0, error=0)
+    start = time.time()
+    for stats in batches:
+        for k in total:
+            total[k] += stats[k]
+        elapsed = time.time() - start
+        count = sum(total.values())
+        click.secho('{0} documents ({1:.1f} docs/sec)'.format(
+            count, count / elapsed if elapsed else 0))
+    elapsed = time.time() - start
+    click.secho('{0} finished in {1:.1f} sec: {2[success]} indexed, '
+                '{2[conflict]} version conflicts, {2[error]} errors'.format(
+                    name, elapsed, total),
+                fg='red' if total['error'] else 'green')
+
+
+def bulk_options(f):
+    """Add the options of the bulk commands."""
+    for option in reversed([
+        click.option('--batch-size', type=int, default=None,
+                     help='Number of records loaded per batch.'),
+        click.option('--chunk-size', type=int, default=None,
+                     help='Number of documents per bulk request.'),
+        click.option('--threads', type=int, default=None,
+                     help='Number of concurrent bulk requests.'),
+        click.option('--resume', is_flag=True, default=False,
+                     help='Resume from the last checkpoint.')
+    ]):
+        f = option(f)
+    return f
+
+
+@weko_deposit.command('reindex')
+@bulk_options
+@with_appcontext
+def reindex(batch_size, chunk_size, threads, resume):
+    """Reindex all items using the Elasticsearch bulk API."""
+    _run_bulk('reindex', WekoIndexer().bulk_reindex(
+        resume=resume, batch_size=batch_size, chunk_size=chunk_size,
+        thread_count=threads))
+
+
+@weko_deposit.command('publish-status')
+@bulk_options
+@with_appcontext
+def publish_status(batch_size, chunk_size, threads, resume):
+    """Update publish status of all items using the Elasticsearch bulk API."""
+    _run_bulk('publish status update', WekoIndexer().bulk_sync_publish_status(
+        resume=resume, batch_size=batch_size, chunk_size=chunk_size,
+        thread_count=threads))
@@ -40,6 +40,40 @@ WEKO_MIMETYPE_WHITELIST_FOR_ES = [
     'application/pdf',
 ]
 
+WEKO_DEPOSIT_FILE_TEXT_MAX_CHARS = 1000000
+"""Maximum number of characters of file text sent to Elasticsearch."""
+
+WEKO_DEPOSIT_FILE_TEXT_MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
+"""Maximum size of a file whose text is extracted for Elasticsearch."""
+
+WEKO_DEPOSIT_FILE_TEXT_CACHE_PREFIX = 'cache_file_text_{checksum}'
+"""Cache key of the text extracted from a file, per file checksum."""
+
+WEKO_DEPOSIT_FILE_TEXT_CACHE_TTL = 7 * 24 * 60 * 60
+"""Cache timeout of the text extracted from a file (7 days)."""
+
+WEKO_DEPOSIT_BULK_INDEX_CHUNK_SIZE = 500
+"""Number of documents sent to Elasticsearch per bulk request."""
+
+WEKO_DEPOSIT_BULK_INDEX_THREAD_COUNT = 1
+"""Number of concurrent bulk requests (1 sends them sequentially)."""
+
+WEKO_DEPOSIT_BULK_INDEX_BATCH_SIZE = 1000
+"""Number of records loaded from the database per reindex batch."""
+
+WEKO_DEPOSIT_BULK_INDEX_CHECKPOINT_KEY = 'weko_deposit_bulk_index_checkpoint'
+"""Cache key of the last record id processed by a full reindex."""
+
+WEKO_DEPOSIT_BULK_INDEX_CHECKPOINT_TTL = 7 * 24 * 60 * 60
+"""Cache timeout of the reindex and publish status checkpoints (7 days)."""
+
+WEKO_DEPOSIT_BULK_PUBLISH_STATUS_CHECKPOINT_KEY = \
+    'weko_deposit_bulk_publish_status_checkpoint'
+"""Cache key of the last record id processed by a publish status update."""
+
+WEKO_DEPOSIT_INDEX_TREE_BATCH_SIZE = 1000
+"""Number of items updated per transaction when an index is deleted."""
+
 FILES_REST_STORAGE_FACTORY = 'weko_deposit.storage.pyfs_storage_factory'
 """Import path of factory used to create a storage instance."""
 
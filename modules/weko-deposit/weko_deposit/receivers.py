@@ -10,6 +10,7 @@
 
 from .api import WekoDeposit
 from .pidstore import get_record_without_version
+from .utils import get_file_content, is_pipeline_required
 
 
 def append_file_content(sender, json=None, record=None, index=None, **kwargs):
@@ -28,8 +29,10 @@ def append_file_content(sender, json=None, record=None, index=None, **kwargs):
     contents = []
     for f in files:
         content = f.obj.file.json
-        content.update({"file": f.obj.file.read_file(content)})
-        contents.append(content)
+        file_content = get_file_content(f.obj.file, content)
+        if file_content:
+            content.update(file_content)
+            contents.append(content)
     json['content'] = contents
-    if contents:
+    if is_pipeline_required(contents):
         kwargs['arguments']['pipeline'] = 'item-file-pipeline'
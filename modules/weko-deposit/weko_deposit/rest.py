@@ -190,10 +190,8 @@ class ItemResource(ContentNegotiatedMethodView):
             pid = kwargs.get('pid_value').value
 
             # item metadata cached on Redis by pid
-            import redis
-            from simplekv.memory.redisstore import RedisStore
-            datastore = RedisStore(redis.StrictRedis.from_url(
-                current_app.config['CACHE_REDIS_URL']))
+            from weko_records.redis_client import get_redis_store
+            datastore = get_redis_store()
             cache_key = current_app.config[
                 'WEKO_DEPOSIT_ITEMS_CACHE_PREFIX'].format(pid_value=pid)
             ttl_sec = int(current_app.config['WEKO_DEPOSIT_ITEMS_CACHE_TTL'])
@@ -20,7 +20,7 @@
 
 """Weko Deposit celery tasks."""
 
-from celery import shared_task
+from celery import current_task, shared_task, states
 from celery.utils.log import get_task_logger
 from elasticsearch.exceptions import TransportError
 from flask import current_app
@@ -61,35 +61,88 @@ def delete_items_by_id(p_path):
         delete_items_by_id.retry(countdown=5, exc=e, max_retries=1)
 
 
+def delete_progress_updater(processed, deleted):
+    """Progress reporter for item deletion by index."""
+    current_task.update_state(
+        state=states.state('PROGRESS'),
+        meta=dict(processed=processed, deleted=deleted)
+    )
+
+
+@shared_task
+def delete_items_by_index_tree_id(p_path):
+    """Remove the deleted index from its items.
+
+    :param p_path: path of the deleted index.
+    :return: The number of processed and deleted items.
+    """
+    current_app.logger.debug('index delete task is running.')
+    try:
+        processed, deleted = WekoDeposit.delete_by_index_tree_id(
+            p_path, progress_callback=delete_progress_updater)
+        current_app.logger.info(
+            'index {0} removed from {1} items, {2} items deleted.'.format(
+                p_path, processed, deleted))
+        return dict(processed=processed, deleted=deleted)
+    except (SQLAlchemyError, TransportError) as e:
+        current_app.logger. \
+            exception('Failed to remove items for index delete. err:{0}'.
+                      format(e))
+        delete_items_by_index_tree_id.retry(countdown=5, exc=e,
+                                            max_retries=3)
+
+
 @shared_task(ignore_result=True)
 def update_items_by_id(p_path, target):
-    """Update item by id."""
+    """Update item by id.
+
+    The items are loaded, committed and sent to Elasticsearch in batches of
+    ``WEKO_DEPOSIT_BULK_INDEX_BATCH_SIZE`` records, so that only one batch
+    is held in memory at a time.
+    """
     current_app.logger.debug('index update task is running.')
+    batch_size = current_app.config['WEKO_DEPOSIT_BULK_INDEX_BATCH_SIZE']
+    query = db.session.query(RecordMetadata).filter(
+        RecordMetadata.json.op('->>')('path').contains(p_path))
+    last_id = None
     try:
-        result = db.session.query(RecordMetadata). filter(
-            RecordMetadata.json.op('->>')('path').contains(p_path)).yield_per(1000)
-        with db.session.begin_nested():
-            for r in result:
-                obj = WekoDeposit(r.json, r)
-                path = obj.get('path')
-                if isinstance(path, list):
-                    new_path_lst = []
-                    for p in path:
-                        if p_path in p:
-                            p = p.replace(p_path, target)
-                            p = p[1:] if p.startswith('/') else p
-                            new_path_lst.append(p)
-                        else:
-                            new_path_lst.append(p)
-                    del path
-                    obj['path'] = new_path_lst
-                obj.update_item_by_task()
-                try:
-                    obj.indexer.update_path(obj, False)
-                except TransportError:
-                    current_app.logger.exception(
-                        'Could not updated index {0}.'.format(result))
-        db.session.commit()
+        while True:
+            batch = query
+            if last_id:
+                batch = batch.filter(RecordMetadata.id > last_id)
+            batch = batch.order_by(RecordMetadata.id).limit(batch_size).all()
+            if not batch:
+                break
+            paths = []
+            with db.session.begin_nested():
+                for r in batch:
+                    obj = WekoDeposit(r.json, r)
+                    path = obj.get('path')
+                    if isinstance(path, list):
+                        new_path_lst = []
+                        for p in path:
+                            if p_path in p:
+                                p = p.replace(p_path, target)
+                                p = p[1:] if p.startswith('/') else p
+                                new_path_lst.append(p)
+                            else:
+                                new_path_lst.append(p)
+                        del path
+                        obj['path'] = new_path_lst
+                    obj.update_item_by_task()
+                    paths.append((r.id, obj.get('path')))
+            db.session.commit()
+            last_id = batch[-1].id
+            try:
+                stats = WekoDeposit.indexer.bulk_update_path_by_id(paths)
+                if stats['error']:
+                    current_app.logger.error(
+                        'Could not updated index of {0} items.'.format(
+                            stats['error']))
+            except TransportError:
+                current_app.logger.exception(
+                    'Could not updated index {0}.'.format(p_path))
+            db.session.expunge_all()
     except SQLAlchemyError as e:
         db.session.rollback()
         current_app.logger. \
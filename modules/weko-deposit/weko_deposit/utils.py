@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of WEKO3.
+# Copyright (C) 2017 National Institute of Informatics.
+#
+# WEKO3 is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# WEKO3 is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WEKO3; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+
+"""Utilities for weko-deposit."""
+
+from flask import current_app
+from invenio_cache import current_cache
+from invenio_files_rest.errors import StorageError
+
+
+def get_file_content(file_instance, fjson):
+    """Get the content of a file to send to Elasticsearch.
+
+    The plain text of a text file or PDF is extracted by streaming it (page
+    by page for PDFs) and cached per file checksum, so that an unchanged file
+    is never extracted again when its record is re-indexed. The other files,
+    and the ones whose text cannot be extracted, are sent base64 encoded to
+    the ``item-file-pipeline`` as before. A file that cannot be read is
+    skipped.
+
+    :param file_instance: The :class:`invenio_files_rest.models.FileInstance`.
+    :param fjson: File metadata.
+    :return: Dictionary to update the content entry with, or None.
+    """
+    config = current_app.config
+    cache_key = None
+    if file_instance.checksum:
+        cache_key = config['WEKO_DEPOSIT_FILE_TEXT_CACHE_PREFIX'].format(
+            checksum=file_instance.checksum)
+        text = current_cache.get(cache_key)
+        if text is not None:
+            return {'attachment': {'content': text}}
+
+    if file_instance.size <= config['WEKO_DEPOSIT_FILE_TEXT_MAX_FILE_SIZE']:
+        try:
+            text = file_instance.read_text(
+                fjson, max_chars=config['WEKO_DEPOSIT_FILE_TEXT_MAX_CHARS'])
+        except StorageError as e:
+            current_app.logger.warning(e)
+            text = None
+        if text is not None:
+            if cache_key:
+                current_cache.set(
+                    cache_key, text,
+                    timeout=config['WEKO_DEPOSIT_FILE_TEXT_CACHE_TTL'])
+            return {'attachment': {'content': text}}
+
+    if file_instance.size <= config['WEKO_MAX_FILE_SIZE_FOR_ES']:
+        try:
+            return {'file': file_instance.read_file(fjson)}
+        except StorageError as e:
+            current_app.logger.error(e)
+    return None
+
+
+def is_pipeline_required(contents):
+    """Check whether the file contents must go through the ingest pipeline.
+
+    :param contents: The file content entries of a record.
+    :return: True if a content still holds a base64 encoded file.
+    """
+    return any('file' in content for content in contents or [])
@@ -97,3 +97,47 @@ WEKO_GRIDLAYOUT_WIDGET_CACHE_KEY = "widget_cache"
 
 WEKO_GRIDLAYOUT_WIDGET_PAGE_CACHE_KEY = "widget_page_cache"
 """The Page cache key"""
+
+WEKO_GRIDLAYOUT_WIDGET_CACHE_TTL = 24 * 60 * 60
+"""Cache timeout of the widget design responses.
+
+Invalidated responses are left behind by a version change and expire after
+this timeout.
+"""
+
+WEKO_GRIDLAYOUT_NEW_ARRIVALS_VERSION_KEY = \
+    'weko_gridlayout_new_arrivals_version'
+"""Cache key of the version of the new arrivals, changed on record updates."""
+
+WEKO_GRIDLAYOUT_NEW_ARRIVALS_CACHE_KEY = \
+    'weko_gridlayout_new_arrivals_{version}_{kind}_{params}'
+"""Cache key of the new arrivals widget data and RSS."""
+
+WEKO_GRIDLAYOUT_NEW_ARRIVALS_CACHE_TTL = 5 * 60
+"""Cache timeout of the new arrivals widget data and RSS."""
+
+WEKO_GRIDLAYOUT_NEW_ARRIVALS_MAX_SIZE = 10000
+"""Maximum number of new arrivals fetched from Elasticsearch."""
+
+WEKO_GRIDLAYOUT_NEW_ARRIVALS_WIDGET_SOURCE = [
+    '_item_metadata.item_title',
+    '_item_metadata.control_number',
+    'publish_date',
+]
+"""Source fields fetched for the new arrivals widget."""
+
+WEKO_GRIDLAYOUT_NEW_ARRIVALS_RSS_SOURCE = [
+    '_item_metadata',
+    '_updated',
+    'creator',
+    'publisher',
+    'sourceTitle',
+    'sourceIdentifier',
+    'volume',
+    'issue',
+    'pageStart',
+    'pageEnd',
+    'date',
+    'description',
+]
+"""Source fields fetched for the new arrivals RSS."""
@@ -10,9 +10,12 @@
 from __future__ import absolute_import, print_function
 
 from flask_babelex import gettext as _
+from invenio_records.signals import after_record_delete, \
+    after_record_insert, after_record_update
 from werkzeug.exceptions import NotFound
 
 from . import config
+from .utils import update_new_arrivals_version
 from .views import handle_not_found
 
 
@@ -35,6 +38,11 @@ class WekoGridLayout(object):
 
         app.extensions['weko-gridlayout'] = self
 
+        # Invalidate the cached new arrivals when records change
+        for signal in (after_record_insert, after_record_update,
+                       after_record_delete):
+            signal.connect(update_new_arrivals_version)
+
         # For widget pages
         app.register_error_handler(404, lambda error:
                                    handle_not_found(
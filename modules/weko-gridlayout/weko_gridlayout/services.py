@@ -25,6 +25,7 @@ from datetime import date, timedelta
 
 from flask import Markup, current_app
 from flask_babelex import gettext as _
+from invenio_cache import current_cache
 from invenio_db import db
 from invenio_i18n.ext import current_i18n
 from sqlalchemy.exc import IntegrityError
@@ -38,8 +39,9 @@ from .models import WidgetDesignPage, WidgetDesignPageMultiLangData, \
 from .utils import build_data, build_multi_lang_data, build_rss_xml, \
     convert_data_to_design_pack, convert_data_to_edit_pack, \
     convert_widget_data_to_dict, convert_widget_multi_lang_to_dict, \
-    delete_widget_cache, get_elasticsearch_result_by_date, \
-    update_general_item, validate_main_widget_insertion
+    delete_widget_cache, get_new_arrivals_cache_key, \
+    get_new_arrivals_result, update_general_item, \
+    validate_main_widget_insertion
 
 
 class WidgetItemServices:
@@ -1013,7 +1015,6 @@ class WidgetDataLoaderServices:
             result['error'] = 'Widget is not exist'
             return result
         try:
-            data = list()
             widget = WidgetItemServices.get_widget_data_by_widget_id(widget_id)
             setting = widget.get('settings')
             if not setting:
@@ -1030,19 +1031,28 @@ class WidgetDataLoaderServices:
                 term = int(new_date)
             except Exception:
                 term = 0
+            key = get_new_arrivals_cache_key(
+                'widget', index_id=0, term=term, count=int(number_result),
+                lang=current_i18n.language)
+            data = current_cache.get(key)
+            if data is not None:
+                result['data'] = data
+                return result
+            data = list()
             current_date = date.today()
             end_date = current_date.strftime("%Y-%m-%d")
             start_date = (current_date - timedelta(days=term)).strftime(
                 "%Y-%m-%d")
-            rd = get_elasticsearch_result_by_date(start_date, end_date)
-            hits = rd.get('hits')
+            rd = get_new_arrivals_result(
+                start_date, end_date, int(number_result),
+                current_app.config[
+                    'WEKO_GRIDLAYOUT_NEW_ARRIVALS_WIDGET_SOURCE'])
+            hits = rd.get('hits') if rd else None
             if not hits:
                 result['error'] = 'Cannot search data'
                 return result
             es_data = hits.get('hits')
             for es_item in es_data:
-                if len(data) >= int(number_result):
-                    break
                 new_data = dict()
                 source = es_item.get('_source')
                 if not source:
@@ -1054,6 +1064,8 @@ class WidgetDataLoaderServices:
                 new_data['url'] = '/records/' + item_metadata.get(
                     'control_number')
                 data.append(new_data)
+            current_cache.set(key, data, timeout=current_app.config[
+                'WEKO_GRIDLAYOUT_NEW_ARRIVALS_CACHE_TTL'])
             result['data'] = data
         except Exception as e:
             result['error'] = str(e)
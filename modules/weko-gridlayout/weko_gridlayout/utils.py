@@ -21,18 +21,18 @@
 """Utilities for convert response json."""
 import copy
 import gzip
+import hashlib
 import json
+import uuid
 import xml.etree.ElementTree as Et
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from io import BytesIO
 from xml.etree.ElementTree import tostring
 
-import redis
 from elasticsearch.exceptions import NotFoundError
 from flask import Markup, Response, current_app, jsonify, request
 from invenio_cache import current_cache
 from invenio_search import RecordsSearch
-from simplekv.memory.redisstore import RedisStore
 from sqlalchemy import asc
 from weko_admin.models import AdminLangSettings
 from weko_index_tree.api import Indexes
@@ -777,6 +777,110 @@ def get_elasticsearch_result_by_date(start_date, end_date):
     return result
 
 
+def get_new_arrivals_result(start_date, end_date, size, includes=None,
+                            index_ids=None):
+    """Get the newest published items from elastic search.
+
+    Arguments:
+        start_date {string} -- start date
+        end_date {string} -- end date
+        size {int} -- number of items
+        includes {list} -- source fields to return
+        index_ids {list} -- index tree paths to search in
+
+    Returns:
+        dictionary -- elastic search data
+
+    """
+    records_search = RecordsSearch()
+    records_search = records_search.with_preference_param().params(
+        version=False)
+    records_search._index[0] = current_app.config['SEARCH_UI_SEARCH_INDEX']
+    size = min(size, current_app.config[
+        'WEKO_GRIDLAYOUT_NEW_ARRIVALS_MAX_SIZE'])
+    result = None
+    try:
+        search_instance, _qs_kwargs = item_search_factory(
+            None, records_search, start_date, end_date, index_ids)
+        search_instance = search_instance.extra(size=size)
+        if includes:
+            search_instance = search_instance.source(includes=includes)
+        search_result = search_instance.execute()
+        result = search_result.to_dict()
+    except NotFoundError:
+        current_app.logger.debug('Indexes do not exist yet!')
+
+    return result
+
+
+def update_new_arrivals_version(*args, **kwargs):
+    """Invalidate the cached new arrivals on record changes."""
+    current_cache.set(
+        current_app.config['WEKO_GRIDLAYOUT_NEW_ARRIVALS_VERSION_KEY'],
+        uuid.uuid4().hex, timeout=0)
+
+
+def get_new_arrivals_cache_key(kind, **params):
+    """Get the cache key of new arrivals data.
+
+    Arguments:
+        kind {string} -- kind of the cached data
+        params -- parameters the data depends on
+
+    Returns:
+        string -- cache key
+
+    """
+    params.update(date=date.today().isoformat(),
+                  root_url=request.url_root)
+    return current_app.config['WEKO_GRIDLAYOUT_NEW_ARRIVALS_CACHE_KEY'].format(
+        version=current_cache.get(current_app.config[
+            'WEKO_GRIDLAYOUT_NEW_ARRIVALS_VERSION_KEY']) or 0,
+        kind=kind,
+        params=hashlib.sha1(json.dumps(
+            params, sort_keys=True).encode('utf-8')).hexdigest())
+
+
+def get_new_arrivals_rss(term, count, lang, index_id=0, page=1,
+                         index_ids=None):
+    """Get the new arrivals RSS, cached per index, term, count and language.
+
+    Arguments:
+        term {int} -- number of days
+        count {int} -- number of items per page
+        lang {string} -- language
+        index_id {int} -- index identifier
+        page {int} -- page
+        index_ids {list} -- index tree paths to search in
+
+    Returns:
+        xml response -- RSS data as XML
+
+    """
+    key = get_new_arrivals_cache_key('rss', index_id=index_id, page=page,
+                                     term=term, count=count, lang=lang)
+    cached = current_cache.get(key)
+    if cached is None:
+        end_date = date.today()
+        start_date = end_date - timedelta(days=term)
+        rd = get_new_arrivals_result(
+            start_date.strftime('%Y-%m-%d'),
+            end_date.strftime('%Y-%m-%d'),
+            page * count,
+            current_app.config['WEKO_GRIDLAYOUT_NEW_ARRIVALS_RSS_SOURCE'],
+            index_ids)
+        rss_data = rd.get('hits', {}).get('hits') if rd else None
+        if not rss_data and not index_id:
+            count = 0
+        response = build_rss_xml(data=rss_data, index_id=index_id,
+                                 page=page, count=count, term=term,
+                                 lang=lang)
+        cached = (response.get_data(), response.mimetype)
+        current_cache.set(key, cached, timeout=current_app.config[
+            'WEKO_GRIDLAYOUT_NEW_ARRIVALS_CACHE_TTL'])
+    return Response(cached[0], mimetype=cached[1])
+
+
 # Validation
 def validate_main_widget_insertion(repository_id, new_settings, page_id=0):
     """Validate that no page or main layout contains main widget."""
@@ -882,20 +986,52 @@ def get_widget_design_setting(repository_id, current_language, page_id=None):
         return jsonify(widget_setting_data)
 
     if validate_response() and current_language:
-        if page_id:
-            key = (config.WEKO_GRIDLAYOUT_WIDGET_PAGE_CACHE_KEY
-                   + repository_id + "_" + page_id + "_" + current_language)
-        else:
-            key = (config.WEKO_GRIDLAYOUT_WIDGET_CACHE_KEY
-                   + repository_id + "_" + current_language)
-        if current_cache.get(key) is None:
-            data = compress_widget_response(get_widget_response(page_id))
-            current_cache.set(key, data)
-            return data
-        else:
-            return current_cache.get(key)
+        key = get_widget_cache_key(repository_id, current_language, page_id)
+        response = current_cache.get(key)
+        if response is None:
+            response = compress_widget_response(get_widget_response(page_id))
+            current_cache.set(
+                key, response,
+                timeout=current_app.config['WEKO_GRIDLAYOUT_WIDGET_CACHE_TTL'])
     else:
-        return get_widget_response(page_id)
+        response = get_widget_response(page_id)
+        response.add_etag()
+    return response.make_conditional(request)
+
+
+def get_widget_cache_version_key(repository_id, page_id=None):
+    """Get the key of the cache version of a repository or page design.
+
+    @param repository_id: The repository identifier
+    @param page_id: The Page identifier
+    @return: The version key
+    """
+    if page_id:
+        return (config.WEKO_GRIDLAYOUT_WIDGET_PAGE_CACHE_KEY
+                + "_version_" + str(page_id))
+    return (config.WEKO_GRIDLAYOUT_WIDGET_CACHE_KEY
+            + "_version_" + str(repository_id))
+
+
+def get_widget_cache_key(repository_id, current_language, page_id=None):
+    """Get the cache key of a widget design setting response.
+
+    The key contains the current version of the repository or page design,
+    so bumping the version invalidates every cached language at once.
+
+    @param repository_id: The repository identifier
+    @param current_language: The current language
+    @param page_id: The Page identifier
+    @return: The cache key
+    """
+    version = current_cache.get(
+        get_widget_cache_version_key(repository_id, page_id)) or 0
+    if page_id:
+        return (config.WEKO_GRIDLAYOUT_WIDGET_PAGE_CACHE_KEY
+                + repository_id + "_" + str(page_id) + "_" + str(version)
+                + "_" + current_language)
+    return (config.WEKO_GRIDLAYOUT_WIDGET_CACHE_KEY
+            + repository_id + "_" + str(version) + "_" + current_language)
 
 
 def compress_widget_response(response):
@@ -908,30 +1044,27 @@ def compress_widget_response(response):
     gzip_file = gzip \
         .GzipFile(mode='wb',
                   compresslevel=config.WEKO_GRIDLAYOUT_COMPRESS_LEVEL,
-                  fileobj=gzip_buffer)
+                  fileobj=gzip_buffer, mtime=0)
     gzip_file.write(response.get_data())
     gzip_file.close()
     response.set_data(gzip_buffer.getvalue())
     response.headers['Content-Encoding'] = 'gzip'
     response.headers['Content-Length'] = len(response.get_data())
+    response.vary.add('Accept-Encoding')
+    response.add_etag()
     return response
 
 
 def delete_widget_cache(repository_id, page_id=None):
     """Delete widget cache.
 
+    The cached responses are not deleted one by one: the version of the
+    repository or page design is changed so the old keys are no longer used
+    and expire by themselves.
+
     @param repository_id: The repository identifier
     @param page_id: The Page identifier
     @return:
     """
-    cache_store = RedisStore(redis.StrictRedis.from_url(
-        current_app.config['CACHE_REDIS_URL']))
-    if page_id:
-        cache_key = ("*" + config.WEKO_GRIDLAYOUT_WIDGET_PAGE_CACHE_KEY
-                     + repository_id + "_" + page_id + "_*")
-    else:
-        cache_key = ("*" + config.WEKO_GRIDLAYOUT_WIDGET_CACHE_KEY
-                     + repository_id + "_*")
-
-    for key in cache_store.redis.scan_iter(cache_key):
-        cache_store.redis.delete(key)
+    current_cache.set(get_widget_cache_version_key(repository_id, page_id),
+                      uuid.uuid4().hex, timeout=0)
@@ -9,13 +9,14 @@
 from __future__ import absolute_import, print_function
 
 import json
-from datetime import date, timedelta
+from datetime import date
 
 import six
 from flask import Blueprint, abort, current_app, jsonify, render_template, \
     request
 from flask_babelex import gettext as _
 from flask_login import login_required
+from invenio_i18n.ext import current_i18n
 from invenio_stats.utils import QueryCommonReportsHelper
 from sqlalchemy.orm.exc import NoResultFound
 from weko_theme.utils import get_community_id, get_weko_contents
@@ -26,7 +27,7 @@ from .config import WEKO_GRIDLAYOUT_ACCESS_COUNTER_TYPE
 from .models import WidgetDesignPage
 from .services import WidgetDataLoaderServices, WidgetDesignPageServices, \
     WidgetDesignServices, WidgetItemServices
-from .utils import get_default_language, get_elasticsearch_result_by_date, \
+from .utils import get_default_language, get_new_arrivals_rss, \
     get_system_language, get_widget_design_setting, get_widget_type_list
 
 from invenio_oauth2server import require_api_auth, require_oauth_scopes
@@ -354,11 +355,7 @@ def get_rss_data():
         term = -1
     if term < 0 or count < 0:
         return WidgetDataLoaderServices.get_arrivals_rss(None, 0, 0)
-    current_date = date.today()
-    end_date = current_date.strftime("%Y-%m-%d")
-    start_date = (current_date - timedelta(days=term)).strftime("%Y-%m-%d")
-    rd = get_elasticsearch_result_by_date(start_date, end_date)
-    return WidgetDataLoaderServices.get_arrivals_rss(rd, term, count)
+    return get_new_arrivals_rss(term, count, current_i18n.language)
 
 
 @blueprint_api.route('/get_page_endpoints/<int:widget_id>', methods=['GET'])
@@ -82,6 +82,9 @@ setup(
     include_package_data=True,
     platforms='any',
     entry_points={
+        'flask.commands': [
+            'index_tree = weko_index_tree.cli:index_tree',
+        ],
         'invenio_base.apps': [
             'weko_index_tree = weko_index_tree:WekoIndexTree',
         ],
@@ -20,12 +20,19 @@
 
 """Pytest configuration."""
 
+import os
 import shutil
 import tempfile
 
 import pytest
 from flask import Flask
 from flask_babelex import Babel
+from invenio_db import InvenioDB
+from invenio_db import db as db_
+from sqlalchemy_utils.functions import create_database, database_exists, \
+    drop_database
+
+from weko_index_tree.models import Index, IndexPath, IndexTreeVersion
 
 
 @pytest.yield_fixture()
@@ -53,3 +60,24 @@ def app(base_app):
     """Flask application fixture."""
     with base_app.app_context():
         yield base_app
+
+
+@pytest.yield_fixture()
+def db_app(base_app):
+    """Flask application fixture with the index tables."""
+    base_app.config.update(
+        SQLALCHEMY_DATABASE_URI=os.getenv('SQLALCHEMY_DATABASE_URI',
+                                          'sqlite://'),
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    InvenioDB(base_app)
+    with base_app.app_context():
+        if str(db_.engine.url) != 'sqlite://' and \
+                not database_exists(str(db_.engine.url)):
+            create_database(str(db_.engine.url))
+        db_.metadata.create_all(db_.engine, tables=[
+            Index.__table__, IndexPath.__table__,
+            IndexTreeVersion.__table__])
+        yield base_app
+        db_.session.remove()
+        drop_database(str(db_.engine.url))
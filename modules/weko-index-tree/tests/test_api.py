@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of WEKO3.
+# Copyright (C) 2017 National Institute of Informatics.
+#
+# WEKO3 is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# WEKO3 is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WEKO3; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+
+"""Index path tests."""
+
+import pytest
+from invenio_db import db
+
+from weko_index_tree.api import Indexes
+from weko_index_tree.models import Index, IndexPath
+
+
+@pytest.fixture()
+def indexes(db_app):
+    """Create the index tree 1/2/3 without its paths."""
+    Indexes._index_path_built = False
+    db.session.add_all([
+        Index(id=1, parent=0, position=0, index_name='a',
+              index_name_english='A', public_state=True),
+        Index(id=2, parent=1, position=0, index_name='b',
+              index_name_english='B', public_state=True),
+        Index(id=3, parent=2, position=0, index_name='c',
+              index_name_english='C', public_state=True),
+    ])
+    db.session.commit()
+    yield
+    Indexes._index_path_built = False
+
+
+def test_lookup_before_rebuild(indexes):
+    """Test the path lookups fall back while index_path is empty."""
+    assert IndexPath.query.count() == 0
+    assert not Indexes.is_index_path_built()
+
+    path = Indexes.get_self_path(3)
+    assert path.path == '1/2/3'
+    assert path.name_en == 'A/B/C'
+    assert sorted(x.path for x in Indexes.get_path_list([1, 3])) == \
+        ['1', '1/2/3']
+
+
+def test_rebuild_index_path(indexes):
+    """Test the paths are read from index_path once built."""
+    assert Indexes.rebuild_index_path() == 3
+    db.session.commit()
+
+    assert Indexes.is_index_path_built()
+    path = Indexes.get_self_path(3)
+    assert isinstance(path, IndexPath)
+    assert path.path == '1/2/3'
+    assert path.ancestors == [1, 2]
+
+
+def test_lookup_missing_path(indexes):
+    """Test the lookups fall back for the paths missing from index_path."""
+    Indexes.rebuild_index_path()
+    IndexPath.query.filter_by(cid=3).delete()
+    db.session.commit()
+
+    assert Indexes.get_self_path(3).path == '1/2/3'
+    assert sorted(x.path for x in Indexes.get_path_list([2, 3])) == \
+        ['1/2', '1/2/3']
+
+
+def test_refresh_builds_index_path(indexes):
+    """Test the first change of the tree builds all the paths."""
+    db.session.add(Index(id=4, parent=3, position=0, index_name='d',
+                         index_name_english='D'))
+    Indexes.refresh_index_path(4)
+    db.session.commit()
+
+    assert IndexPath.query.count() == 4
+    assert IndexPath.query.get(4).path == '1/2/3/4'
@@ -35,15 +35,17 @@ from sqlalchemy.orm.attributes import flag_modified
 from sqlalchemy.sql.expression import func, literal_column
 from weko_groups.api import Group
 
-from .models import Index
-from .utils import cached_index_tree_json, filter_index_list_by_role, \
-    get_index_id_list, get_publish_index_id_list, get_tree_json, \
-    get_user_roles, reset_tree
+from .models import Index, IndexPath, IndexTreeVersion
+from .utils import cached_browsing_tree_paths, cached_index_tree_json, \
+    filter_index_list_by_role, get_index_id_list, get_publish_index_id_list, \
+    get_tree_json, get_tree_path_prefixes, get_user_roles, reset_tree
 
 
 class Indexes(object):
     """Define API for index tree creation and update."""
 
+    _index_path_built = False
+
     @classmethod
     def create(cls, pid=None, indexes=None):
         """Create the indexes. Delete all indexes before creation.
@@ -56,6 +58,8 @@ class Indexes(object):
             with db.session.begin_nested():
                 index = Index(**data)
                 db.session.add(index)
+                cls.refresh_index_path(index.id)
+                IndexTreeVersion.increase()
             db.session.commit()
 
         if not isinstance(indexes, dict):
@@ -203,6 +207,8 @@ class Indexes(object):
 
                 index.owner_user_id = current_user.get_id()
                 db.session.merge(index)
+                cls.refresh_index_path(index_id)
+                IndexTreeVersion.increase()
             db.session.commit()
             return index
         except Exception as ex:
@@ -225,6 +231,8 @@ class Indexes(object):
                     if not slf:
                         return
 
+                    children = db.session.query(Index.id).filter(
+                        Index.parent == index_id).all()
                     dct = db.session.query(Index).filter(
                         Index.parent == index_id). \
                         update({Index.parent: slf.parent,
@@ -232,6 +240,11 @@ class Indexes(object):
                                 Index.updated: datetime.utcnow()},
                                synchronize_session='fetch')
                     db.session.delete(slf)
+                    IndexPath.query.filter_by(cid=index_id). \
+                        delete(synchronize_session=False)
+                    for child in children:
+                        cls.refresh_index_path(child.id)
+                    IndexTreeVersion.increase()
                     db.session.commit()
                     return dct
             else:
@@ -264,6 +277,10 @@ class Indexes(object):
                             dct = db.session.query(Index).filter(
                                 Index.id.in_(p_lst[s:e])). \
                                 delete(synchronize_session='fetch')
+                            IndexPath.query.filter(
+                                IndexPath.cid.in_(p_lst[s:e])). \
+                                delete(synchronize_session=False)
+                        IndexTreeVersion.increase()
                     db.session.commit()
                     return dct
         except Exception as ex:
@@ -298,7 +315,10 @@ class Indexes(object):
             result = cls.delete(index_id)
             if result is not None:
                 # delete indexes all
-                WekoDeposit.delete_by_index_tree_id(path)
+                task_id = WekoDeposit.delete_by_index_tree_id_task(path)
+                current_app.logger.info(
+                    'Items of index {0} are deleted by task {1}.'.format(
+                        index_id, task_id))
         return result
 
     @classmethod
@@ -315,6 +335,9 @@ class Indexes(object):
                     index.parent = parent
                     flag_modified(index, 'parent')
                 db.session.merge(index)
+                if parent:
+                    cls.refresh_index_path(index_id)
+                IndexTreeVersion.increase()
             db.session.commit()
 
         is_ok = True
@@ -394,6 +417,7 @@ class Indexes(object):
                                     nid.position = i
                                     nid.owner_user_id = user_id
                                     db.session.add(nid)
+                                IndexTreeVersion.increase()
                             db.session.commit()
                         except Exception as ex:
                             is_ok = False
@@ -468,8 +492,29 @@ class Indexes(object):
 
     @classmethod
     def get_browsing_tree_paths(cls, pid=0):
-        """Get browsing tree paths."""
-        return get_index_id_list(cls.get_browsing_tree(pid), [])
+        """Get browsing tree paths.
+
+        The paths are cached per tree version and per role set of the
+        current user.
+        """
+        return cached_browsing_tree_paths(
+            'paths', pid,
+            lambda: get_index_id_list(cls.get_browsing_tree(pid), []))
+
+    @classmethod
+    def get_browsing_tree_path_prefixes(cls):
+        """Get browsing tree paths grouped by fully browsable subtrees.
+
+        :return: Tuple of the paths whose whole subtree is browsable and the
+            other browsable paths.
+        """
+        def _get_prefixes():
+            all_paths = [x.path for x in cls._query_paths(
+                lambda query, t: db.session.query(t.path))]
+            return get_tree_path_prefixes(cls.get_browsing_tree_paths(),
+                                          all_paths)
+
+        return tuple(cached_browsing_tree_paths('prefixes', 0, _get_prefixes))
 
     @classmethod
     def get_contribute_tree(cls, pid, root_node_id=0):
@@ -656,9 +701,9 @@ class Indexes(object):
         :param node_lst: Identifier list of the index.
         :return: the list of index.
         """
-        recursive_t = cls.recs_query()
-        q = db.session.query(recursive_t).filter(
-            recursive_t.c.cid.in_(node_lst)).all()
+        q = cls._query_paths(
+            lambda query, t: query.filter(t.cid.in_(node_lst)),
+            expected=len(set(str(x) for x in node_lst)))
         return q
 
     @classmethod
@@ -669,10 +714,10 @@ class Indexes(object):
         :param node_path: List of the Index Identifiers.
         :return: the list of index.
         """
-        recursive_t = cls.recs_query()
-        q = db.session.query(recursive_t).filter(
-            recursive_t.c.path.in_(node_path)). \
-            order_by(recursive_t.c.path).all()
+        q = cls._query_paths(
+            lambda query, t: query.filter(t.path.in_(node_path)).
+            order_by(t.path),
+            expected=len(set(node_path)))
         return filter_index_list_by_role(q)
 
     @classmethod
@@ -688,12 +733,8 @@ class Indexes(object):
             pid = node_path[index + 1:]
             from invenio_communities.models import Community
             community_obj = Community.get(community_id)
-            recursive_t = cls.recs_query()
-            query = db.session.query(recursive_t).filter(db.or_(
-                recursive_t.c.cid == pid, recursive_t.c.pid == pid))
-            if not get_user_roles()[0]:
-                query = query.filter(recursive_t.c.public_state)
-            q = query.order_by(recursive_t.c.path).all()
+            q = cls._query_paths(
+                lambda query, t: cls._filter_self_and_children(query, t, pid))
             lst = list()
             if node_path != '0':
                 for item in q:
@@ -706,13 +747,8 @@ class Indexes(object):
         else:
             index = node_path.rfind('/')
             pid = node_path[index + 1:]
-            recursive_t = cls.recs_query()
-            query = db.session.query(recursive_t).filter(
-                db.or_(recursive_t.c.pid == pid,
-                       recursive_t.c.cid == pid))
-            if not get_user_roles()[0]:
-                query = query.filter(recursive_t.c.public_state)
-            q = query.order_by(recursive_t.c.path).all()
+            q = cls._query_paths(
+                lambda query, t: cls._filter_self_and_children(query, t, pid))
             return q
 
     @classmethod
@@ -760,14 +796,160 @@ class Indexes(object):
         :return: the type of Index.
         """
         try:
-            recursive_t = cls.recs_query()
-            return db.session.query(recursive_t).filter(
-                recursive_t.c.cid == str(node_id)).one_or_none()
+            q = cls._query_paths(
+                lambda query, t: query.filter(t.cid == str(node_id)),
+                expected=1)
+            return q[0] if q else None
         except Exception as ex:
             current_app.logger.debug(ex)
             db.session.rollback()
             return False
 
+    @classmethod
+    def get_tree_version(cls):
+        """Get the version of the index tree.
+
+        :return: The version, increased on every change of the tree.
+        """
+        return IndexTreeVersion.get_version()
+
+    @classmethod
+    def is_index_path_built(cls):
+        """Check if the materialized paths of the index tree are built.
+
+        The ``index_path`` table is empty after an upgrade until
+        ``invenio index_tree rebuild_path`` has been run.
+
+        :return: False if there are indexes but no paths.
+        """
+        if Indexes._index_path_built:
+            return True
+        try:
+            with db.session.begin_nested():
+                built = db.session.query(IndexPath.query.exists()).scalar()
+        except SQLAlchemyError as ex:
+            current_app.logger.error(ex)
+            built = False
+        if built:
+            Indexes._index_path_built = True
+            return True
+        if not db.session.query(Index.query.exists()).scalar():
+            return True
+        current_app.logger.warning(
+            'The index_path table is not built, '
+            'run "invenio index_tree rebuild_path".')
+        return False
+
+    @classmethod
+    def _query_paths(cls, build, expected=None):
+        """Query the materialized paths of the indexes.
+
+        Fall back to the recursive query of the ``index`` table while the
+        ``index_path`` table is not built or misses some of the paths.
+
+        :param build: Function building the query from the base query and
+            the columns of the paths.
+        :param expected: Number of the rows expected from ``index_path``.
+        :return: The list of the paths.
+        """
+        if cls.is_index_path_built():
+            q = build(IndexPath.query, IndexPath).all()
+            if expected is None or len(q) >= expected:
+                return q
+            current_app.logger.debug(
+                'Some index paths are missing from index_path.')
+        recursive_t = cls.recs_query()
+        return build(db.session.query(recursive_t), recursive_t.c).all()
+
+    @classmethod
+    def _filter_self_and_children(cls, query, t, pid):
+        """Filter the paths of an index and its children.
+
+        :param query: Base query of the paths.
+        :param t: Columns of the paths.
+        :param pid: Identifier of the index.
+        :return: The filtered query.
+        """
+        query = query.filter(db.or_(t.pid == pid, t.cid == pid))
+        if not get_user_roles()[0]:
+            query = query.filter(t.public_state)
+        return query.order_by(t.path)
+
+    @classmethod
+    def refresh_index_path(cls, index_id):
+        """Refresh the materialized paths of an index and its descendants.
+
+        Must be called inside the transaction that changes the index.
+
+        :param index_id: Identifier of the index.
+        """
+        def _join(parent, child):
+            if parent is None or child is None:
+                return None
+            return parent + '/' + child
+
+        db.session.flush()
+        if not db.session.query(IndexPath.query.exists()).scalar():
+            # The path table has not been built yet, build it all.
+            cls.rebuild_index_path()
+            return
+        old_path = db.session.query(IndexPath.path).filter(
+            IndexPath.cid == index_id).scalar()
+        if old_path:
+            IndexPath.get_subtree_query(old_path). \
+                delete(synchronize_session=False)
+
+        index = Index.query.filter_by(id=index_id).one_or_none()
+        if not index:
+            return
+
+        root = dict(pid=int(index.parent or 0),
+                    cid=int(index.id),
+                    path=str(index.id),
+                    name=index.index_name,
+                    name_en=index.index_name_english,
+                    lev=1,
+                    public_state=index.public_state,
+                    public_date=index.public_date,
+                    comment=index.comment,
+                    browsing_role=index.browsing_role,
+                    browsing_group=index.browsing_group)
+        if root['pid']:
+            parent = IndexPath.query.filter_by(cid=root['pid']).one_or_none()
+            if not parent:
+                # The path table is out of date, rebuild it all.
+                cls.rebuild_index_path()
+                return
+            root.update(path=_join(parent.path, root['path']),
+                        name=_join(parent.name, root['name']),
+                        name_en=_join(parent.name_en, root['name_en']),
+                        lev=parent.lev + 1)
+
+        rows = [root]
+        for obj in db.session.query(cls.recs_query(pid=root['cid'])).all():
+            row = obj._asdict()
+            row.update(path=_join(root['path'], row['path']),
+                       name=_join(root['name'], row['name']),
+                       name_en=_join(root['name_en'], row['name_en']),
+                       lev=root['lev'] + row['lev'])
+            rows.append(row)
+        db.session.execute(IndexPath.__table__.insert(), rows)
+
+    @classmethod
+    def rebuild_index_path(cls):
+        """Rebuild the materialized paths of the whole index tree.
+
+        :return: The number of the indexes.
+        """
+        db.session.flush()
+        IndexPath.query.delete(synchronize_session=False)
+        rows = [obj._asdict() for obj in
+                db.session.query(cls.recs_query()).all()]
+        if rows:
+            db.session.execute(IndexPath.__table__.insert(), rows)
+        IndexTreeVersion.increase()
+        return len(rows)
+
     @classmethod
     def recs_query(cls, pid=0):
         """
@@ -777,7 +959,8 @@ class Indexes(object):
         """
         # !!! Important !!!
         # If add/delete columns in here,
-        # please add/delete columns in Indexes.delete function, too.
+        # please add/delete columns in Indexes.delete function
+        # and IndexPath model, too.
         recursive_t = db.session.query(
             Index.parent.label("pid"),
             Index.id.label("cid"),
@@ -1197,13 +1380,8 @@ class Indexes(object):
         """
         index = node_path.rfind('/')
         pid = node_path[index + 1:]
-        recursive_t = cls.recs_query()
-        query = db.session.query(recursive_t).filter(
-            db.or_(recursive_t.c.pid == pid,
-                   recursive_t.c.cid == pid))
-        if not get_user_roles()[0]:
-            query = query.filter(recursive_t.c.public_state)
-        q = query.order_by(recursive_t.c.path).all()
+        q = cls._query_paths(
+            lambda query, t: cls._filter_self_and_children(query, t, pid))
         return q
 
     @classmethod
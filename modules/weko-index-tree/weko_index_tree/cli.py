@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of WEKO3.
+# Copyright (C) 2017 National Institute of Informatics.
+#
+# WEKO3 is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# WEKO3 is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WEKO3; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+
+
+"""Command line interface creation kit."""
+import click
+from flask.cli import with_appcontext
+from invenio_db import db
+
+from .api import Indexes
+
+
+@click.group()
+def index_tree():
+    """Index tree commands."""
+
+
+@index_tree.command('rebuild_path')
+@with_appcontext
+def rebuild_index_path():
+    """Rebuild the materialized paths of the index tree."""
+    try:
+        count = Indexes.rebuild_index_path()
+        db.session.commit()
+        click.secho('rebuild index path success: {} indexes'.format(count))
+    except Exception as e:
+        db.session.rollback()
+        click.secho(str(e))
@@ -92,3 +92,9 @@ WEKO_INDEX_TREE_STATE_PREFIX = "index_tree_expand_state"
 
 WEKO_INDEX_TREE_STATE_TIME_LIFE_SECONDS = 60
 """Default index tree state time life."""
+
+WEKO_INDEX_TREE_BROWSING_PATHS_CACHE_PREFIX = 'index_tree_browsing_paths_'
+"""Cache key prefix of the browsable index paths."""
+
+WEKO_INDEX_TREE_BROWSING_PATHS_CACHE_TIMEOUT = 3600
+"""Cache timeout (seconds) of the browsable index paths."""
@@ -299,5 +299,112 @@ class IndexStyle(db.Model, Timestamp):
         return
 
 
+class IndexPath(db.Model):
+    """
+    Materialized path of an index.
+
+    Hold one row per index with its full path from the root, so that path and
+    ancestor lookups are indexed point queries instead of a recursive walk
+    over the ``index`` table. The columns are the same as the ones selected by
+    ``Indexes.recs_query``. The rows are kept up to date by ``Indexes``.
+    """
+
+    __tablename__ = 'index_path'
+
+    __table_args__ = (
+        db.Index('ix_index_path_path', 'path',
+                 postgresql_ops={'path': 'text_pattern_ops'}),
+    )
+
+    cid = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    """Identifier of the index."""
+
+    pid = db.Column(db.BigInteger, nullable=False, default=0, index=True)
+    """Identifier of the parent index."""
+
+    path = db.Column(db.Text, nullable=False)
+    """Path of the index identifiers from the root (e.g. ``1/2/3``)."""
+
+    name = db.Column(db.Text, nullable=True)
+    """Path of the index names from the root."""
+
+    name_en = db.Column(db.Text, nullable=True)
+    """Path of the English index names from the root."""
+
+    lev = db.Column(db.Integer, nullable=False, default=1)
+    """Level of the index in the tree, the root indexes are level 1."""
+
+    public_state = db.Column(db.Boolean(name='index_path_public_state'),
+                             nullable=False, default=False)
+    """Public State of the index."""
+
+    public_date = db.Column(
+        db.DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql"),
+        nullable=True)
+    """Public Date of the index."""
+
+    comment = db.Column(db.Text, nullable=True, default='')
+    """Comment of the index."""
+
+    browsing_role = db.Column(db.Text, nullable=True)
+    """Browsing Role of the index."""
+
+    browsing_group = db.Column(db.Text, nullable=True)
+    """Browsing Group of the index."""
+
+    @property
+    def ancestors(self):
+        """Identifiers of the ancestors of the index, from the root."""
+        return [int(x) for x in self.path.split('/')[:-1]]
+
+    @classmethod
+    def get_subtree_query(cls, path):
+        """Query the paths of an index and all its descendants.
+
+        :param path: Path of the index.
+        :return: The query of the paths.
+        """
+        return cls.query.filter(db.or_(
+            cls.path == path,
+            cls.path.like(path + '/%')))
+
+
+class IndexTreeVersion(db.Model, Timestamp):
+    """
+    Version counter of the index tree.
+
+    The counter is increased whenever an index is created, updated, moved or
+    deleted, so that callers can cache results keyed on the tree version.
+    """
+
+    __tablename__ = 'index_tree_version'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    """Identifier of the counter, there is only one row."""
+
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    """Current version of the index tree."""
+
+    @classmethod
+    def get_version(cls):
+        """Get the current version of the index tree."""
+        obj = cls.query.filter_by(id=1).one_or_none()
+        return obj.version if obj else 0
+
+    @classmethod
+    def increase(cls):
+        """Increase the version of the index tree.
+
+        Must be called inside the transaction that changes the tree.
+        """
+        count = cls.query.filter_by(id=1).update(
+            {cls.version: cls.version + 1, cls.updated: datetime.utcnow()},
+            synchronize_session=False)
+        if not count:
+            db.session.add(cls(id=1, version=1))
+
+
 __all__ = ('Index',
-           'IndexStyle',)
+           'IndexPath',
+           'IndexStyle',
+           'IndexTreeVersion',)
@@ -33,8 +33,10 @@ from invenio_search import RecordsSearch
 from sqlalchemy import MetaData, Table
 from weko_groups.models import Group
 
-from .config import WEKO_INDEX_TREE_STATE_PREFIX
-from .models import Index
+from .config import WEKO_INDEX_TREE_BROWSING_PATHS_CACHE_PREFIX, \
+    WEKO_INDEX_TREE_BROWSING_PATHS_CACHE_TIMEOUT, \
+    WEKO_INDEX_TREE_STATE_PREFIX
+from .models import Index, IndexTreeVersion
 
 
 def get_index_link_list(lang='en'):
@@ -70,6 +72,78 @@ def cached_index_tree_json(timeout=50, key_prefix='index_tree_json'):
     return caching
 
 
+def cached_browsing_tree_paths(kind, pid, func):
+    """Cache browsable index paths of the current user.
+
+    The paths are cached per version of the index tree and per set of roles
+    and groups of the current user, so they are recomputed when the tree or
+    the role assignments change.
+
+    :param kind: Kind of the cached value.
+    :param pid: Identifier of the root index.
+    :param func: Function computing the value on a cache miss.
+    :return: The cached value.
+    """
+    roles = get_user_roles()
+    if roles[0]:
+        user_key = 'admin'
+    else:
+        user_key = '{}_{}_{}'.format(
+            int(bool(current_user and current_user.is_authenticated)),
+            '-'.join(map(str, sorted(roles[1] or []))),
+            '-'.join(map(str, sorted(get_user_groups()))))
+    key = '{}{}_{}_{}_{}_{}'.format(
+        current_app.config.get('WEKO_INDEX_TREE_BROWSING_PATHS_CACHE_PREFIX',
+                               WEKO_INDEX_TREE_BROWSING_PATHS_CACHE_PREFIX),
+        kind, pid, IndexTreeVersion.get_version(),
+        date.today().strftime('%Y%m%d'), user_key)
+
+    value = current_cache.get(key)
+    if value is None:
+        value = func()
+        current_cache.set(key, value, timeout=current_app.config.get(
+            'WEKO_INDEX_TREE_BROWSING_PATHS_CACHE_TIMEOUT',
+            WEKO_INDEX_TREE_BROWSING_PATHS_CACHE_TIMEOUT))
+    return value
+
+
+def get_tree_path_prefixes(paths, all_paths):
+    """Group browsable paths by the subtrees they fully cover.
+
+    A subtree whose indexes are all browsable can be matched by a single
+    term on ``path.tree``, which is analyzed with the path hierarchy
+    tokenizer, instead of enumerating every path of the subtree.
+
+    :param paths: Browsable paths.
+    :param all_paths: All the paths of the index tree.
+    :return: Tuple of the paths whose whole subtree is browsable and the
+        other browsable paths.
+    """
+    browsable = set(paths)
+    children = {}
+    for path in all_paths:
+        children.setdefault(path.rpartition('/')[0], []).append(path)
+
+    covered = set()
+    for path in sorted(all_paths, key=lambda x: x.count('/'), reverse=True):
+        if path in browsable and all(
+                child in covered for child in children.get(path, [])):
+            covered.add(path)
+
+    prefixes = []
+    rest = list(browsable.difference(all_paths))
+    stack = list(children.get('', []))
+    while stack:
+        path = stack.pop()
+        if path in covered:
+            prefixes.append(path)
+            continue
+        if path in browsable:
+            rest.append(path)
+        stack.extend(children.get(path, []))
+    return sorted(prefixes), sorted(rest)
+
+
 def reset_tree(tree, path=None, more_ids=None):
     """
     Reset the state of checked.
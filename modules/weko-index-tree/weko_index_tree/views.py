@@ -20,8 +20,6 @@
 
 """Blueprint for weko-index-tree."""
 
-from datetime import date, timedelta
-
 from flask import Blueprint, current_app, jsonify, request, session
 from flask_login import current_user
 
@@ -30,7 +28,7 @@ from .config import WEKO_INDEX_TREE_RSS_COUNT_LIMIT, \
     WEKO_INDEX_TREE_RSS_DEFAULT_COUNT, WEKO_INDEX_TREE_RSS_DEFAULT_INDEX_ID, \
     WEKO_INDEX_TREE_RSS_DEFAULT_LANG, WEKO_INDEX_TREE_RSS_DEFAULT_PAGE, \
     WEKO_INDEX_TREE_RSS_DEFAULT_TERM, WEKO_INDEX_TREE_STATE_PREFIX
-from .utils import generate_path, get_elasticsearch_records_data_by_indexes
+from .utils import generate_path
 
 blueprint = Blueprint(
     'weko_index_tree',
@@ -56,7 +54,7 @@ def get_rss_data():
         xml -- RSS data
 
     """
-    from weko_gridlayout.utils import build_rss_xml
+    from weko_gridlayout.utils import get_new_arrivals_rss
 
     data = request.args
 
@@ -75,22 +73,8 @@ def get_rss_data():
     lang = data.get('lang') or WEKO_INDEX_TREE_RSS_DEFAULT_LANG
 
     idx_tree_ids = generate_path(Indexes.get_recursive_tree(index_id))
-    current_date = date.today()
-    end_date = current_date.strftime("%Y-%m-%d")
-    start_date = (current_date - timedelta(days=term)).strftime("%Y-%m-%d")
-    records_data = get_elasticsearch_records_data_by_indexes(idx_tree_ids,
-                                                             start_date,
-                                                             end_date)
-
-    hits = records_data.get('hits')
-    rss_data = hits.get('hits')
-
-    return build_rss_xml(data=rss_data,
-                         index_id=index_id,
-                         page=page,
-                         count=count,
-                         term=term,
-                         lang=lang)
+    return get_new_arrivals_rss(term, count, lang, index_id=index_id,
+                                page=page, index_ids=idx_tree_ids)
 
 
 @blueprint_api.route('/indextree/set_expand', methods=['POST'])
@@ -111,6 +111,9 @@ setup(
         'invenio_access.actions': [
             'item_access = weko_items_ui.permissions:action_item_access',
         ],
+        'invenio_celery.tasks': [
+            'weko_items_ui = weko_items_ui.tasks',
+        ],
     },
     extras_require=extras_require,
     install_requires=install_requires,
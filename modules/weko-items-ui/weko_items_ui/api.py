@@ -15,13 +15,10 @@
 
 """API for item login."""
 
-import os
-
-import redis
 from flask import current_app, json, session, url_for
 from flask_login import login_required
-from simplekv.memory.redisstore import RedisStore
 from weko_records.api import ItemTypes
+from weko_records.redis_client import get_session_redis_store
 from weko_records.utils import find_items
 
 from .permissions import item_permission
@@ -54,10 +51,7 @@ def item_login(item_type_id=0):
             template_url = 'weko_items_ui/iframe/error.html'
         json_schema = '/items/jsonschema/{}'.format(item_type_id)
         schema_form = '/items/schemaform/{}'.format(item_type_id)
-        sessionstore = RedisStore(redis.StrictRedis.from_url(
-            'redis://{host}:{port}/1'.format(
-                host=os.getenv('INVENIO_REDIS_HOST', 'localhost'),
-                port=os.getenv('INVENIO_REDIS_PORT', '6379'))))
+        sessionstore = get_session_redis_store()
         activity_session = session['activity_info']
         activity_id = activity_session.get('activity_id', None)
         if activity_id and sessionstore.redis.exists(
@@ -72,6 +72,15 @@ WEKO_ITEMS_UI_EXPORT_FORMAT_JSON = 'JSON'
 WEKO_ITEMS_UI_EXPORT_FORMAT_BIBTEX = 'BIBTEX'
 """Format for exporting items -- BIBTEX. """
 
+WEKO_ITEMS_UI_EXPORT_TMP_DIR = '/tmp/weko_items_ui_export'
+"""Directory of the zip files built by the export jobs."""
+
+WEKO_ITEMS_UI_EXPORT_RETENTION = 60 * 60 * 24
+"""Seconds an export job zip is kept for download."""
+
+WEKO_ITEMS_UI_EXPORT_CHUNK_SIZE = 1024 * 1024
+"""Bytes read from the storage at once when writing the export zip."""
+
 IDENTIFIER_GRANT_DOI = 0
 """Identifier grant was select."""
 
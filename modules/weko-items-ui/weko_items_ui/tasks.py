@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of WEKO3.
+# Copyright (C) 2017 National Institute of Informatics.
+#
+# WEKO3 is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# WEKO3 is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WEKO3; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+
+"""Weko Items UI celery tasks."""
+
+import os
+import time
+
+from celery import current_task, shared_task, states
+from celery.utils.log import get_task_logger
+from flask import current_app
+from flask_login import login_user
+from invenio_accounts.models import User
+
+from .utils import write_export_zip
+
+logger = get_task_logger(__name__)
+
+
+def get_export_zip_path(task_id):
+    """Get the path of the zip written by an export job."""
+    return os.path.join(current_app.config['WEKO_ITEMS_UI_EXPORT_TMP_DIR'],
+                        '{}.zip'.format(task_id))
+
+
+def remove_expired_export_zips():
+    """Remove the export zips older than the retention time."""
+    export_dir = current_app.config['WEKO_ITEMS_UI_EXPORT_TMP_DIR']
+    expired = time.time() - \
+        current_app.config['WEKO_ITEMS_UI_EXPORT_RETENTION']
+    for name in os.listdir(export_dir):
+        path = os.path.join(export_dir, name)
+        try:
+            if os.path.getmtime(path) < expired:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+@shared_task
+def export_items_task(user_id, root_url, record_ids, export_format,
+                      include_contents, record_metadata=None):
+    """Export items into a bagged zip in the background.
+
+    :param user_id: id of the user requesting the export
+    :param root_url: site url of the request
+    :param record_ids: recids to export
+    :param export_format: export format
+    :param include_contents: export the content files too
+    :param record_metadata: metadata to export by recid
+    """
+    task_id = current_task.request.id
+    os.makedirs(current_app.config['WEKO_ITEMS_UI_EXPORT_TMP_DIR'],
+                exist_ok=True)
+    remove_expired_export_zips()
+
+    def update_progress(exported, total):
+        current_task.update_state(
+            state=states.state('PROGRESS'),
+            meta={'user_id': user_id, 'exported': exported, 'total': total})
+
+    update_progress(0, len(record_ids))
+    zip_path = get_export_zip_path(task_id)
+    with current_app.test_request_context(base_url=root_url):
+        login_user(User.query.get(user_id))
+        try:
+            write_export_zip(zip_path + '.part', record_ids, export_format,
+                             include_contents, record_metadata, root_url,
+                             update_progress)
+            os.rename(zip_path + '.part', zip_path)
+        except Exception:
+            logger.exception('Export job {} failed.'.format(task_id))
+            if os.path.exists(zip_path + '.part'):
+                os.remove(zip_path + '.part')
+            raise
+    return {'user_id': user_id, 'exported': len(record_ids),
+            'total': len(record_ids)}
@@ -21,6 +21,7 @@
 """Module of weko-items-ui utils.."""
 
 import csv
+import hashlib
 import json
 import os
 import re
@@ -28,11 +29,11 @@ import shutil
 import sys
 import tempfile
 import traceback
+import zipfile
 from datetime import datetime
 from io import StringIO
 
 import bagit
-import redis
 from elasticsearch.exceptions import NotFoundError
 from flask import abort, current_app, flash, redirect, request, send_file, \
     url_for
@@ -44,11 +45,11 @@ from invenio_indexer.api import RecordIndexer
 from invenio_records.api import RecordBase
 from invenio_search import RecordsSearch
 from jsonschema import SchemaError, ValidationError
-from simplekv.memory.redisstore import RedisStore
 from sqlalchemy import MetaData, Table
 from weko_deposit.api import WekoDeposit, WekoRecord
 from weko_index_tree.utils import get_index_id
 from weko_records.api import ItemTypes
+from weko_records.redis_client import get_session_redis_store
 from weko_records.serializers.utils import get_item_type_name
 from weko_records_ui.permissions import check_file_download_permission
 from weko_search_ui.query import item_search_factory
@@ -437,10 +438,7 @@ def update_json_schema_by_activity_id(json_data, activity_id):
     :param activity_id: Activity ID
     :return: json schema
     """
-    sessionstore = RedisStore(redis.StrictRedis.from_url(
-        'redis://{host}:{port}/1'.format(
-            host=os.getenv('INVENIO_REDIS_HOST', 'localhost'),
-            port=os.getenv('INVENIO_REDIS_PORT', '6379'))))
+    sessionstore = get_session_redis_store()
     if not sessionstore.redis.exists(
         'updated_json_schema_{}'.format(activity_id)) \
         and not sessionstore.get(
@@ -857,11 +855,6 @@ def export_items(post_data):
 
     :return: JSON, BIBTEX
     """
-    def check_item_type_name(name):
-        """Check a list of allowed characters in filenames."""
-        new_name = re.sub(r'[\/:*"<>|\s]', '_', name)
-        return new_name
-
     include_contents = True if \
         post_data['export_file_contents_radio'] == 'True' else False
     export_format = post_data['export_format_radio']
@@ -873,69 +866,14 @@ def export_items(post_data):
         flash(_('Please select Items to export.'), 'error')
         return redirect(url_for('weko_items_ui.export'))
 
-    result = {'items': []}
     temp_path = tempfile.TemporaryDirectory()
-    item_types_data = {}
 
     try:
         # Set export folder
         export_path = temp_path.name + '/' + \
             datetime.utcnow().strftime("%Y%m%d%H%M%S")
-        # Double check for limits
-        for record_id in record_ids:
-            record_path = export_path + '/recid_' + str(record_id)
-            os.makedirs(record_path, exist_ok=True)
-            exported_item, list_item_role = _export_item(
-                record_id,
-                export_format,
-                include_contents,
-                record_path,
-                record_metadata.get(str(record_id))
-            )
-
-            result['items'].append(exported_item)
-
-            item_type_id = exported_item.get('item_type_id')
-            item_type = ItemTypes.get_by_id(item_type_id)
-            if not item_types_data.get(item_type_id):
-                item_type_name = check_item_type_name(
-                    item_type.item_type_name.name)
-                item_types_data[item_type_id] = {
-                    'item_type_id': item_type_id,
-                    'name': '{}({})'.format(
-                        item_type_name,
-                        item_type_id),
-                    'root_url': request.url_root,
-                    'jsonschema': 'items/jsonschema/' + item_type_id,
-                    'keys': [],
-                    'labels': [],
-                    'recids': [],
-                    'data': {},
-                }
-            item_types_data[item_type_id]['recids'].append(record_id)
-
-        # Create export info file
-        for item_type_id in item_types_data:
-            keys, labels, records = make_stats_tsv(
-                item_type_id,
-                item_types_data[item_type_id]['recids'],
-                list_item_role)
-            item_types_data[item_type_id]['recids'].sort()
-            item_types_data[item_type_id]['keys'] = keys
-            item_types_data[item_type_id]['labels'] = labels
-            item_types_data[item_type_id]['data'] = records
-            item_type_data = item_types_data[item_type_id]
-
-            with open('{}/{}.tsv'.format(export_path,
-                                         item_type_data.get('name')),
-                      'w') as file:
-                tsvs_output = package_export_file(item_type_data)
-                file.write(tsvs_output.getvalue())
-
-        # Create bag
-        bagit.make_bag(export_path)
-        # Create download file
-        shutil.make_archive(export_path, 'zip', export_path)
+        write_export_zip(export_path + '.zip', record_ids, export_format,
+                         include_contents, record_metadata)
     except Exception:
         current_app.logger.error('-' * 60)
         traceback.print_exc(file=sys.stdout)
@@ -1044,15 +982,20 @@ def _get_max_export_items():
     return current_max
 
 
-def _export_item(record_id,
-                 export_format,
-                 include_contents,
-                 tmp_path=None,
-                 records_data=None):
-    """Exports files for record according to view permissions."""
+def _get_export_item(record_id,
+                     export_format,
+                     include_contents,
+                     records_data=None):
+    """Get the data and permitted files of a record to export.
+
+    Returns:
+        tuple -- exported item, item roles, metadata to write and files
+
+    """
     exported_item = {}
     record = WekoRecord.get_record_by_pid(record_id)
     list_item_role = {}
+    files = []
     if record:
         exported_item['record_id'] = record.id
         exported_item['name'] = 'recid_{}'.format(record_id)
@@ -1077,13 +1020,6 @@ def _export_item(record_id,
                         if meta_data.get(hide_key):
                             del records_data['metadata'][hide_key]
 
-        # Create metadata file.
-        with open('{}/{}_metadata.json'.format(tmp_path,
-                                               exported_item['name']),
-                  'w',
-                  encoding='utf8') as output_file:
-            json.dump(records_data, output_file, indent=2,
-                      sort_keys=True, ensure_ascii=False)
         # First get all of the files, checking for permissions while doing so
         if include_contents:
             # Get files
@@ -1094,12 +1030,195 @@ def _export_item(record_id,
                         exported_item['files'].append(file.info())
                         # TODO: Then convert the item into the desired format
                         if file:
-                            shutil.copy2(file.obj.file.uri,
-                                         tmp_path + '/' + file.obj.basename)
+                            files.append(file)
+
+    return exported_item, list_item_role, records_data, files
+
+
+def _export_item(record_id,
+                 export_format,
+                 include_contents,
+                 tmp_path=None,
+                 records_data=None):
+    """Exports files for record according to view permissions."""
+    exported_item, list_item_role, records_data, files = _get_export_item(
+        record_id, export_format, include_contents, records_data)
+    if exported_item:
+        # Create metadata file.
+        with open('{}/{}_metadata.json'.format(tmp_path,
+                                               exported_item['name']),
+                  'w',
+                  encoding='utf8') as output_file:
+            json.dump(records_data, output_file, indent=2,
+                      sort_keys=True, ensure_ascii=False)
+        for file in files:
+            shutil.copy2(file.obj.file.uri,
+                         tmp_path + '/' + file.obj.basename)
 
     return exported_item, list_item_role
 
 
+class BagZipWriter(object):
+    """Write a BagIt bag directly into a zip file.
+
+    Payload files are streamed into the zip and the MD5 manifest is built
+    in the same pass. The checksum already stored for a file is reused
+    instead of hashing its content again.
+    """
+
+    def __init__(self, zip_path):
+        """Open the zip file."""
+        self.zip = zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED,
+                                   allowZip64=True)
+        self.tmp_dir = os.path.dirname(os.path.abspath(zip_path))
+        self.manifest = []
+        self.payload_bytes = 0
+
+    def write_data(self, path, data):
+        """Write payload bytes."""
+        self.zip.writestr('data/' + path, data)
+        self.manifest.append((hashlib.md5(data).hexdigest(), path))
+        self.payload_bytes += len(data)
+
+    def write_stream(self, path, stream, checksum=None):
+        """Write a payload file read from a stream.
+
+        The stream is copied to a temporary file next to the zip first, as
+        ZipFile cannot open a member for writing before Python 3.6.
+        """
+        chunk_size = current_app.config['WEKO_ITEMS_UI_EXPORT_CHUNK_SIZE']
+        md5 = None if checksum else hashlib.md5()
+        with tempfile.NamedTemporaryFile(dir=self.tmp_dir,
+                                         suffix='.part') as dst:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                self.payload_bytes += len(chunk)
+                if md5:
+                    md5.update(chunk)
+            dst.flush()
+            self.zip.write(dst.name, 'data/' + path)
+        self.manifest.append((checksum or md5.hexdigest(), path))
+
+    def write_file(self, path, file_instance):
+        """Write a payload file from its storage."""
+        checksum = file_instance.checksum or ''
+        checksum = checksum[4:] if checksum.startswith('md5:') else None
+        with file_instance.storage().open() as stream:
+            self.write_stream(path, stream, checksum)
+
+    def close(self):
+        """Write the bag declaration, info and manifests then close."""
+        tag_files = [
+            ('bagit.txt',
+             'BagIt-Version: 0.97\nTag-File-Character-Encoding: UTF-8\n'),
+            ('bag-info.txt',
+             'Bagging-Date: {}\nPayload-Oxum: {}.{}\n'.format(
+                 datetime.utcnow().strftime('%Y-%m-%d'),
+                 self.payload_bytes, len(self.manifest))),
+            ('manifest-md5.txt',
+             ''.join('{}  data/{}\n'.format(checksum, path)
+                     for checksum, path in self.manifest)),
+        ]
+        tag_manifest = ''
+        for name, content in tag_files:
+            data = content.encode('utf-8')
+            self.zip.writestr(name, data)
+            tag_manifest += '{}  {}\n'.format(
+                hashlib.md5(data).hexdigest(), name)
+        self.zip.writestr('tagmanifest-md5.txt', tag_manifest)
+        self.zip.close()
+
+
+def write_export_zip(zip_path, record_ids, export_format, include_contents,
+                     record_metadata=None, root_url=None,
+                     progress_callback=None):
+    """Export items into a bagged zip in a single pass.
+
+    Arguments:
+        zip_path            -- path of the zip to write
+        record_ids          -- recids to export
+        export_format       -- export format
+        include_contents    -- export the content files too
+        record_metadata     -- metadata to export by recid
+        root_url            -- site url used in the TSV files
+        progress_callback   -- called with (exported, total) per record
+
+    """
+    def check_item_type_name(name):
+        """Check a list of allowed characters in filenames."""
+        new_name = re.sub(r'[\/:*"<>|\s]', '_', name)
+        return new_name
+
+    record_metadata = record_metadata or {}
+    root_url = root_url or request.url_root
+    item_types_data = {}
+    list_item_role = {}
+    bag = BagZipWriter(zip_path)
+    try:
+        for count, record_id in enumerate(record_ids, 1):
+            exported_item, item_role, records_data, files = _get_export_item(
+                record_id,
+                export_format,
+                include_contents,
+                record_metadata.get(str(record_id))
+            )
+            if not exported_item:
+                continue
+            list_item_role.update(item_role)
+            record_path = exported_item['path']
+            bag.write_data(
+                '{}/{}_metadata.json'.format(record_path,
+                                             exported_item['name']),
+                json.dumps(records_data, indent=2, sort_keys=True,
+                           ensure_ascii=False).encode('utf8'))
+            for file in files:
+                bag.write_file('{}/{}'.format(record_path,
+                                              file.obj.basename),
+                               file.obj.file)
+
+            item_type_id = exported_item.get('item_type_id')
+            if not item_types_data.get(item_type_id):
+                item_type = ItemTypes.get_by_id(item_type_id)
+                item_type_name = check_item_type_name(
+                    item_type.item_type_name.name)
+                item_types_data[item_type_id] = {
+                    'item_type_id': item_type_id,
+                    'name': '{}({})'.format(
+                        item_type_name,
+                        item_type_id),
+                    'root_url': root_url,
+                    'jsonschema': 'items/jsonschema/' + item_type_id,
+                    'keys': [],
+                    'labels': [],
+                    'recids': [],
+                    'data': {},
+                }
+            item_types_data[item_type_id]['recids'].append(record_id)
+            if progress_callback:
+                progress_callback(count, len(record_ids))
+
+        # Create export info file
+        for item_type_id in item_types_data:
+            keys, labels, records = make_stats_tsv(
+                item_type_id,
+                item_types_data[item_type_id]['recids'],
+                list_item_role)
+            item_types_data[item_type_id]['recids'].sort()
+            item_types_data[item_type_id]['keys'] = keys
+            item_types_data[item_type_id]['labels'] = labels
+            item_types_data[item_type_id]['data'] = records
+            item_type_data = item_types_data[item_type_id]
+            bag.write_data(
+                '{}.tsv'.format(item_type_data.get('name')),
+                package_export_file(item_type_data).getvalue().encode(
+                    'utf-8'))
+    finally:
+        bag.close()
+
+
 def get_new_items_by_date(start_date: str, end_date: str) -> dict:
     """Get ranking new item by date.
 
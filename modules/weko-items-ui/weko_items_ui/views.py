@@ -25,9 +25,8 @@ import os
 import sys
 from datetime import date, timedelta
 
-import redis
 from flask import Blueprint, abort, current_app, flash, json, jsonify, \
-    redirect, render_template, request, session, url_for
+    redirect, render_template, request, send_file, session, url_for
 from flask_babelex import gettext as _
 from flask_login import login_required
 from flask_security import current_user
@@ -38,12 +37,12 @@ from invenio_pidstore.models import PersistentIdentifier
 from invenio_records_ui.signals import record_viewed
 from invenio_stats.utils import QueryItemRegReportHelper, \
     QueryRecordViewReportHelper, QuerySearchReportHelper
-from simplekv.memory.redisstore import RedisStore
 from weko_admin.models import AdminSettings, RankingSettings
 from weko_deposit.api import WekoDeposit, WekoRecord
 from weko_groups.api import Group
 from weko_index_tree.utils import get_index_id, get_user_roles
 from weko_records.api import FeedbackMailList, ItemTypes
+from weko_records.redis_client import get_session_redis_store
 from weko_records_ui.ipaddr import check_site_license_permission
 from weko_records_ui.permissions import check_file_download_permission
 from weko_workflow.api import GetCommunity, WorkActivity
@@ -146,10 +145,7 @@ def iframe_index(item_type_id=0):
                                    error_type='no_itemtype')
         json_schema = '/items/jsonschema/{}'.format(item_type_id)
         schema_form = '/items/schemaform/{}'.format(item_type_id)
-        sessionstore = RedisStore(redis.StrictRedis.from_url(
-            'redis://{host}:{port}/1'.format(
-                host=os.getenv('INVENIO_REDIS_HOST', 'localhost'),
-                port=os.getenv('INVENIO_REDIS_PORT', '6379'))))
+        sessionstore = get_session_redis_store()
         record = {}
         files = []
         endpoints = {}
@@ -197,10 +193,7 @@ def iframe_save_model():
         activity_session = session['activity_info']
         activity_id = activity_session.get('activity_id', None)
         if activity_id:
-            sessionstore = RedisStore(redis.StrictRedis.from_url(
-                'redis://{host}:{port}/1'.format(
-                    host=os.getenv('INVENIO_REDIS_HOST', 'localhost'),
-                    port=os.getenv('INVENIO_REDIS_PORT', '6379'))))
+            sessionstore = get_session_redis_store()
             sessionstore.put(
                 'activity_item_' + activity_id,
                 json.dumps(data).encode('utf-8'),
@@ -405,10 +398,7 @@ def items_index(pid_value='0'):
                 render_widgets=render_widgets)
 
         data = request.get_json()
-        sessionstore = RedisStore(redis.StrictRedis.from_url(
-            'redis://{host}:{port}/1'.format(
-                host=os.getenv('INVENIO_REDIS_HOST', 'localhost'),
-                port=os.getenv('INVENIO_REDIS_PORT', '6379'))))
+        sessionstore = get_session_redis_store()
         if request.method == 'PUT':
             """update index of item info."""
             item_str = sessionstore.get('item_index_{}'.format(pid_value))
@@ -503,10 +493,7 @@ def iframe_items_index(pid_value='0'):
             )
 
         data = request.get_json()
-        sessionstore = RedisStore(redis.StrictRedis.from_url(
-            'redis://{host}:{port}/1'.format(
-                host=os.getenv('INVENIO_REDIS_HOST', 'localhost'),
-                port=os.getenv('INVENIO_REDIS_PORT', '6379'))))
+        sessionstore = get_session_redis_store()
         if request.method == 'PUT':
             """update index of item info."""
             item_str = sessionstore.get('item_index_{}'.format(pid_value))
@@ -555,10 +542,7 @@ def default_view_method(pid, record, template=None):
             url_for('.index', item_type_id=lists[0].item_type[0].id))
     json_schema = '/items/jsonschema/{}'.format(item_type_id)
     schema_form = '/items/schemaform/{}'.format(item_type_id)
-    sessionstore = RedisStore(redis.StrictRedis.from_url(
-        'redis://{host}:{port}/1'.format(
-            host=os.getenv('INVENIO_REDIS_HOST', 'localhost'),
-            port=os.getenv('INVENIO_REDIS_PORT', '6379'))))
+    sessionstore = get_session_redis_store()
     files = to_files_js(record)
     record = record.item_metadata
     endpoints = {}
@@ -1143,6 +1127,74 @@ def export():
     )
 
 
+def _get_export_job(job_id):
+    """Get an export job of the current user."""
+    from .tasks import export_items_task
+    job = export_items_task.AsyncResult(job_id)
+    info = job.info if isinstance(job.info, dict) else {}
+    if job.state == 'PENDING' or info.get('user_id') != current_user.get_id():
+        abort(404)
+    return job, info
+
+
+@blueprint.route('/export/jobs', methods=['POST'])
+@login_required
+def export_job():
+    """Start an export job building the zip in the background."""
+    from .tasks import export_items_task
+    export_settings = AdminSettings.get('item_export_settings') or \
+        AdminSettings.Dict2Obj(
+            current_app.config['WEKO_ADMIN_DEFAULT_ITEM_EXPORT_SETTINGS'])
+    if not export_settings.allow_item_exporting:
+        return abort(403)
+
+    post_data = request.form.to_dict() or request.get_json(silent=True) or {}
+    record_ids = json.loads(post_data.get('record_ids') or '[]')
+    if not record_ids or len(record_ids) > _get_max_export_items():
+        return abort(400)
+    job = export_items_task.apply_async(args=(
+        current_user.get_id(),
+        request.url_root,
+        record_ids,
+        post_data.get('export_format_radio'),
+        post_data.get('export_file_contents_radio') == 'True',
+        json.loads(post_data.get('record_metadata') or '{}'),
+    ))
+    return jsonify(job_id=job.id,
+                   status_url=url_for('weko_items_ui.export_job_status',
+                                      job_id=job.id)), 202
+
+
+@blueprint.route('/export/jobs/<string:job_id>', methods=['GET'])
+@login_required
+def export_job_status(job_id):
+    """Get the progress of an export job."""
+    job, info = _get_export_job(job_id)
+    result = {
+        'job_id': job_id,
+        'status': job.state,
+        'exported': info.get('exported', 0),
+        'total': info.get('total', 0),
+    }
+    if job.successful():
+        result['download_url'] = url_for(
+            'weko_items_ui.export_job_download', job_id=job_id)
+    return jsonify(result)
+
+
+@blueprint.route('/export/jobs/<string:job_id>/download', methods=['GET'])
+@login_required
+def export_job_download(job_id):
+    """Download the zip built by an export job."""
+    from .tasks import get_export_zip_path
+    job, info = _get_export_job(job_id)
+    zip_path = get_export_zip_path(job_id)
+    if not job.successful() or not os.path.isfile(zip_path):
+        abort(404)
+    return send_file(zip_path, as_attachment=True,
+                     attachment_filename='export_{}.zip'.format(job_id))
+
+
 @blueprint_api.route('/validate', methods=['POST'])
 @login_required
 def validate():
@@ -1170,10 +1222,7 @@ def check_validation_error_msg(activity_id):
     :param activity_id: The identify of Activity.
     :return: Show error message
     """
-    sessionstore = RedisStore(redis.StrictRedis.from_url(
-        'redis://{host}:{port}/1'.format(
-            host=os.getenv('INVENIO_REDIS_HOST', 'localhost'),
-            port=os.getenv('INVENIO_REDIS_PORT', '6379'))))
+    sessionstore = get_session_redis_store()
     if sessionstore.redis.exists(
         'updated_json_schema_{}'.format(activity_id)) \
             and sessionstore.get('updated_json_schema_{}'.format(activity_id)):
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of WEKO3.
+# Copyright (C) 2017 National Institute of Informatics.
+#
+# WEKO3 is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# WEKO3 is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WEKO3; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+
+"""Site license IP address index tests."""
+
+from weko_records_ui.ipaddr import SiteLicenseIndex, match_ip_addr
+
+
+def _site_license(name, *ranges):
+    return dict(organization_name=name,
+                addresses=[dict(start_ip_address=start,
+                                finish_ip_address=finish)
+                           for start, finish in ranges])
+
+
+def test_site_license_index_overlapping_ranges(app):
+    """Test overlapping ranges belong to the first site license."""
+    index = SiteLicenseIndex([
+        _site_license('first', ('10.0.0.10', '10.0.0.20')),
+        _site_license('second', ('10.0.0.0', '10.0.0.255'),
+                      ('192.168.0.1', '192.168.0.1')),
+        _site_license('third', ('10.0.0.15', '10.0.1.10')),
+    ])
+    assert index.match('10.0.0.9') == 'second'
+    assert index.match('10.0.0.10') == 'first'
+    assert index.match('10.0.0.15') == 'first'
+    assert index.match('10.0.0.20') == 'first'
+    assert index.match('10.0.0.21') == 'second'
+    assert index.match('10.0.0.255') == 'second'
+    assert index.match('10.0.1.0') == 'third'
+    assert index.match('10.0.1.10') == 'third'
+    assert index.match('10.0.1.11') is None
+    assert index.match('192.168.0.1') == 'second'
+    assert index.match('192.168.0.2') is None
+
+
+def test_site_license_index_ipv6(app):
+    """Test IPv6 ranges and IPv4-mapped addresses."""
+    index = SiteLicenseIndex([
+        _site_license('v4', ('192.0.2.0', '192.0.2.255')),
+        _site_license('v6', ('2001:db8::', '2001:db8::ffff')),
+    ])
+    assert index.match('2001:db8::1') == 'v6'
+    assert index.match('2001:db8::1:0') is None
+    assert index.match('::ffff:192.0.2.1') == 'v4'
+    assert index.match('::ffff:198.51.100.1') is None
+    # IPv4 and IPv6 ranges do not match each other's addresses
+    assert index.match('::c000:201') is None
+
+
+def test_site_license_index_invalid_ranges(app):
+    """Test invalid and reversed ranges are ignored."""
+    index = SiteLicenseIndex([
+        _site_license('invalid', ('10.0.0.1', 'not an address'),
+                      ('10.0.0.9', '10.0.0.1'),
+                      ('10.0.0.1', '2001:db8::1')),
+    ])
+    assert index.match('10.0.0.5') is None
+    assert index.match('not an address') is None
+
+
+def test_match_ip_addr():
+    """Test the range check of a single address."""
+    addr = dict(start_ip_address='2001:db8::',
+                finish_ip_address='2001:db8::ff')
+    assert match_ip_addr(addr, '2001:db8::10')
+    assert not match_ip_addr(addr, '2001:db8::100')
+    assert not match_ip_addr(addr, '10.0.0.1')
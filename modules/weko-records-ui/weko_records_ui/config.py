@@ -275,6 +275,15 @@ PDF_COVERPAGE_LANG_FILEPATH = blueprint.root_path + "/translations/"
 
 PDF_COVERPAGE_LANG_FILENAME = "/pdf_coverpage.json"
 
+WEKO_RECORDS_UI_PDF_COVERPAGE_CACHE_DIR = '/tmp/weko_records_ui_pdf_coverpage'
+"""Directory of the cached cover-page-combined PDF files."""
+
+WEKO_RECORDS_UI_PDF_COVERPAGE_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+"""Maximum total bytes of the cached cover-page-combined PDF files."""
+
+WEKO_RECORDS_UI_PDF_COVERPAGE_CACHE_MAX_FILES = 1000
+"""Maximum number of the cached cover-page-combined PDF files."""
+
 WEKO_RECORDS_UI_DEFAULT_MAX_WIDTH_THUMBNAIL = 100
 """Default max width of thumbnail."""
 
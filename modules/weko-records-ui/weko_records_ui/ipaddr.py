@@ -21,38 +21,153 @@
 """Utilities for site license check."""
 
 import ipaddress
+import threading
+import uuid
+from bisect import bisect_right
+from heapq import heappop, heappush
 
-from flask import current_app, request
+from flask import current_app, g, request
 from flask_security import current_user
+from invenio_cache import current_cache
 from weko_records.api import SiteLicense
+from weko_records.config import WEKO_RECORDS_SITE_LICENSE_VERSION_KEY
+
+_index = None
+_index_lock = threading.Lock()
+
+
+class SiteLicenseIndex(object):
+    """IP address ranges of the site licenses, sorted for binary search.
+
+    Overlapping ranges are split into disjoint segments, each owned by the
+    first site license covering it, so a lookup is a single bisection.
+    """
+
+    def __init__(self, site_licenses, version=None):
+        """Compile the IP address ranges of the site licenses.
+
+        :param site_licenses: Site licenses, in order of precedence.
+        :param version: Version of the site licenses.
+        """
+        self.version = version
+        ranges = {4: [], 6: []}
+        for order, site_license in enumerate(site_licenses):
+            name = site_license.get('organization_name')
+            for addr in site_license.get('addresses') or []:
+                try:
+                    start = ipaddress.ip_address(
+                        addr.get('start_ip_address'))
+                    finish = ipaddress.ip_address(
+                        addr.get('finish_ip_address'))
+                except ValueError:
+                    current_app.logger.warning(
+                        'Invalid site license address range: {}'.format(addr))
+                    continue
+                if start.version == finish.version and start <= finish:
+                    ranges[start.version].append(
+                        (int(start), int(finish), order, name))
+        self._segments = {version: self._build_segments(version_ranges)
+                          for version, version_ranges in ranges.items()}
+
+    @staticmethod
+    def _build_segments(ranges):
+        """Split the ranges into disjoint segments.
+
+        :param ranges: List of ``(start, finish, order, name)``.
+        :return: Lists of the segment starts, finishes and owners.
+        """
+        ranges.sort()
+        points = sorted(set(r[0] for r in ranges)
+                        | set(r[1] + 1 for r in ranges))
+        starts, finishes, owners = [], [], []
+        active = []
+        i = 0
+        for point, next_point in zip(points, points[1:]):
+            while i < len(ranges) and ranges[i][0] <= point:
+                heappush(active, (ranges[i][2], ranges[i][1], ranges[i][3]))
+                i += 1
+            while active and active[0][1] < point:
+                heappop(active)
+            if not active:
+                continue
+            order, _, name = active[0]
+            if owners and owners[-1][0] == order \
+                    and finishes[-1] == point - 1:
+                finishes[-1] = next_point - 1
+            else:
+                starts.append(point)
+                finishes.append(next_point - 1)
+                owners.append((order, name))
+        return starts, finishes, owners
+
+    def match(self, ip_addr):
+        """Get the organization name of the site license of an address.
+
+        :param ip_addr: IPv4 or IPv6 address.
+        :return: The organization name, or None.
+        """
+        try:
+            address = ipaddress.ip_address(ip_addr)
+        except ValueError:
+            return None
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        starts, finishes, owners = self._segments[address.version]
+        value = int(address)
+        i = bisect_right(starts, value) - 1
+        if i >= 0 and value <= finishes[i]:
+            return owners[i][1]
+        return None
+
+
+def get_site_license_index():
+    """Get the site license index of this process.
+
+    The index is rebuilt when ``SiteLicense.update`` changed the version.
+
+    :return: SiteLicenseIndex
+    """
+    global _index
+    key = current_app.config.get('WEKO_RECORDS_SITE_LICENSE_VERSION_KEY',
+                                 WEKO_RECORDS_SITE_LICENSE_VERSION_KEY)
+    version = current_cache.get(key)
+    if version is None:
+        current_cache.add(key, uuid.uuid4().hex, timeout=0)
+        version = current_cache.get(key)
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            index = _index
+            if index is None or index.version != version:
+                index = _index = SiteLicenseIndex(SiteLicense.get_records(),
+                                                  version=version)
+    return index
+
+
+def get_client_ip_address():
+    """Get the IP address of the client of the current request."""
+    forwarded_for = request.environ.get('HTTP_X_FORWARDED_FOR')
+    if forwarded_for is None:
+        return request.environ['REMOTE_ADDR']
+    return forwarded_for.split(',')[0].strip()
 
 
 def check_site_license_permission():
     """Check Site License Permission.
 
+    The result is computed once per request.
+
     :return: True or False
     """
-    http_f = 'HTTP_X_FORWARDED_FOR'
-    if request.environ.get(http_f) is None:
-        ip_addr = request.environ['REMOTE_ADDR']
-    else:
-        ip_addr = request.environ[http_f]
-
-    # current_app.logger. \
-    #     debug('-->>>>>>>>>>>>>>>>>>>>>>------------------ip address : {ip_adr}'.
-    #           format(ip_adr=ip_addr))
-
-    sl_lst = SiteLicense.get_records()
-    if ip_addr:
-        for lst in sl_lst:
-            current_app.logger.debug(lst)
-            addresses = lst.get('addresses')
-            for adr in addresses:
-                if match_ip_addr(adr, ip_addr):
-                    current_user.site_license_flag = True
-                    current_user.site_license_name = \
-                        lst.get('organization_name')
-                    return True
+    ip_addr = get_client_ip_address()
+    match = getattr(g, 'weko_site_license_match', None)
+    if match is None or match[0] != ip_addr:
+        name = get_site_license_index().match(ip_addr) if ip_addr else None
+        match = g.weko_site_license_match = (ip_addr, name)
+    if match[1] is not None:
+        current_user.site_license_flag = True
+        current_user.site_license_name = match[1]
+        return True
     return False
 
 
@@ -63,25 +178,9 @@ def match_ip_addr(addr, ip_addr):
     :param ip_addr:
     :return: True or False
     """
-    s_ddr = addr.get('start_ip_address')
-    f_ddr = addr.get('finish_ip_address')
-    ipaddress.ip_address(s_ddr)
-    ipaddress.ip_address(f_ddr)
-
-    ip_addr = ip_addr.split('.')
-    s_ddr = s_ddr.split('.')
-    f_ddr = f_ddr.split('.')
-
-    str0 = ""
-    str1 = ""
-    str2 = ""
-
-    for i in range(4):
-        str0 += '{:0>3}'.format(ip_addr[i])
-        str1 += '{:0>3}'.format(s_ddr[i])
-        str2 += '{:0>3}'.format(f_ddr[i])
-
-    if (int(str1) <= int(str0)) and (int(str0) <= int(str2)):
-        return True
-
-    return False
+    s_ddr = ipaddress.ip_address(addr.get('start_ip_address'))
+    f_ddr = ipaddress.ip_address(addr.get('finish_ip_address'))
+    ip_addr = ipaddress.ip_address(ip_addr)
+    if not s_ddr.version == f_ddr.version == ip_addr.version:
+        return False
+    return s_ddr <= ip_addr <= f_ddr
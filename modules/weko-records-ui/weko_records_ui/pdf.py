@@ -19,11 +19,16 @@
 # MA 02111-1307, USA.
 
 """Utilities for making the PDF cover page and newly combined PDFs."""
+import copy
+import hashlib
 import io
 import json
 import os
+import tempfile
+import threading
 import unicodedata
 from datetime import datetime
+from functools import lru_cache
 
 from flask import current_app, send_file
 from fpdf import FPDF
@@ -31,9 +36,10 @@ from invenio_db import db
 from invenio_files_rest.views import ObjectResource
 from invenio_pidstore.models import PersistentIdentifier
 from PyPDF2 import PdfFileReader, PdfFileWriter, utils
-from weko_records.api import ItemMetadata, ItemsMetadata, ItemType, Mapping
+from weko_records.api import ItemMetadata, ItemsMetadata, ItemType
+from weko_records.cache import get_cached_item_map, get_cached_mapping
 from weko_records.serializers.feed import WekoFeedGenerator
-from weko_records.serializers.utils import get_mapping, get_metadata_from_map
+from weko_records.serializers.utils import get_metadata_from_map
 
 from .models import PDFCoverPageSettings
 from .utils import get_license_pdf, get_pair_value
@@ -54,47 +60,183 @@ def get_east_asian_width_count(text):
     return count
 
 
+_fonts = {}
+_fonts_lock = threading.Lock()
+
+
+def _add_fonts(pdf):
+    """Add the IPAex fonts to a PDF.
+
+    The TTF files are parsed once per process, each PDF gets its own copy
+    of the subset of characters used.
+    """
+    paths = (current_app.config['JPAEXG_TTF_FILEPATH'],
+             current_app.config['JPAEXM_TTF_FILEPATH'])
+    fonts = _fonts.get(paths)
+    if fonts is None:
+        with _fonts_lock:
+            fonts = _fonts.get(paths)
+            if fonts is None:
+                proto = FPDF('P', 'mm', 'A4')
+                proto.add_font('IPAexg', '', paths[0], uni=True)
+                proto.add_font('IPAexm', '', paths[1], uni=True)
+                fonts = _fonts[paths] = (proto.fonts, proto.font_files)
+    for key, font in fonts[0].items():
+        pdf.fonts[key] = dict(font)
+        if 'subset' in font:
+            pdf.fonts[key]['subset'] = copy.deepcopy(font['subset'])
+    pdf.font_files.update(copy.deepcopy(fonts[1]))
+
+
+@lru_cache(maxsize=None)
+def _get_lang_data(lang_filepath):
+    """Get the labels of the cover page for a language."""
+    with open(lang_filepath) as json_datafile:
+        return json.loads(json_datafile.read())
+
+
+def _get_cache_path(key):
+    """Get the path of a cached combined PDF."""
+    return os.path.join(
+        current_app.config['WEKO_RECORDS_UI_PDF_COVERPAGE_CACHE_DIR'],
+        hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()
+        + '.pdf')
+
+
+def _evict_cache():
+    """Remove the least recently used combined PDFs above the limits."""
+    cache_dir = current_app.config['WEKO_RECORDS_UI_PDF_COVERPAGE_CACHE_DIR']
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith('.pdf'):
+            continue
+        try:
+            stat = os.stat(os.path.join(cache_dir, name))
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, name))
+    entries.sort(reverse=True)
+    max_size = current_app.config[
+        'WEKO_RECORDS_UI_PDF_COVERPAGE_CACHE_MAX_SIZE']
+    max_files = current_app.config[
+        'WEKO_RECORDS_UI_PDF_COVERPAGE_CACHE_MAX_FILES']
+    total = 0
+    for count, (_mtime, size, name) in enumerate(entries, 1):
+        total += size
+        if total > max_size or count > max_files:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
 """ Function making PDF cover page """
 
 
 def make_combined_pdf(pid, obj_file_uri, fileobj, obj, lang_user):
     """Make the cover-page-combined PDF file.
 
+    Combined PDFs are cached on disk by record revision, file checksum,
+    language and cover page settings. The least recently used ones are
+    removed when the cache is over its limits.
+
     :param pid: PID object
     :param file_uri: URI of the file object
     :param lang_user: LANGUAGE of access user
     :return: cover-page-combined PDF file object
     """
-    lang_filepath = current_app.config['PDF_COVERPAGE_LANG_FILEPATH']\
-        + lang_user + current_app.config['PDF_COVERPAGE_LANG_FILENAME']
-
     pidObject = PersistentIdentifier.get('recid', pid.pid_value)
     item_metadata_json = ItemsMetadata.get_record(pidObject.object_uuid)
-    item_type = ItemsMetadata.get_by_object_id(pidObject.object_uuid)
-    item_type_id = item_type.item_type_id
-    type_mapping = Mapping.get_record(item_type_id)
-    item_map = get_mapping(type_mapping, "jpcoar_mapping")
+    item_type_id = item_metadata_json.model.item_type_id
+    mapping = get_cached_mapping(item_type_id)
+    item_map = get_cached_item_map(item_type_id, 'jpcoar_mapping')
+    record = PDFCoverPageSettings.find(1)
 
-    with open(lang_filepath) as json_datafile:
-        lang_data = json.loads(json_datafile.read())
+    _file = 'file.URI.@value'
+    _file_item_id = None
+    if _file in item_map:
+        _file_item_id = item_map[_file].split('.')[0]
+        _file_item_id = _file_item_id.replace('fileinfo', 'files')
+    try:
+        combined_filename = 'CV_' + datetime.now().strftime('%Y%m%d') + '_' + \
+                            item_metadata_json[_file_item_id][0].get("filename")
+
+    except (KeyError, IndexError, TypeError):
+        combined_filename = 'CV_' + item_metadata_json['title'] + '.pdf'
+
+    checksum = obj.file.checksum if obj.file else fileobj.get('checksum')
+    cache_path = _get_cache_path([
+        str(pidObject.object_uuid),
+        item_metadata_json.revision_id,
+        str(obj.file_id),
+        checksum,
+        lang_user,
+        record.updated_at.isoformat() if record.updated_at else None,
+        [mapping.id, mapping.version_id] if mapping else None,
+    ])
+    if os.path.isfile(cache_path):
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+    else:
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as combined_file:
+                combined = _write_combined_pdf(
+                    combined_file, obj_file_uri, item_metadata_json,
+                    item_map, record, lang_user)
+            if combined:
+                os.replace(tmp_path, cache_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if not combined:
+            return ObjectResource.send_object(
+                obj.bucket, obj,
+                expected_chksum=fileobj.get('checksum'),
+                logger_data={
+                    'bucket_id': obj.bucket_id,
+                    'pid_type': pid.pid_type,
+                    'pid_value': pid.pid_value,
+                },
+                as_attachment=False
+            )
+        _evict_cache()
+
+    return send_file(
+        cache_path,
+        as_attachment=True,
+        attachment_filename=combined_filename,
+        mimetype='application/pdf',
+        cache_timeout=-1)
+
+
+def _write_combined_pdf(combined_file, obj_file_uri, item_metadata_json,
+                        item_map, record, lang_user):
+    """Write the cover page followed by the pages of the original PDF.
+
+    :param combined_file: file object the combined PDF is written to
+    :param obj_file_uri: URI of the original PDF
+    :param item_metadata_json: metadata of the item
+    :param item_map: JPCOAR mapping of the item type
+    :param record: PDF cover page settings
+    :param lang_user: LANGUAGE of access user
+    :return: False if the original PDF is encrypted, True otherwise
+    """
+    lang_filepath = current_app.config['PDF_COVERPAGE_LANG_FILEPATH']\
+        + lang_user + current_app.config['PDF_COVERPAGE_LANG_FILENAME']
+    lang_data = _get_lang_data(lang_filepath)
 
     # Initialize Instance
     pdf = FPDF('P', 'mm', 'A4')
+    _add_fonts(pdf)
     pdf.add_page()
     pdf.set_margins(20.0, 20.0)
     pdf.set_fill_color(100, 149, 237)
 
-    pdf.add_font(
-        'IPAexg',
-        '',
-        current_app.config["JPAEXG_TTF_FILEPATH"],
-        uni=True)
-    pdf.add_font(
-        'IPAexm',
-        '',
-        current_app.config["JPAEXM_TTF_FILEPATH"],
-        uni=True)
-
     # Parameters such as width and height of rows/columns
     w1 = 40  # width of the left column
     w2 = 130  # width of the right column
@@ -116,7 +258,6 @@ def make_combined_pdf(pid, obj_file_uri, fileobj, obj, lang_user):
     cc_logo_xposition = 160  # x-position of Creative Commons logos
 
     # Get the header settings
-    record = PDFCoverPageSettings.find(1)
     header_display_type = record.header_display_type
     header_output_string = record.header_output_string
     header_output_image = record.header_output_image
@@ -403,60 +544,25 @@ def make_combined_pdf(pid, obj_file_uri, fileobj, obj, lang_user):
 
     # Combine cover page and existing pages
     cover_page = PdfFileReader(b_output)
-    f = open(obj_file_uri, "rb")
-    existing_pages = PdfFileReader(f)
-
-    # In the case the PDF file is encrypted by the password, ''(i.e. not
-    # encrypted intentionally)
-    if existing_pages.isEncrypted:
-        try:
-            existing_pages.decrypt('')
-        except BaseException:  # Errors such as NotImplementedError
-            return ObjectResource.send_object(
-                obj.bucket, obj,
-                expected_chksum=fileobj.get('checksum'),
-                logger_data={
-                    'bucket_id': obj.bucket_id,
-                    'pid_type': pid.pid_type,
-                    'pid_value': pid.pid_value,
-                },
-                as_attachment=False
-            )
-
-    # In the case the PDF file is encrypted by the password except ''
-    if existing_pages.isEncrypted:
-        return ObjectResource.send_object(
-            obj.bucket, obj,
-            expected_chksum=fileobj.get('checksum'),
-            logger_data={
-                'bucket_id': obj.bucket_id,
-                'pid_type': pid.pid_type,
-                'pid_value': pid.pid_value,
-            },
-            as_attachment=False
-        )
-
-    combined_pages = PdfFileWriter()
-    combined_pages.addPage(cover_page.getPage(0))
-    for page_num in range(existing_pages.numPages):
-        existing_page = existing_pages.getPage(page_num)
-        combined_pages.addPage(existing_page)
-
-    # Download the newly generated combined PDF file
-    try:
-        combined_filename = 'CV_' + datetime.now().strftime('%Y%m%d') + '_' + \
-                            item_metadata_json[_file_item_id][0].get("filename")
-
-    except (KeyError, IndexError):
-        combined_filename = 'CV_' + title + '.pdf'
-    combined_filepath = "/code/invenio/{}.pdf".format(combined_filename)
-    combined_file = open(combined_filepath, "wb")
-    combined_pages.write(combined_file)
-    combined_file.close()
-
-    return send_file(
-        combined_filepath,
-        as_attachment=True,
-        attachment_filename=combined_filename,
-        mimetype='application/pdf',
-        cache_timeout=-1)
+    with open(obj_file_uri, "rb") as f:
+        existing_pages = PdfFileReader(f)
+
+        # In the case the PDF file is encrypted by the password, ''(i.e. not
+        # encrypted intentionally)
+        if existing_pages.isEncrypted:
+            try:
+                existing_pages.decrypt('')
+            except BaseException:  # Errors such as NotImplementedError
+                return False
+
+        # In the case the PDF file is encrypted by the password except ''
+        if existing_pages.isEncrypted:
+            return False
+
+        combined_pages = PdfFileWriter()
+        combined_pages.addPage(cover_page.getPage(0))
+        for page_num in range(existing_pages.numPages):
+            existing_page = existing_pages.getPage(page_num)
+            combined_pages.addPage(existing_page)
+        combined_pages.write(combined_file)
+    return True
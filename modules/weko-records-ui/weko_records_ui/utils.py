@@ -160,8 +160,12 @@ def is_billing_item(item_type_id):
         return False
 
 
-def soft_delete(recid):
-    """Soft delete item."""
+def soft_delete(recid, commit=True):
+    """Soft delete item.
+
+    :param recid: recid or object uuid of the item.
+    :param commit: Commit the session, otherwise the caller commits it.
+    """
     try:
         pid = PersistentIdentifier.query.filter_by(
             pid_type='recid', pid_value=recid).first()
@@ -181,9 +185,11 @@ def soft_delete(recid):
             object_uuid=pid.object_uuid)
         for p in pids:
             p.status = PIDStatus.DELETED
-        db.session.commit()
+        if commit:
+            db.session.commit()
     except Exception as ex:
-        db.session.rollback()
+        if commit:
+            db.session.rollback()
         raise ex
 
 
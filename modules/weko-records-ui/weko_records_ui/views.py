@@ -20,7 +20,6 @@
 
 """Blueprint for weko-records-ui."""
 
-import redis
 import six
 import werkzeug
 from flask import Blueprint, abort, current_app, flash, jsonify, \
@@ -39,12 +38,12 @@ from invenio_pidstore.models import PersistentIdentifier, PIDStatus
 from invenio_records_ui.signals import record_viewed
 from invenio_records_ui.utils import obj_or_import_string
 from lxml import etree
-from simplekv.memory.redisstore import RedisStore
 from weko_deposit.api import WekoIndexer, WekoRecord
 from weko_deposit.pidstore import get_record_without_version
 from weko_index_tree.models import IndexStyle
 from weko_index_tree.utils import get_index_link_list
 from weko_records.api import ItemLink
+from weko_records.redis_client import get_redis_store
 from weko_records.serializers import citeproc_v1
 from weko_search_ui.api import get_search_detail_keyword
 from weko_workflow.api import WorkFlow
@@ -461,8 +460,7 @@ def default_view_method(pid, record, filename=None, template=None, **kwargs):
 
     can_update_version = has_update_version_role(current_user)
 
-    datastore = RedisStore(redis.StrictRedis.from_url(
-        current_app.config['CACHE_REDIS_URL']))
+    datastore = get_redis_store()
     cache_key = current_app.config['WEKO_ADMIN_CACHE_PREFIX'].\
         format(name='display_stats')
     if datastore.redis.exists(cache_key):
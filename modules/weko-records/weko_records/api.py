@@ -20,10 +20,12 @@
 
 """Record API."""
 
+import uuid
 from copy import deepcopy
 
 from flask import current_app
 from flask_babelex import gettext as _
+from invenio_cache import current_cache
 from invenio_db import db
 from invenio_pidstore.models import PersistentIdentifier
 from invenio_records.api import Record
@@ -37,6 +39,7 @@ from sqlalchemy.orm.attributes import flag_modified
 from sqlalchemy.sql.expression import desc
 from werkzeug.local import LocalProxy
 
+from .config import WEKO_RECORDS_SITE_LICENSE_VERSION_KEY
 from .fetchers import weko_record_fetcher
 from .models import FeedbackMailList as _FeedbackMailList
 from .models import FileMetadata, ItemMetadata, ItemReference, ItemType
@@ -1559,6 +1562,12 @@ class SiteLicense(RecordBase):
     @classmethod
     def update(cls, obj):
         """Update method."""
+        def join_addr(addr):
+            # IPv4 addresses are sent as a list of octets
+            if isinstance(addr, str):
+                return addr
+            return '.'.join(addr)
+
         def get_addr(lst, id_):
             if lst and isinstance(lst, list):
                 sld = []
@@ -1566,9 +1575,9 @@ class SiteLicense(RecordBase):
                     sl = SiteLicenseIpAddress(
                         organization_id=id_,
                         organization_no=j + 1,
-                        start_ip_address='.'.join(
+                        start_ip_address=join_addr(
                             lst[j].get('start_ip_address')),
-                        finish_ip_address='.'.join(
+                        finish_ip_address=join_addr(
                             lst[j].get('finish_ip_address'))
                     )
                     sld.append(sl)
@@ -1603,6 +1612,10 @@ class SiteLicense(RecordBase):
                 # add new rows
                 db.session.add_all(sif)
         db.session.commit()
+        current_cache.set(
+            current_app.config.get('WEKO_RECORDS_SITE_LICENSE_VERSION_KEY',
+                                   WEKO_RECORDS_SITE_LICENSE_VERSION_KEY),
+            uuid.uuid4().hex, timeout=0)
 
 
 class RevisionsIterator(object):
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of WEKO3.
+# Copyright (C) 2017 National Institute of Informatics.
+#
+# WEKO3 is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# WEKO3 is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WEKO3; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+
+"""Process-local cache of item types and item type mappings.
+
+Item types and mappings are read for every record that is serialized or
+indexed, but they rarely change. The parsed values are kept in a bounded LRU
+cache per process. An entry older than the TTL is validated against the
+``version_id`` of its row before it is used again, and the entries of the
+rows changed through this process are dropped at once.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import current_app
+from invenio_db import db
+from sqlalchemy.sql.expression import desc
+
+from .config import WEKO_RECORDS_ITEM_TYPE_CACHE_SIZE, \
+    WEKO_RECORDS_ITEM_TYPE_CACHE_TTL
+from .models import ItemType, ItemTypeMapping
+
+CachedItemType = namedtuple(
+    'CachedItemType',
+    ['id', 'version_id', 'name', 'schema', 'form', 'render', 'derived'])
+"""Item type values. ``derived`` holds values computed from the item type."""
+
+CachedMapping = namedtuple(
+    'CachedMapping',
+    ['id', 'version_id', 'item_type_id', 'mapping', 'derived'])
+"""Item type mapping values. ``derived`` holds values computed from them."""
+
+
+class LRUCache(object):
+    """Bounded LRU cache whose entries are re-validated after a TTL."""
+
+    def __init__(self, maxsize=WEKO_RECORDS_ITEM_TYPE_CACHE_SIZE,
+                 ttl=WEKO_RECORDS_ITEM_TYPE_CACHE_TTL):
+        """Initialize the cache.
+
+        :param maxsize: Maximum number of entries.
+        :param ttl: Seconds an entry is used without validation.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get an entry.
+
+        :param key: Key of the entry.
+        :return: Tuple of the value and whether it must be validated, or
+            ``(None, True)`` if there is no entry.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None, True
+            self._data.move_to_end(key)
+            value, checked = entry
+            return value, time.monotonic() - checked > self.ttl
+
+    def set(self, key, value):
+        """Set an entry, evicting the least recently used one if full.
+
+        :param key: Key of the entry.
+        :param value: Value of the entry.
+        """
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        """Remove an entry.
+
+        :param key: Key of the entry.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove all the entries."""
+        with self._lock:
+            self._data.clear()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def _get_cache(name):
+    """Get the process-local cache of the given name."""
+    cache = _caches.get(name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                cache = _caches[name] = LRUCache(
+                    current_app.config.get(
+                        'WEKO_RECORDS_ITEM_TYPE_CACHE_SIZE',
+                        WEKO_RECORDS_ITEM_TYPE_CACHE_SIZE),
+                    current_app.config.get(
+                        'WEKO_RECORDS_ITEM_TYPE_CACHE_TTL',
+                        WEKO_RECORDS_ITEM_TYPE_CACHE_TTL))
+    return cache
+
+
+def get_cached_item_type(item_type_id):
+    """Get the cached values of an item type.
+
+    The returned values are shared, callers must not modify them.
+
+    :param item_type_id: Identifier of the item type.
+    :return: The :class:`CachedItemType` or None if it does not exist.
+    """
+    item_type_id = int(item_type_id)
+    cache = _get_cache('item_type')
+    value, expired = cache.get(item_type_id)
+    if value is not None and not expired:
+        return value
+
+    with db.session.no_autoflush:
+        version_id = db.session.query(ItemType.version_id).filter(
+            ItemType.id == item_type_id,
+            ItemType.is_deleted.is_(False)).scalar()
+        if version_id is None:
+            cache.pop(item_type_id)
+            return None
+        if value is None or value.version_id != version_id:
+            obj = ItemType.query.filter_by(id=item_type_id).one()
+            value = CachedItemType(
+                id=obj.id,
+                version_id=obj.version_id,
+                name=obj.item_type_name.name,
+                schema=obj.schema,
+                form=obj.form,
+                render=obj.render,
+                derived={})
+    cache.set(item_type_id, value)
+    return value
+
+
+def get_cached_mapping(item_type_id):
+    """Get the cached values of the latest mapping of an item type.
+
+    The returned values are shared, callers must not modify them.
+
+    :param item_type_id: Identifier of the item type.
+    :return: The :class:`CachedMapping` or None if it does not exist.
+    """
+    item_type_id = int(item_type_id)
+    cache = _get_cache('mapping')
+    value, expired = cache.get(item_type_id)
+    if value is not None and not expired:
+        return value
+
+    with db.session.no_autoflush:
+        query = ItemTypeMapping.query.filter_by(
+            item_type_id=item_type_id).filter(
+            ItemTypeMapping.mapping != None).order_by(  # noqa
+            desc(ItemTypeMapping.created))
+        latest = query.with_entities(ItemTypeMapping.id,
+                                     ItemTypeMapping.version_id).first()
+        if latest is None:
+            cache.pop(item_type_id)
+            return None
+        if value is None or (value.id, value.version_id) != tuple(latest):
+            obj = query.first()
+            value = CachedMapping(
+                id=obj.id,
+                version_id=obj.version_id,
+                item_type_id=obj.item_type_id,
+                mapping=obj.mapping,
+                derived={})
+    cache.set(item_type_id, value)
+    return value
+
+
+def get_cached_item_map(item_type_id, mapping_type):
+    """Get the flattened mapping of a type of the latest mapping.
+
+    The item map is computed once per mapping version and kept with it.
+
+    :param item_type_id: Identifier of the item type.
+    :param mapping_type: Type of the mapping (e.g. ``jpcoar_mapping``).
+    :return: Dictionary of the mapping keys and item properties.
+    """
+    from .serializers.utils import get_mapping
+
+    mapping = get_cached_mapping(item_type_id)
+    if not mapping:
+        return {}
+    item_map = mapping.derived.get(mapping_type)
+    if item_map is None:
+        item_map = mapping.derived[mapping_type] = get_mapping(
+            mapping.mapping, mapping_type)
+    return item_map
+
+
+def clear_item_type_cache(item_type_id=None):
+    """Drop the cached values of an item type, or of all item types.
+
+    :param item_type_id: Identifier of the item type.
+    """
+    for name in ('item_type', 'mapping'):
+        cache = _caches.get(name)
+        if cache is None:
+            continue
+        if item_type_id is None:
+            cache.clear()
+        else:
+            cache.pop(int(item_type_id))
+
+
+@db.event.listens_for(ItemType, 'after_update')
+@db.event.listens_for(ItemType, 'after_delete')
+def _item_type_changed(mapper, connection, target):
+    """Drop the cached values of a changed item type."""
+    clear_item_type_cache(target.id)
+
+
+@db.event.listens_for(ItemTypeMapping, 'after_insert')
+@db.event.listens_for(ItemTypeMapping, 'after_update')
+@db.event.listens_for(ItemTypeMapping, 'after_delete')
+def _mapping_changed(mapper, connection, target):
+    """Drop the cached values of the item type of a changed mapping."""
+    clear_item_type_cache(target.item_type_id)
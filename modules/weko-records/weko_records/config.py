@@ -51,3 +51,18 @@ WEKO_ITEMPROPS_SCHEMAID_PUBLISH = 68
 # Item property ID of Publisher schema
 
 WEKO_ITEMTYPE_ID_BASEFILESVIEW = 10
+
+WEKO_RECORDS_ITEM_TYPE_CACHE_SIZE = 128
+"""Maximum number of item types and mappings cached per process."""
+
+WEKO_RECORDS_ITEM_TYPE_CACHE_TTL = 60
+"""Seconds a cached item type is used before its version is checked."""
+
+WEKO_RECORDS_SITE_LICENSE_VERSION_KEY = 'weko_records_site_license_version'
+"""Cache key of the version of the site licenses, changed on updates."""
+
+WEKO_RECORDS_REDIS_MAX_CONNECTIONS = None
+"""Maximum number of connections of the shared Redis pool per process."""
+
+WEKO_RECORDS_REDIS_SLOW_COMMAND_TIME = 0.1
+"""Seconds above which a Redis command is logged as slow."""
@@ -605,12 +605,12 @@ class SiteLicenseIpAddress(db.Model, Timestamp):
     )
 
     start_ip_address = db.Column(
-        db.String(16),
+        db.String(39),
         nullable=False
     )
 
     finish_ip_address = db.Column(
-        db.String(16),
+        db.String(39),
         nullable=False
     )
 
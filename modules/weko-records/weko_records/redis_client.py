@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of WEKO3.
+# Copyright (C) 2017 National Institute of Informatics.
+#
+# WEKO3 is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# WEKO3 is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WEKO3; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+
+"""Shared Redis client of the application.
+
+``redis.StrictRedis.from_url`` creates a new connection pool on every call,
+so a client created per request opens a new connection per request. The
+client returned by :func:`get_redis` is created once per application and
+process, and its connection pool is shared by all the callers. Commands are
+timed and the connections opened by the pool are counted, see
+:func:`get_redis_metrics`, served to administrators by weko-admin at
+``/admin/redis_metrics``.
+"""
+
+import os
+import threading
+import time
+
+import redis
+from flask import current_app
+from simplekv.memory.redisstore import RedisStore
+
+from .config import WEKO_RECORDS_REDIS_MAX_CONNECTIONS, \
+    WEKO_RECORDS_REDIS_SLOW_COMMAND_TIME
+
+_EXTENSION_KEY = 'weko-records-redis'
+_lock = threading.Lock()
+
+
+class RedisMetrics(object):
+    """Counters of the commands and connections of a Redis client."""
+
+    def __init__(self):
+        """Initialize the counters."""
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.commands = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def connected(self):
+        """Count a connection opened by the pool."""
+        with self._lock:
+            self.connections += 1
+
+    def record(self, elapsed, error=False):
+        """Count a command.
+
+        :param elapsed: Seconds the command took.
+        :param error: Whether the command failed.
+        """
+        with self._lock:
+            self.commands += 1
+            if error:
+                self.errors += 1
+            self.total_time += elapsed
+            self.max_time = max(self.max_time, elapsed)
+
+    def as_dict(self):
+        """Get the counters."""
+        with self._lock:
+            return dict(
+                connections=self.connections,
+                commands=self.commands,
+                errors=self.errors,
+                total_time=self.total_time,
+                max_time=self.max_time,
+                average_time=self.total_time / self.commands
+                if self.commands else 0.0)
+
+
+class MeteredConnectionPool(redis.ConnectionPool):
+    """Connection pool counting the connections it opens."""
+
+    metrics = None
+
+    def make_connection(self):
+        """Create a new connection."""
+        connection = super(MeteredConnectionPool, self).make_connection()
+        if self.metrics:
+            self.metrics.connected()
+        return connection
+
+
+class MeteredRedis(redis.StrictRedis):
+    """Redis client timing its commands."""
+
+    metrics = None
+    slow_command_time = WEKO_RECORDS_REDIS_SLOW_COMMAND_TIME
+
+    def execute_command(self, *args, **options):
+        """Execute a command and record its duration."""
+        start = time.monotonic()
+        error = True
+        try:
+            result = super(MeteredRedis, self).execute_command(
+                *args, **options)
+            error = False
+            return result
+        finally:
+            self._record(args[0] if args else '', start, error)
+
+    def _record(self, name, start, error):
+        """Record the duration of a command."""
+        elapsed = time.monotonic() - start
+        if self.metrics:
+            self.metrics.record(elapsed, error)
+        if elapsed > self.slow_command_time:
+            current_app.logger.warning(
+                'Slow Redis {0}: {1:.3f}s'.format(name, elapsed))
+
+
+def _create_redis(app, url):
+    """Create a Redis client of an application."""
+    config = app.config
+    metrics = RedisMetrics()
+    pool = MeteredConnectionPool.from_url(
+        url,
+        max_connections=config.get('WEKO_RECORDS_REDIS_MAX_CONNECTIONS',
+                                   WEKO_RECORDS_REDIS_MAX_CONNECTIONS))
+    pool.metrics = metrics
+    client = MeteredRedis(connection_pool=pool)
+    client.metrics = metrics
+    client.slow_command_time = config.get(
+        'WEKO_RECORDS_REDIS_SLOW_COMMAND_TIME',
+        WEKO_RECORDS_REDIS_SLOW_COMMAND_TIME)
+    return client
+
+
+def get_redis(url=None, app=None):
+    """Get a shared Redis client of the application.
+
+    :param url: Redis URL, ``CACHE_REDIS_URL`` by default.
+    :param app: The Flask application, the current one by default.
+    :return: The :class:`MeteredRedis` client.
+    """
+    app = app or current_app._get_current_object()
+    url = url or app.config['CACHE_REDIS_URL']
+    clients = app.extensions.get(_EXTENSION_KEY) or {}
+    client = clients.get(url)
+    if client is None:
+        with _lock:
+            clients = app.extensions.setdefault(_EXTENSION_KEY, {})
+            client = clients.get(url)
+            if client is None:
+                client = clients[url] = _create_redis(app, url)
+    return client
+
+
+def get_redis_store(url=None, app=None):
+    """Get a key-value store on a shared Redis client.
+
+    :param url: Redis URL, ``CACHE_REDIS_URL`` by default.
+    :param app: The Flask application, the current one by default.
+    :return: The :class:`simplekv.memory.redisstore.RedisStore`.
+    """
+    return RedisStore(get_redis(url, app))
+
+
+def get_session_redis_store(app=None):
+    """Get the key-value store of the item registration sessions.
+
+    :param app: The Flask application, the current one by default.
+    :return: The :class:`simplekv.memory.redisstore.RedisStore`.
+    """
+    return get_redis_store('redis://{host}:{port}/1'.format(
+        host=os.getenv('INVENIO_REDIS_HOST', 'localhost'),
+        port=os.getenv('INVENIO_REDIS_PORT', '6379')), app)
+
+
+def get_redis_metrics(app=None):
+    """Get the command and connection counters of the shared clients.
+
+    :param app: The Flask application, the current one by default.
+    :return: Dict of the counters of this process by Redis URL.
+    """
+    app = app or current_app._get_current_object()
+    clients = app.extensions.get(_EXTENSION_KEY) or {}
+    return {url: client.metrics.as_dict()
+            for url, client in list(clients.items())}
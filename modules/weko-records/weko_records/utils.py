@@ -21,6 +21,7 @@
 """Item API."""
 
 from collections import OrderedDict
+from copy import deepcopy
 
 import pytz
 from flask import current_app
@@ -29,7 +30,8 @@ from invenio_pidstore import current_pidstore
 from invenio_pidstore.ext import pid_exists
 from weko_schema_ui.schema import SchemaTree
 
-from .api import ItemTypes, Mapping
+from .api import ItemTypes
+from .cache import get_cached_item_type, get_cached_mapping
 
 
 def json_loader(data, pid):
@@ -56,11 +58,13 @@ def json_loader(data, pid):
     item_type_id = data["$schema"][index + 1:]
 
     # get item type mappings
-    ojson = ItemTypes.get_record(item_type_id)
-    mjson = Mapping.get_record(item_type_id)
+    item_type = get_cached_item_type(item_type_id)
+    mjson = get_cached_mapping(item_type_id)
 
-    if ojson and mjson:
-        mp = mjson.dumps()
+    if item_type and mjson:
+        ojson = dict(item_type.schema)
+        ojson["properties"] = dict(ojson["properties"])
+        mp = deepcopy(mjson.mapping)
         data.get("$schema")
         for k, v in data.items():
             if k != "pubdate":
@@ -154,7 +158,7 @@ def json_loader(data, pid):
         jrc.update(dict(control_number=pid))
         jrc.update(dict(_oai={"id": oai_value}))
         jrc.update(dict(_item_metadata=dc))
-        jrc.update(dict(itemtype=ojson.model.item_type_name.name))
+        jrc.update(dict(itemtype=item_type.name))
         jrc.update(dict(publish_date=pubdate))
 
         # save items's creator to check permission
@@ -192,7 +196,7 @@ def json_loader(data, pid):
                     dc.update(dict(weko_shared_id=data.get('shared_user_id',
                                                            None)))
 
-    del ojson, mjson, item
+    del item_type, mjson, item
     return dc, jrc, is_edit
 
 
@@ -449,11 +453,14 @@ def get_options_and_order_list(item_type_id):
     :param item_type_id:
     :return: options dict and sorted list
     """
-    ojson = ItemTypes.get_record(item_type_id)
-    solst = find_items(ojson.model.form)
-    meta_options = ojson.model.render.get('meta_fix')
-    meta_options.update(ojson.model.render.get('meta_list'))
-    return solst, meta_options
+    ojson = get_cached_item_type(item_type_id)
+    options = ojson.derived.get('options')
+    if options is None:
+        solst = find_items(ojson.form)
+        meta_options = dict(ojson.render.get('meta_fix'))
+        meta_options.update(ojson.render.get('meta_list'))
+        options = ojson.derived['options'] = (solst, meta_options)
+    return options
 
 
 def sort_meta_data_by_options(record_hit):
@@ -68,6 +68,12 @@ WEKO_SCHEMA_UI_RESPONSE_MESSAGES = {}
 WEKO_SCHEMA_CACHE_PREFIX = 'cache_{schema_name}'
 """ cache items prifix info"""
 
+WEKO_SCHEMA_COMPILED_CACHE_SIZE = 32
+"""Maximum number of compiled schemas kept per process."""
+
+WEKO_SCHEMA_COMPILED_CACHE_TTL = 60
+"""Seconds a compiled schema is used before its version is checked."""
+
 # WEKO_SCHEMA_UI_FORMAT_EDIT = 'weko_schema_ui/edit.html'
 # WEKO_SCHEMA_UI_FORMAT_EDIT_API = '/api/schemas/'
 # """URL of search endpoint for schemas."""
@@ -22,22 +22,34 @@
 
 import copy
 import json
-from collections import Iterable, OrderedDict
+from collections import Iterable, OrderedDict, namedtuple
 from functools import partial
 
-import redis
 import xmlschema
 from flask import abort, current_app, request, url_for
+from invenio_db import db
 from lxml import etree
 from lxml.builder import ElementMaker
-from simplekv.memory.redisstore import RedisStore
-from weko_records.api import Mapping
+from weko_records.cache import LRUCache, get_cached_mapping
+from weko_records.redis_client import get_redis_store
 from xmlschema.validators import XsdAnyAttribute, XsdAnyElement, \
     XsdAtomicBuiltin, XsdAtomicRestriction, XsdAttribute, \
     XsdEnumerationFacet, XsdGroup, XsdPatternsFacet, XsdSingleFacet, \
     XsdUnion
 
 from .api import WekoSchema
+from .config import WEKO_SCHEMA_COMPILED_CACHE_SIZE, \
+    WEKO_SCHEMA_COMPILED_CACHE_TTL
+from .models import OAIServerSchema
+
+CompiledSchema = namedtuple(
+    'CompiledSchema',
+    ['version_id', 'root_name', 'namespaces', 'schema', 'schema_location',
+     'target_namespace'])
+"""Parsed values of a schema, shared by the schema trees of a process."""
+
+_compiled_schemas = LRUCache(WEKO_SCHEMA_COMPILED_CACHE_SIZE,
+                             WEKO_SCHEMA_COMPILED_CACHE_TTL)
 
 
 class SchemaConverter:
@@ -233,13 +245,12 @@ class SchemaTree:
         self._separate_nodes = None
         self._location = ''
         self._target_namespace = ''
-        schemas = WekoSchema.get_all()
         if self._record and self._item_type_id:
             self._ignore_list = self.get_ignore_item_from_option()
-        for schema in schemas:
-            if self._schema_name == schema.schema_name:
-                self._location = schema.schema_location
-                self._target_namespace = schema.target_namespace
+        schema = get_compiled_schema(self._schema_name)
+        if schema:
+            self._location = schema.schema_location
+            self._target_namespace = schema.target_namespace
 
     def get_ignore_item_from_option(self):
         """Get all keys of properties that is enable Hide option in metadata."""
@@ -260,10 +271,10 @@ class SchemaTree:
 
         """
         # Get Schema info
-        rec = cache_schema(self._schema_name)
+        rec = get_compiled_schema(self._schema_name)
 
-        if not rec:
-            return None, None, None
+        if not rec or not rec.schema:
+            return None, None, None, None
 
         def get_mapping():
 
@@ -271,9 +282,9 @@ class SchemaTree:
                 id = self._record.pop("item_type_id")
                 self._record.pop("_buckets", {})
                 self._record.pop("_deposit", {})
-                mjson = Mapping.get_record(id)
-                self.item_type_mapping = mjson
-                mp = mjson.dumps()
+                mjson = get_cached_mapping(id)
+                self.item_type_mapping = mjson.mapping
+                mp = copy.deepcopy(mjson.mapping)
                 if mjson:
                     for k, v in self._record.items():
                         if isinstance(v, dict) and mp.get(k) and k != "_oai":
@@ -283,8 +294,8 @@ class SchemaTree:
 
         # inject mappings info to record
         item_type_id = get_mapping()
-        return rec.get('root_name'), rec.get('namespaces'), rec.get(
-            'schema'), item_type_id
+        # namespaces are modified when the xml is created
+        return rec.root_name, dict(rec.namespaces), rec.schema, item_type_id
 
     def __converter(self, node):
         description_type = "descriptionType"
@@ -1303,8 +1314,7 @@ def cache_schema(schema_name, delete=False):
 
     try:
         # schema cached on Redis by schema name
-        datastore = RedisStore(redis.StrictRedis.from_url(
-            current_app.config['CACHE_REDIS_URL']))
+        datastore = get_schema_datastore()
         cache_key = current_app.config[
             'WEKO_SCHEMA_CACHE_PREFIX'].format(schema_name=schema_name)
         data_str = datastore.get(cache_key)
@@ -1333,10 +1343,10 @@ def delete_schema_cache(schema_name):
     :return:
 
     """
+    _compiled_schemas.pop(schema_name)
     try:
         # schema cached on Redis by schema name
-        datastore = RedisStore(redis.StrictRedis.from_url(
-            current_app.config['CACHE_REDIS_URL']))
+        datastore = get_schema_datastore()
         cache_key = current_app.config[
             'WEKO_SCHEMA_CACHE_PREFIX'].format(schema_name=schema_name)
         datastore.delete(cache_key)
@@ -1344,6 +1354,51 @@ def delete_schema_cache(schema_name):
         pass
 
 
+def get_schema_datastore():
+    """Get the Redis store of the schema cache.
+
+    The store uses the connection pool shared by the application.
+    """
+    return get_redis_store()
+
+
+def get_compiled_schema(schema_name):
+    """
+    Get the parsed schema, cached per process.
+
+    The values are shared, callers must not modify them.
+
+    :param schema_name:
+    :return: The :class:`CompiledSchema` or None if it does not exist.
+
+    """
+    value, expired = _compiled_schemas.get(schema_name)
+    if value is not None and not expired:
+        return value
+
+    with db.session.no_autoflush:
+        row = db.session.query(
+            OAIServerSchema.version_id,
+            OAIServerSchema.schema_location,
+            OAIServerSchema.target_namespace).filter(
+            OAIServerSchema.schema_name == schema_name,
+            OAIServerSchema.isvalid == True).first()  # noqa
+    if row is None:
+        _compiled_schemas.pop(schema_name)
+        return None
+    if value is None or value.version_id != row.version_id:
+        rec = cache_schema(schema_name) or {}
+        value = CompiledSchema(
+            version_id=row.version_id,
+            root_name=rec.get('root_name'),
+            namespaces=rec.get('namespaces') or {},
+            schema=rec.get('schema'),
+            schema_location=row.schema_location,
+            target_namespace=row.target_namespace)
+    _compiled_schemas.set(schema_name, value)
+    return value
+
+
 def schema_list_render(pid=None, **kwargs):
     """
     Return records for template.
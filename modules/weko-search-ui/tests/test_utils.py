@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of WEKO3.
+# Copyright (C) 2017 National Institute of Informatics.
+#
+# WEKO3 is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# WEKO3 is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WEKO3; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+
+"""Utils tests."""
+
+from weko_search_ui import utils
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {'title': {'type': 'string'}},
+    'required': ['title'],
+}
+
+
+def test_handle_validate_item_import_chunks(app, monkeypatch):
+    """Test items validated in chunks by a pool of processes."""
+    app.config.update(
+        WEKO_SEARCH_UI_IMPORT_VALIDATION_WORKERS=2,
+        WEKO_SEARCH_UI_IMPORT_VALIDATION_CHUNK_SIZE=2,
+    )
+    monkeypatch.setattr(utils, 'handle_replace_new_index', lambda: ['1'])
+    records = [{'id': str(i), 'metadata': {'title': 'item {}'.format(i)}}
+               for i in range(5)]
+    records[1]['metadata'] = {'title': 1}
+    records[3]['id'] = 'x'
+
+    # The rows are read from an iterator, one chunk at a time
+    result = utils.handle_validate_item_import(iter(records), SCHEMA)
+
+    assert [r['id'] for r in result] == ['0', '1', '2', 'x', '4']
+    assert result[0]['errors'] is None
+    assert result[1]['errors'] == ["1 is not of type 'string'"]
+    assert result[2]['errors'] is None
+    assert result[3]['errors'] == ['Incorrect Item id']
+    assert result[4]['errors'] is None
+    assert result[0]['metadata']['path'] == ['1']
+
+    # The same errors without the pool
+    app.config['WEKO_SEARCH_UI_IMPORT_VALIDATION_WORKERS'] = 1
+    assert [r['errors'] for r in utils.handle_validate_item_import(
+        records, SCHEMA)] == [r['errors'] for r in result]
+
+
+def test_import_items_to_system_batch_index_errors(app, monkeypatch):
+    """Test documents failing to be indexed fail the row they belong to."""
+    indexer = utils.WekoDeposit.indexer
+
+    def import_item(item):
+        indexer._get_buffer()['actions'].append({'_id': 'uuid-' + item['id']})
+        return dict(success=True)
+
+    def bulk(actions, chunk_size=None, thread_count=None):
+        assert [a['_id'] for a in actions] == ['uuid-1', 'uuid-2']
+        return dict(success=1, conflict=0, error=1,
+                    errors=[('uuid-2', 'mapper_parsing_exception')])
+
+    monkeypatch.setattr(utils, 'import_items_to_system', import_item)
+    monkeypatch.setattr(indexer, 'bulk', bulk)
+    results = utils.import_items_to_system_batch([{'id': '1'}, {'id': '2'}])
+
+    assert results[0]['success'] is True
+    assert results[1]['success'] is False
+    assert results[1]['item_id'] == '2'
+    assert 'mapper_parsing_exception' in results[1]['error']
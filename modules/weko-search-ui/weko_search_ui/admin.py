@@ -36,9 +36,9 @@ from weko_search_ui.api import get_search_detail_keyword
 
 from .config import WEKO_IMPORT_CHECK_LIST_NAME, WEKO_IMPORT_LIST_NAME, \
     WEKO_ITEM_ADMIN_IMPORT_TEMPLATE
-from .tasks import import_item, remove_temp_dir_task
+from .tasks import import_item, import_items_batch, remove_temp_dir_task
 from .utils import check_import_items, create_flow_define, delete_records, \
-    get_content_workflow, get_tree_items, handle_workflow, make_stats_tsv
+    get_content_workflow, get_tree_items, handle_workflows, make_stats_tsv
 
 _signals = Namespace()
 searched = _signals.signal('searched')
@@ -281,15 +281,20 @@ class ItemImportView(BaseView):
         list_record = [item for item in data.get(
             'list_record', []) if not item.get(
             'errors')]
-        for item in list_record:
-            item['root_path'] = data.get('root_path')
-            create_flow_define()
-            handle_workflow(item)
-            task = import_item.delay(item)
-            tasks.append({
-                'task_id': task.task_id,
-                'item_id': item.get('id'),
-            })
+        create_flow_define()
+        handle_workflows(list_record)
+        batch_size = current_app.config['WEKO_SEARCH_UI_IMPORT_BATCH_SIZE']
+        for start in range(0, len(list_record), batch_size):
+            batch = list_record[start:start + batch_size]
+            for item in batch:
+                item['root_path'] = data.get('root_path')
+            task = import_items_batch.delay(batch)
+            for batch_index, item in enumerate(batch):
+                tasks.append({
+                    'task_id': task.task_id,
+                    'item_id': item.get('id'),
+                    'batch_index': batch_index,
+                })
         response_object = {
             "status": "success",
             "data": {
@@ -307,6 +312,13 @@ class ItemImportView(BaseView):
             status = 'done'
             for task_item in data.get('tasks'):
                 task_id = task_item.get('task_id')
+                if 'batch_index' in task_item:
+                    task_status = self._get_batch_item_status(task_item)
+                    if task_status['task_status'] not in ('SUCCESS',
+                                                          'FAILURE'):
+                        status = 'doing'
+                    result.append(task_status)
+                    continue
                 task = import_item.AsyncResult(task_id)
                 start_date = task.result.get(
                     "start_date"
@@ -322,13 +334,46 @@ class ItemImportView(BaseView):
                     "task_id": task_id,
                     "item_id": task_item.get("item_id"),
                 }))
-                status = 'doing' if not (task.successful() or task.failed())\
-                    else "done"
+                if not (task.successful() or task.failed()):
+                    status = 'doing'
             response_object = {"status": status, "result": result}
         else:
             response_object = {"status": "error", "result": result}
         return jsonify(response_object)
 
+    @staticmethod
+    def _get_batch_item_status(task_item):
+        """Get status of an item imported by a batch task."""
+        task = import_items_batch.AsyncResult(task_item.get('task_id'))
+        info = task.info if isinstance(task.info, dict) else {}
+        items = info.get('items') or []
+        batch_index = task_item.get('batch_index')
+        task_status = task.status
+        task_result = None
+        end_date = task_item.get('end_date') or ''
+        item_id = task_item.get('item_id')
+        if batch_index < len(items):
+            task_status = 'SUCCESS'
+            task_result = items[batch_index]
+            end_date = end_date or task_result.get('end_date', '')
+            item_id = task_result.get('item_id') or item_id
+        elif task.failed():
+            task_result = {'success': False, 'error': str(task.result)}
+            end_date = end_date or datetime.now().strftime(
+                "%Y-%m-%d %H:%M:%S")
+        else:
+            # Items of a running batch are still to do
+            task_status = 'PENDING'
+        return {
+            "task_status": task_status,
+            "task_result": task_result,
+            "start_date": info.get('start_date', ''),
+            "end_date": end_date,
+            "task_id": task_item.get('task_id'),
+            "item_id": item_id,
+            "batch_index": batch_index,
+        }
+
     @expose('/export_import', methods=['POST'])
     def download_import(self):
         """Download import result."""
@@ -364,6 +364,13 @@ WEKO_SEARCH_TYPE_INDEX = 'index'
 WEKO_SEARCH_MAX_FEEDBACK_MAIL = 100
 """Maximum number of feedback mail could be send."""
 
+WEKO_SEARCH_UI_PERMISSION_FILTER_BY_PATH_TREE = False
+"""Filter browsable items by index subtrees on ``path.tree``.
+
+If True, the indexes whose whole subtree is browsable are matched with one
+``path.tree`` term each instead of enumerating every browsable path.
+"""
+
 WEKO_SEARCH_TYPE_DICT = {
     'FULL_TEXT': '0',
     'KEYWORD': '1',
@@ -419,3 +426,18 @@ WEKO_IMPORT_LIST_NAME = [
     'No', 'Start Date', 'End Date', 'Item Id', 'Action', 'Work Flow Status'
 ]
 WEKO_ADMIN_LIFETIME_DEFAULT = 1800
+
+WEKO_SEARCH_UI_IMPORT_VALIDATION_WORKERS = 4
+"""Number of processes validating the imported items."""
+
+WEKO_SEARCH_UI_IMPORT_VALIDATION_CHUNK_SIZE = 500
+"""Number of imported items validated at once by a process."""
+
+WEKO_SEARCH_UI_IMPORT_PREFETCH_SIZE = 1000
+"""Number of existing items looked up per query when checking an import."""
+
+WEKO_SEARCH_UI_IMPORT_BATCH_SIZE = 100
+"""Number of items registered by an import task."""
+
+WEKO_SEARCH_UI_IMPORT_BULK_CHUNK_SIZE = 500
+"""Number of Elasticsearch actions per bulk request of an import task."""
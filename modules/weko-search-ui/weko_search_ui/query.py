@@ -83,7 +83,14 @@ def get_permission_filter(comm_id=None):
     else:
         mst.append(match)
         mst.append(rng)
-        terms = Q('terms', path=is_perm_paths)
+        if current_app.config.get(
+                'WEKO_SEARCH_UI_PERMISSION_FILTER_BY_PATH_TREE'):
+            prefixes, paths = Indexes.get_browsing_tree_path_prefixes()
+            terms = Q('bool', should=[Q('terms', **{'path.tree': prefixes}),
+                                      Q('terms', path=paths)],
+                      minimum_should_match=1)
+        else:
+            terms = Q('terms', path=is_perm_paths)
 
     mut = []
     if is_perm:
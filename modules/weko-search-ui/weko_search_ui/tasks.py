@@ -22,11 +22,12 @@
 import time
 from datetime import datetime
 
-from celery import shared_task
+from celery import current_task, shared_task, states
 from weko_admin.models import SessionLifetime
 
 from .config import WEKO_ADMIN_LIFETIME_DEFAULT
-from .utils import import_items_to_system, remove_temp_dir
+from .utils import import_items_to_system, import_items_to_system_batch, \
+    remove_temp_dir
 
 
 @shared_task
@@ -38,6 +39,20 @@ def import_item(item):
     return result
 
 
+@shared_task
+def import_items_batch(items):
+    """Import a batch of items."""
+    start_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def update_progress(results):
+        current_task.update_state(
+            state=states.state('PROGRESS'),
+            meta={'start_date': start_date, 'items': results})
+
+    results = import_items_to_system_batch(items, update_progress)
+    return {'start_date': start_date, 'items': results}
+
+
 @shared_task
 def remove_temp_dir_task(path):
     """Import Item ."""
@@ -22,15 +22,18 @@
 
 import base64
 import json
+import multiprocessing
 import os
 import shutil
 import sys
 import tempfile
 import traceback
 import uuid
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from functools import reduce
+from itertools import chain, islice
 from operator import getitem
 
 import bagit
@@ -39,7 +42,6 @@ from flask_babelex import gettext as _
 from invenio_db import db
 from invenio_files_rest.models import ObjectVersion
 from invenio_i18n.ext import current_i18n
-from invenio_pidstore.errors import PIDDoesNotExistError
 from invenio_pidstore.models import PersistentIdentifier
 from invenio_records.api import Record
 from invenio_records.models import RecordMetadata
@@ -49,6 +51,7 @@ from weko_deposit.api import WekoDeposit, WekoIndexer, WekoRecord
 from weko_index_tree.api import Indexes
 from weko_indextree_journal.api import Journals
 from weko_records.api import ItemTypes
+from weko_records.cache import get_cached_item_type
 from weko_workflow.api import Flow, WorkActivity
 from weko_workflow.models import FlowDefine, WorkFlow
 
@@ -389,10 +392,11 @@ def unpackage_import_file(data_path: str, tsv_file_name: str) -> list:
 
     """
     tsv_file_path = '{}/{}'.format(data_path, tsv_file_name)
-    data = read_stats_tsv(tsv_file_path)
-    list_record = handle_validate_item_import(data.get('tsv_data'), data.get(
-        'item_type_schema', {}
-    ))
+    with open(tsv_file_path, 'r') as tsvfile:
+        header = read_stats_tsv_header(tsvfile)
+        list_record = handle_validate_item_import(
+            iter_stats_tsv_items(tsvfile, header),
+            header.get('item_type_schema', {}))
     return list_record
 
 
@@ -411,85 +415,185 @@ def read_stats_tsv(tsv_file_path: str) -> dict:
         'tsv_data': [],
         'item_type_schema': {}
     }
-    tsv_data = []
-    item_path = []
-    item_path_name = []
-    check_item_type = {},
-    schema = ''
     with open(tsv_file_path, 'r') as tsvfile:
-        for num, row in enumerate(tsvfile, start=1):
-            data_row = row.rstrip('\n').split('\t')
-            if num == 1:
-                if data_row[-1] and data_row[-1].split('/')[-1]:
-                    item_type_id = data_row[-1].split('/')[-1]
-                    check_item_type = get_item_type(int(item_type_id))
-                    schema = data_row[-1]
-                    if not check_item_type:
-                        result['item_type_schema'] = {}
-                    else:
-                        result['item_type_schema'] = check_item_type['schema']
-
-            elif num == 2:
-                item_path = data_row
-            elif num == 3:
-                item_path_name = data_row
-            else:
-                data_parse_metadata = parse_to_json_form(
-                    zip(item_path, item_path_name, data_row)
-                )
+        header = read_stats_tsv_header(tsvfile)
+        result['item_type_schema'] = header['item_type_schema']
+        result['tsv_data'] = list(iter_stats_tsv_items(tsvfile, header))
+    return result
 
-                json_data_parse = parse_to_json_form(
-                    zip(item_path_name, item_path, data_row)
-                )
-                if isinstance(check_item_type, dict):
-                    item_type_name = check_item_type.get('name')
-                    item_type_id = check_item_type.get('item_type_id')
-                    tsv_item = dict(
-                        **json_data_parse,
-                        **data_parse_metadata,
-                        **{
-                            'item_type_name': item_type_name or '',
-                            'item_type_id': item_type_id or '',
-                            '$schema': schema if schema else ''
-                        }
-                    )
-                else:
-                    tsv_item = dict(**json_data_parse, **data_parse_metadata)
-                tsv_data.append(tsv_item)
 
-    result['tsv_data'] = tsv_data
-    return result
+def read_stats_tsv_header(tsvfile) -> dict:
+    """Read the three header rows of an importing TSV file.
+
+    :argument
+        tsvfile -- opened tsv file.
+    :return
+        return  -- item type, schema url and item paths of the file.
+
+    """
+    header = {
+        'item_type': None,
+        'item_type_schema': {},
+        'schema': '',
+        'item_path': [],
+        'item_path_name': []
+    }
+    for num, row in enumerate(islice(tsvfile, 3), start=1):
+        data_row = row.rstrip('\n').split('\t')
+        if num == 1:
+            if data_row[-1] and data_row[-1].split('/')[-1]:
+                item_type_id = data_row[-1].split('/')[-1]
+                check_item_type = get_item_type(int(item_type_id))
+                header['item_type'] = check_item_type
+                header['schema'] = data_row[-1]
+                if check_item_type:
+                    header['item_type_schema'] = check_item_type['schema']
+        elif num == 2:
+            header['item_path'] = data_row
+        elif num == 3:
+            header['item_path_name'] = data_row
+    return header
+
+
+def iter_stats_tsv_items(tsvfile, header):
+    """Parse the item rows of an importing TSV file one at a time.
+
+    :argument
+        tsvfile -- opened tsv file, positioned after the header rows.
+        header  -- header read by read_stats_tsv_header.
+    :return
+        return  -- generator of the items.
+
+    """
+    item_path = header['item_path']
+    item_path_name = header['item_path_name']
+    check_item_type = header['item_type']
+    schema = header['schema']
+    for row in tsvfile:
+        data_row = row.rstrip('\n').split('\t')
+        data_parse_metadata = parse_to_json_form(
+            zip(item_path, item_path_name, data_row)
+        )
+
+        json_data_parse = parse_to_json_form(
+            zip(item_path_name, item_path, data_row)
+        )
+        if isinstance(check_item_type, dict):
+            item_type_name = check_item_type.get('name')
+            item_type_id = check_item_type.get('item_type_id')
+            tsv_item = dict(
+                **json_data_parse,
+                **data_parse_metadata,
+                **{
+                    'item_type_name': item_type_name or '',
+                    'item_type_id': item_type_id or '',
+                    '$schema': schema if schema else ''
+                }
+            )
+        else:
+            tsv_item = dict(**json_data_parse, **data_parse_metadata)
+        yield tsv_item
+
+
+def _get_import_errors(validator, record_id, metadata) -> list:
+    """Get the validation errors of an importing item.
+
+    :argument
+        validator -- compiled item type schema or None.
+        record_id -- item id of the row.
+        metadata  -- metadata of the row.
+    :return
+        return    -- list of error messages.
+
+    """
+    errors = []
+    if record_id and (not represents_int(record_id)):
+        errors.append("Incorrect Item id")
+    if metadata:
+        if validator:
+            errors = errors + [error.message for error in
+                               validator.iter_errors(metadata)]
+        else:
+            errors = errors + ['ItemType is not exist']
+    return errors
+
+
+def _validate_import_chunk(args) -> list:
+    """Validate a chunk of importing items in a validation process.
+
+    :argument
+        args -- tuple of the item type schema and the (id, metadata) rows.
+    :return
+        return -- list of the error lists of the rows.
+
+    """
+    schema, rows = args
+    validator = Draft4Validator(schema) if schema else None
+    return [_get_import_errors(validator, *row) for row in rows]
 
 
 def handle_validate_item_import(list_recond, schema) -> list:
     """Validate item import.
 
+    The items are read from ``list_recond`` in chunks of
+    ``WEKO_SEARCH_UI_IMPORT_VALIDATION_CHUNK_SIZE``. When there is more than
+    one chunk, they are validated in a pool of processes, with at most one
+    chunk per process waiting to be validated.
+
     :argument
-        list_recond     -- {list} list recond import.
+        list_recond     -- {iterable} list recond import.
         schema     -- {dict} item_type schema.
     :return
         return       -- list_item_error.
 
     """
+    workers = current_app.config['WEKO_SEARCH_UI_IMPORT_VALIDATION_WORKERS']
+    chunk_size = current_app.config[
+        'WEKO_SEARCH_UI_IMPORT_VALIDATION_CHUNK_SIZE']
+    records = iter(list_recond)
+    chunks = iter(lambda: list(islice(records, chunk_size)), [])
+    first_chunks = list(islice(chunks, 2))
+    chunks = chain(first_chunks, chunks)
+
+    index_path = None
     result = []
-    v2 = Draft4Validator(schema) if schema else None
-    for record in list_recond:
-        errors = []
-        record_id = record.get("id")
-        if record_id and (not represents_int(record_id)):
-            errors.append("Incorrect Item id")
-        if record.get('metadata'):
-            if v2:
-                a = v2.iter_errors(record.get('metadata'))
-                errors = errors + [error.message for error in a]
-            else:
-                errors = errors = errors + ['ItemType is not exist']
-            record['metadata']['path'] = handle_replace_new_index()
 
-        item_error = dict(**record, **{
-            'errors': errors if len(errors) else None
-        })
-        result.append(item_error)
+    def add_chunk(chunk, list_errors):
+        nonlocal index_path
+        for record, errors in zip(chunk, list_errors):
+            if record.get('metadata'):
+                if index_path is None:
+                    index_path = handle_replace_new_index()
+                record['metadata']['path'] = list(index_path)
+
+            item_error = dict(**record, **{
+                'errors': errors if len(errors) else None
+            })
+            result.append(item_error)
+
+    def get_args(chunk):
+        return [(record.get("id"), record.get('metadata'))
+                for record in chunk]
+
+    # Daemonic processes such as Celery workers cannot have children
+    if workers > 1 and len(first_chunks) > 1 \
+            and not multiprocessing.current_process().daemon:
+        # The schema is sent with each chunk and compiled once per chunk
+        with ProcessPoolExecutor(workers) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append((chunk, executor.submit(
+                    _validate_import_chunk, (schema, get_args(chunk)))))
+                if len(pending) > workers:
+                    chunk, future = pending.popleft()
+                    add_chunk(chunk, future.result())
+            for chunk, future in pending:
+                add_chunk(chunk, future.result())
+    else:
+        v2 = Draft4Validator(schema) if schema else None
+        for chunk in chunks:
+            add_chunk(chunk, [_get_import_errors(v2, *arg)
+                              for arg in get_args(chunk)])
 
     return result
 
@@ -543,12 +647,12 @@ def get_item_type(item_type_id=0) -> dict:
     """
     result = None
     if item_type_id > 0:
-        itemtype = ItemTypes.get_by_id(item_type_id)
+        itemtype = get_cached_item_type(item_type_id)
         if itemtype and itemtype.schema \
-                and itemtype.item_type_name.name and item_type_id:
+                and itemtype.name and item_type_id:
             result = {
                 'schema': itemtype.schema,
-                'name': itemtype.item_type_name.name,
+                'name': itemtype.name,
                 'item_type_id': item_type_id
             }
 
@@ -558,6 +662,32 @@ def get_item_type(item_type_id=0) -> dict:
     return result
 
 
+def get_exist_records(item_ids) -> dict:
+    """Get the PIDs and metadata of items in bulk.
+
+    :argument
+        item_ids    -- {list} item ids.
+    :return
+        return      -- {dict} PID and record json by item id.
+
+    """
+    result = {}
+    item_ids = list({str(item_id) for item_id in item_ids if item_id})
+    chunk_size = current_app.config['WEKO_SEARCH_UI_IMPORT_PREFETCH_SIZE']
+    for start in range(0, len(item_ids), chunk_size):
+        pids = PersistentIdentifier.query.filter(
+            PersistentIdentifier.pid_type == 'recid',
+            PersistentIdentifier.pid_value.in_(
+                item_ids[start:start + chunk_size])).all()
+        uuids = [pid.object_uuid for pid in pids if pid.object_uuid]
+        records = dict(db.session.query(
+            RecordMetadata.id, RecordMetadata.json).filter(
+            RecordMetadata.id.in_(uuids))) if uuids else {}
+        for pid in pids:
+            result[pid.pid_value] = (pid, records.get(pid.object_uuid))
+    return result
+
+
 def handle_check_exist_record(list_recond) -> list:
     """Check record is exist in system.
 
@@ -568,6 +698,9 @@ def handle_check_exist_record(list_recond) -> list:
 
     """
     result = []
+    exist_records = get_exist_records(
+        item.get('id') for item in list_recond
+        if not item.get('errors') and represents_int(item.get('id') or ''))
     for item in list_recond:
         if not item.get('errors'):
             item = dict(**item, **{
@@ -576,29 +709,27 @@ def handle_check_exist_record(list_recond) -> list:
             try:
                 item_id = item.get('id')
                 if item_id:
-                    item_exist = WekoRecord.get_record_by_pid(item_id)
-                    if item_exist:
-                        if item_exist.pid.is_deleted():
-                            item['status'] = None
-                            item['errors'] = [_('Item already DELETED'
-                                                ' in the system')]
-                            result.append(item)
-                            continue
+                    pid, item_exist = exist_records.get(
+                        str(item_id), (None, None))
+                    if pid and pid.is_deleted():
+                        item['status'] = None
+                        item['errors'] = [_('Item already DELETED'
+                                            ' in the system')]
+                        result.append(item)
+                        continue
+                    elif item_exist:
+                        exist_url = request.url_root + \
+                            'records/' + item_exist.get('recid')
+                        if item.get('uri') == exist_url:
+                            item['status'] = 'update'
                         else:
-                            exist_url = request.url_root + \
-                                'records/' + item_exist.get('recid')
-                            if item.get('uri') == exist_url:
-                                item['status'] = 'update'
-                            else:
-                                item['errors'] = ['URI of items are not match']
-                                item['status'] = None
+                            item['errors'] = ['URI of items are not match']
+                            item['status'] = None
                 else:
                     item['id'] = None
                     if item.get('uri'):
                         item['errors'] = ['Item has no ID but non-empty URI']
                         item['status'] = None
-            except PIDDoesNotExistError:
-                pass
             except BaseException:
                 current_app.logger.error(
                     'Unexpected error: ',
@@ -906,6 +1037,23 @@ def handle_workflow(item: dict):
             create_work_flow(item.get('item_type_id'))
 
 
+def handle_workflows(list_record: list):
+    """Create the missing workflows of the item types of new items.
+
+    :argument
+        list_record     -- {list} items to import.
+
+    """
+    exist_records = get_exist_records(item.get('id') for item in list_record)
+    item_type_ids = {item.get('item_type_id') for item in list_record
+                     if str(item.get('id')) not in exist_records}
+    for item_type_id in item_type_ids:
+        workflow = WorkFlow.query.filter_by(
+            itemtype_id=item_type_id).first()
+        if not workflow:
+            create_work_flow(item_type_id)
+
+
 def create_work_flow(item_type_id):
     """Handle create work flow.
 
@@ -969,6 +1117,64 @@ def import_items_to_system(item: dict):
         return response
 
 
+def import_items_to_system_batch(items: list, progress_callback=None):
+    """Import a batch of items and index them with the bulk API.
+
+    Every item is registered in its own transaction so that an error only
+    fails its row. The Elasticsearch documents of the registered items are
+    sent in bulk at the end of the batch, and the documents that failed to
+    be indexed fail the row they were sent for.
+
+    :argument
+        items               -- {list} Items Metadata.
+        progress_callback   -- called with the results after each item.
+    :return
+        return      -- list of the result of each item.
+
+    """
+    results = []
+    # Result of the row that sent each document
+    document_rows = {}
+    indexer = WekoDeposit.indexer
+    with indexer.buffered(
+            chunk_size=current_app.config[
+                'WEKO_SEARCH_UI_IMPORT_BULK_CHUNK_SIZE'],
+            thread_count=1) as buffer:
+        for item in items:
+            mark = len(buffer['actions'])
+            try:
+                response = import_items_to_system(item) or dict(
+                    success=False, error='No item data')
+            except Exception as ex:
+                db.session.rollback()
+                current_app.logger.exception(
+                    'item id: {} import error.'.format(item.get('id')))
+                response = dict(success=False, error=str(ex))
+            if not response.get('success'):
+                del buffer['actions'][mark:]
+            for action in buffer['actions'][mark:]:
+                document_rows[action['_id']] = response
+            response['item_id'] = item.get('id')
+            response['end_date'] = datetime.now().strftime(
+                "%Y-%m-%d %H:%M:%S")
+            results.append(response)
+            if progress_callback:
+                progress_callback(results)
+    errors = buffer['stats'].get('errors', [])
+    for document_id, error in errors:
+        response = document_rows.get(document_id)
+        if response is not None:
+            response['success'] = False
+            response['error'] = 'Failed to index item: {}'.format(error)
+    if errors:
+        current_app.logger.error(
+            '{} items of the import batch failed to be indexed.'.format(
+                len(errors)))
+        if progress_callback:
+            progress_callback(results)
+    return results
+
+
 def remove_temp_dir(path):
     """Validation importing zip file.
 
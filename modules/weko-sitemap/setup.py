@@ -93,7 +93,9 @@ setup(
         'invenio_celery.tasks': [
             'weko_sitemap = weko_sitemap.tasks',
         ],
-        # 'invenio_db.models': [],
+        'invenio_db.models': [
+            'weko_sitemap = weko_sitemap.models',
+        ],
         # 'invenio_pidstore.minters': [],
         # 'invenio_records.jsonresolver': [],
     },
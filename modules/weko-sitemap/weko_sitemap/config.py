@@ -34,3 +34,9 @@ SITEMAP_ENDPOINT_URL = '/sitemapindex.xml'
 SITEMAP_ENDPOINT_PAGE_URL = '/sitemap_<int:page>.xml.gz'
 
 SITEMAP_MAX_URL_COUNT = 10000
+
+WEKO_SITEMAP_PAGE_ID_RANGE = 10000
+"""Number of persistent identifier ids covered by a sitemap page."""
+
+WEKO_SITEMAP_QUERY_BATCH_SIZE = 1000
+"""Number of recids fetched per keyset query."""
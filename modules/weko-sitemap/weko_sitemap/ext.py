@@ -23,6 +23,7 @@
 from __future__ import absolute_import, print_function
 
 import gzip
+import hashlib
 from datetime import datetime
 from functools import wraps
 from io import BytesIO
@@ -36,22 +37,26 @@ from invenio_cache import current_cache
 from invenio_db import db
 from invenio_pidstore.models import PersistentIdentifier, PIDStatus
 from invenio_records.models import RecordMetadata
-from sqlalchemy import Float, cast
+from sqlalchemy import func
 
 from . import config
 
 
 class WekoSitemap(Sitemap):
-    """Weko-sitemap extension."""
+    """Weko-sitemap extension.
+
+    Sitemap pages are built from ranges of WEKO_SITEMAP_PAGE_ID_RANGE
+    persistent identifier ids, so a changed record only invalidates the page
+    of its range. Pages are stored gzip-compressed with their ETag and
+    last modification date.
+    """
 
     @sitemap_page_needed.connect
     def create_page(app, page, urlset):
         """Create sitemap page and save to cache."""
-        page_name = 'sitemap_' + str(page).zfill(4)  # Cache key
-        page_dic = dict(page=current_app.extensions['sitemap'].render_page(urlset=urlset),
-                        lastmod=datetime.now().strftime('%Y-%m-%dT%H:%M:%S%z'))
         current_app.extensions['weko-sitemap'].set_cache_page(
-            page_name, page_dic)
+            'sitemap_' + str(page).zfill(4),
+            current_app.extensions['weko-sitemap'].render_cache_page(urlset))
 
     def load_page(self, fn):
         """Load sitemap page."""
@@ -59,23 +64,18 @@ class WekoSitemap(Sitemap):
         def loader(*args, **kwargs):
             page = kwargs.get('page')
             data = current_cache.get('sitemap_' + str(page).zfill(4))
-            # current_app.extensions['sitemap'].gzip_response(data['page'])
-            return data['page'] if data else fn(*args, **kwargs)
+            return self.page(page) if data else fn(*args, **kwargs)
         return loader
 
     def clear_cache_pages(self):
         """Clear all cached pages."""
-        page_keys = current_cache.get(self.cached_pages_set_key) or set()
-        for page in page_keys:
-            current_cache.delete(page)
+        for page in self._get_page_registry():
+            current_cache.delete('sitemap_' + str(page).zfill(4))
         current_cache.delete(self.cached_pages_set_key)
+        current_cache.delete(self.last_build_key)
 
     def set_cache_page(self, key, value):
         """Set the page into the cache."""
-        # Check if there is a set of keys, if not create one_or_none
-        current_key_set = current_cache.get(self.cached_pages_set_key) or set()
-        current_key_set.add(key)
-        current_cache.set(self.cached_pages_set_key, current_key_set)
         current_cache.set(
             key, value,
             timeout=current_app.config['WEKO_SITEMAP_CACHE_TIMEOUT'])
@@ -83,7 +83,23 @@ class WekoSitemap(Sitemap):
     @staticmethod
     def get_cache_page(key):
         """Get page from cache."""
-        current_cache.get(key)
+        return current_cache.get(key)
+
+    def render_cache_page(self, urlset, lastmod=None):
+        """Render a sitemap page into its gzip-compressed cache entry."""
+        xml = current_app.extensions['sitemap'].render_page(
+            urlset=urlset).encode('utf-8')
+        gzip_buffer = BytesIO()
+        # A fixed mtime keeps the compressed page identical for a same
+        # content.
+        with gzip.GzipFile(mode='wb', fileobj=gzip_buffer,
+                           mtime=0) as gzip_file:
+            gzip_file.write(xml)
+        return dict(gzip=gzip_buffer.getvalue(),
+                    etag=hashlib.md5(xml).hexdigest(),
+                    lastmod=(lastmod or datetime.utcnow()).strftime(
+                        '%Y-%m-%dT%H:%M:%S%z'),
+                    count=len(urlset))
 
     def sitemap(self):
         """Override - Render sitemap from cache sitemap.xml."""
@@ -93,10 +109,14 @@ class WekoSitemap(Sitemap):
     def page(self, page):
         """Override to get sitemap page from cache if it exists."""
         sitemap_page = current_cache.get('sitemap_' + str(page).zfill(4))
-        if sitemap_page:
-            return self.gzip_response(sitemap_page['page'])
-            # return sitemap_page['page']
-        return flask_sitemap.render_page(urlset=[None])
+        if sitemap_page and sitemap_page.get('gzip'):
+            response = Response(sitemap_page['gzip'])
+            response.headers['Content-Type'] = 'application/x-gzip'
+            response.set_etag(sitemap_page['etag'])
+            response.last_modified = datetime.strptime(
+                sitemap_page['lastmod'], '%Y-%m-%dT%H:%M:%S')
+            return response.make_conditional(request)
+        return current_app.extensions['sitemap'].render_page(urlset=[None])
 
     def gzip_response(self, data):
         """Override - Gzip response data and create new Response instance."""
@@ -111,23 +131,150 @@ class WekoSitemap(Sitemap):
         response.headers['Content-Length'] = len(response.data)
         return response
 
+    def _iter_item_rows(self, start_id=0, end_id=None):
+        """Iterate registered recids by pid id with a keyset."""
+        batch_size = current_app.config['WEKO_SITEMAP_QUERY_BATCH_SIZE']
+        last_id = start_id - 1
+        while True:
+            q = db.session.query(
+                PersistentIdentifier.id,
+                PersistentIdentifier.pid_value,
+                RecordMetadata.updated
+            ).join(
+                RecordMetadata,
+                RecordMetadata.id == PersistentIdentifier.object_uuid
+            ).filter(
+                PersistentIdentifier.pid_type == 'recid',
+                PersistentIdentifier.status == PIDStatus.REGISTERED,
+                PersistentIdentifier.id > last_id)
+            if end_id is not None:
+                q = q.filter(PersistentIdentifier.id < end_id)
+            rows = q.order_by(PersistentIdentifier.id.asc()).limit(
+                batch_size).all()
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                break
+            last_id = rows[-1][0]
+
+    @staticmethod
+    def _item_url(pid_value, updated):
+        """Make the url entry of an item."""
+        return {
+            'loc': url_for('invenio_records_ui.recid',
+                           pid_value=pid_value,
+                           _external=True),
+            'lastmod': updated.strftime('%Y-%m-%dT%H:%M:%S%z')
+        }
+
     def _generate_all_item_urls(self):
         """Make url set for all items."""
-        self.clear_cache_pages()  # Clear cache
-        q = (db.session
-               .query(PersistentIdentifier, RecordMetadata)
-               .join(RecordMetadata, RecordMetadata.id == PersistentIdentifier.object_uuid)
-               .filter(PersistentIdentifier.status == PIDStatus.REGISTERED, PersistentIdentifier.pid_type == 'recid')
-               .order_by(cast(PersistentIdentifier.pid_value, Float).asc())
-               .limit(current_app.config['WEKO_SITEMAP_TOTAL_MAX_URL_COUNT']))
-
-        for recid, rm in q.yield_per(1000):
-            yield {
-                'loc': url_for('invenio_records_ui.recid',
-                               pid_value=recid.pid_value,
-                               _external=True),
-                'lastmod': rm.updated.strftime('%Y-%m-%dT%H:%M:%S%z')
-            }
+        rows = islice(self._iter_item_rows(),
+                      current_app.config['WEKO_SITEMAP_TOTAL_MAX_URL_COUNT'])
+        for _, pid_value, updated in rows:
+            yield self._item_url(pid_value, updated)
+
+    def _generate_page_urls(self, page, limit=None):
+        """Make url set and last modification date of a sitemap page.
+
+        :param page: Page number.
+        :param limit: Maximum number of urls of the page.
+        """
+        page_range = current_app.config['WEKO_SITEMAP_PAGE_ID_RANGE']
+        urlset = []
+        lastmod = None
+        if limit is not None and limit <= 0:
+            return urlset, lastmod
+        for _, pid_value, updated in islice(self._iter_item_rows(
+                (page - 1) * page_range, page * page_range), limit):
+            urlset.append(self._item_url(pid_value, updated))
+            if lastmod is None or updated > lastmod:
+                lastmod = updated
+        return urlset, lastmod
+
+    def _get_page_registry(self):
+        """Get the built pages with their last modification date."""
+        registry = current_cache.get(self.cached_pages_set_key)
+        return registry if isinstance(registry, dict) else {}
+
+    def _get_changed_pages(self, since):
+        """Get the pages holding recids changed since a date.
+
+        The recids and the records changed are queried separately so that
+        each query uses the index of its modification date (see
+        :mod:`weko_sitemap.models`).
+        """
+        page_range = current_app.config['WEKO_SITEMAP_PAGE_ID_RANGE']
+        pid = PersistentIdentifier
+        page = pid.id / page_range
+        changed_pids = db.session.query(page).filter(
+            pid.pid_type == 'recid',
+            pid.updated >= since)
+        changed_records = db.session.query(page).join(
+            RecordMetadata,
+            RecordMetadata.id == pid.object_uuid
+        ).filter(
+            pid.pid_type == 'recid',
+            RecordMetadata.updated >= since)
+        return set(int(row[0]) + 1
+                   for row in changed_pids.union(changed_records))
+
+    def build_pages(self, full=False):
+        """Build the sitemap pages whose records changed since last build.
+
+        Pages are kept in order of recid until WEKO_SITEMAP_TOTAL_MAX_URL_COUNT
+        urls: the page reaching the limit is truncated and the following
+        pages are dropped.
+
+        :param full: Rebuild every page.
+        :returns: Number of rebuilt pages, of pages and of urls.
+        """
+        started = datetime.utcnow()
+        registry = self._get_page_registry()
+        last_build = current_cache.get(self.last_build_key)
+        if full or not registry or not last_build:
+            max_id = db.session.query(
+                func.max(PersistentIdentifier.id)).filter(
+                PersistentIdentifier.pid_type == 'recid').scalar() or 0
+            page_range = current_app.config['WEKO_SITEMAP_PAGE_ID_RANGE']
+            pages = set(range(1, max_id // page_range + 2))
+            registry = {}
+        else:
+            pages = self._get_changed_pages(last_build)
+            # Pages evicted from the cache are built again as well
+            pages.update(
+                page for page in registry
+                if not current_cache.cache.has(
+                    'sitemap_' + str(page).zfill(4)))
+
+        max_urls = current_app.config['WEKO_SITEMAP_TOTAL_MAX_URL_COUNT']
+        total = 0
+        rebuilt = 0
+        for page in sorted(pages | set(registry)):
+            entry = registry.get(page)
+            limit = max_urls - total
+            if page in pages or entry.get('truncated') or \
+                    entry['count'] > limit:
+                key = 'sitemap_' + str(page).zfill(4)
+                urlset, lastmod = self._generate_page_urls(page, limit)
+                if urlset:
+                    data = self.render_cache_page(urlset, lastmod)
+                    self.set_cache_page(key, data)
+                    entry = registry[page] = dict(
+                        lastmod=data['lastmod'], count=data['count'],
+                        truncated=data['count'] >= limit)
+                else:
+                    current_cache.delete(key)
+                    entry = registry.pop(page, None)
+                rebuilt += 1
+            if entry:
+                total += entry['count']
+
+        timeout = current_app.config['WEKO_SITEMAP_CACHE_TIMEOUT']
+        current_cache.set(self.cached_pages_set_key, registry,
+                          timeout=timeout)
+        current_cache.set(self.last_build_key, started, timeout=timeout)
+        return dict(rebuilt=rebuilt, pages=len(registry), total=total)
 
     def _load_cache_pages(self):
         """Get pages from cache instead of re-creating them."""
@@ -135,14 +282,11 @@ class WekoSitemap(Sitemap):
             _external=True,
             _scheme=current_app.config.get('WEKO_SITEMAP_URL_SCHEME')
         )
-        kwargs['page'] = 0
-        page_keys = current_cache.get(self.cached_pages_set_key) or set()
-        for page_number in page_keys:
-            kwargs['page'] += 1
-            page = current_cache.get(page_number)
-            if page:
-                yield {'loc': url_for('flask_sitemap.page', **kwargs),
-                       'lastmod': page['lastmod']}
+        registry = self._get_page_registry()
+        for page_number in sorted(registry):
+            kwargs['page'] = page_number
+            yield {'loc': url_for('flask_sitemap.page', **kwargs),
+                   'lastmod': registry[page_number]['lastmod']}
 
     def __init__(self, app=None):
         """Extension initialization."""
@@ -153,6 +297,7 @@ class WekoSitemap(Sitemap):
         """Flask application initialization."""
         self.init_config(app)
         self.cached_pages_set_key = 'sitemap_page_keys'  # Keep track of cached pages
+        self.last_build_key = 'sitemap_last_build'
         app.extensions['weko-sitemap'] = self
         app.config['SITEMAP_VIEW_DECORATORS'] = [self.load_page]
 
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of WEKO3.
+# Copyright (C) 2017 National Institute of Informatics.
+#
+# WEKO3 is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# WEKO3 is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WEKO3; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+
+
+"""Database indexes used by weko-sitemap.
+
+The changed sitemap pages are looked up by the modification dates of the
+recids and of their records, which the tables of invenio-pidstore and
+invenio-records do not index.
+"""
+
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier
+from invenio_records.models import RecordMetadata
+
+pidstore_pid_type_updated_index = db.Index(
+    'ix_pidstore_pid_pid_type_updated',
+    PersistentIdentifier.pid_type,
+    PersistentIdentifier.updated)
+"""Index of the persistent identifiers by type and modification date."""
+
+records_metadata_updated_index = db.Index(
+    'ix_records_metadata_updated',
+    RecordMetadata.updated)
+"""Index of the records by modification date."""
+
+__all__ = ('pidstore_pid_type_updated_index',
+           'records_metadata_updated_index')
@@ -22,12 +22,10 @@
 
 from ast import literal_eval as make_tuple
 from datetime import datetime
-from itertools import islice, zip_longest
 
 from celery import shared_task, task
 from celery.utils.log import get_task_logger
 from flask import current_app
-from flask_sitemap import sitemap_page_needed
 
 from . import config
 from .signals import sitemap_finished
@@ -70,8 +68,12 @@ def link_error_handler(request, exc, traceback):
 
 @shared_task(ignore_results=True)
 def update_sitemap(start_time=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S'),
-                   user_data={'user_id': 'System'}):
-    """Update sitemap cache."""
+                   user_data={'user_id': 'System'}, full=False):
+    """Update sitemap cache.
+
+    Only the pages holding records changed since the last update are
+    rebuilt, unless ``full`` is set.
+    """
     site_url = current_app.config['THEME_SITEURL']
     with current_app.test_request_context(site_url):
         current_app.logger.info(
@@ -79,63 +81,13 @@ def update_sitemap(start_time=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S'),
                 0, 'Sitemap update'))
         start_time = datetime.strptime(start_time, '%Y-%m-%dT%H:%M:%S')
         flask_sitemap = current_app.extensions['weko-sitemap']
-        size = current_app.config['SITEMAP_MAX_URL_COUNT']
-        args = [iter(flask_sitemap._generate_all_item_urls())] * size
-        run = zip_longest(*args)
-        try:
-            urlset = next(run)
-        except StopIteration:
-            # Special case with empty list of urls.
-            urlset = [None]
-
-        # Number of URLs is less than the maximum
-        if urlset[-1] is None:
-            urlset = [url for url in urlset if url is not None]
-            sitemap_page_needed.send(current_app._get_current_object(),
-                                     page=1, urlset=urlset)
-            # sitemap_page_needed.send(current_app._get_current_object(), \
-            #    page=1, urlset=[urlset[0]])
-            current_app.logger.info(
-                '[{0}] [{1} {2}] '.format(
-                    0, 'Created page #', 1))
-            end_time = datetime.now()
-            return ({'total': len(urlset),
-                     'start_time': start_time.strftime('%Y-%m-%dT%H:%M:%S%z'),
-                     'end_time': end_time.strftime('%Y-%m-%dT%H:%M:%S%z'),
-                     'execution_time': str(end_time - start_time),
-                     'task_name': 'sitemap',
-                     'repository_name': 'weko',  # TODO: Grab from config
-                     'task_id': update_sitemap.request.id,
-                     'task_state': 'SUCCESS'},
-                    user_data)
-
-        # Number of URLs is more than maximum, have to page them
-        kwargs = dict(
-            _external=True,
-            _scheme=current_app.config.get('WEKO_SITEMAP_URL_SCHEME')
-        )
-        kwargs['page'] = 1
-        urlset = [url for url in urlset if url is not None]
-        total = len(urlset)  # Keep track of number processed
-
-        sitemap_page_needed.send(current_app._get_current_object(),
-                                 page=1, urlset=urlset)
+        result = flask_sitemap.build_pages(full=full)
         current_app.logger.info(
-            '[{0}] [{1} {2}] '.format(
-                0, 'Created page #', 1))
-        for urlset_ in run:
-            kwargs['page'] += 1
-            current_app.logger.info(
-                '[{0}] [{1} {2}] '.format(
-                    0, 'Created page #', kwargs['page']))
-            urlset_ = [url for url in urlset_ if url is not None]
-            total += len(urlset_)
-            sitemap_page_needed.send(current_app._get_current_object(),
-                                     page=kwargs['page'], urlset=urlset_)
-
-        current_app.logger.info('[{0}] [{1}] DONE'.format(0, 'Sitemap update'))
+            '[{0}] [{1} {2}/{3}] DONE'.format(
+                0, 'Sitemap update, rebuilt pages', result['rebuilt'],
+                result['pages']))
         end_time = datetime.now()
-        return ({'total': len(urlset),
+        return ({'total': result['total'],
                  'start_time': start_time.strftime('%Y-%m-%dT%H:%M:%S%z'),
                  'end_time': end_time.strftime('%Y-%m-%dT%H:%M:%S%z'),
                  'execution_time': str(end_time - start_time),
@@ -26,10 +26,12 @@ from datetime import datetime, timedelta
 from flask import current_app, request, session, url_for
 from flask_login import current_user
 from invenio_accounts.models import Role, User, userrole
+from invenio_cache import current_cache
 from invenio_db import db
 from invenio_pidstore.models import PersistentIdentifier, PIDStatus
-from sqlalchemy import asc, desc, or_, types
+from sqlalchemy import and_, asc, desc, false, func, or_, types
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.sql.expression import cast
 from weko_records.models import ItemMetadata
@@ -87,6 +89,7 @@ class Flow(object):
                 db.session.add(_flowaction_start)
                 db.session.add(_flowaction_end)
             db.session.commit()
+            self.update_flow_action_version()
             return _flow
         except Exception as ex:
             current_app.logger.exception(str(ex))
@@ -152,8 +155,16 @@ class Flow(object):
             _Flow.query.filter_by(
                 flow_id=flow_id).delete(synchronize_session=False)
         db.session.commit()
+        self.update_flow_action_version()
         return True
 
+    @staticmethod
+    def update_flow_action_version():
+        """Invalidate the cached actionable flow actions of every user."""
+        current_cache.set(
+            current_app.config['WEKO_WORKFLOW_FLOW_ACTION_VERSION_KEY'],
+            uuid.uuid4().hex, timeout=0)
+
     def upt_flow_action(self, flow_id, actions):
         """Update FlowAction Info."""
         with db.session.begin_nested():
@@ -199,6 +210,7 @@ class Flow(object):
                 if flowactionrole.action_role or flowactionrole.action_user:
                     db.session.add(flowactionrole)
         db.session.commit()
+        self.update_flow_action_version()
 
     def get_next_flow_action(self, flow_id, cur_action_id):
         """Return next action info.
@@ -1046,6 +1058,75 @@ class WorkActivity(object):
                                             query)
         return query
 
+    def get_actionable_flow_actions(self):
+        """Get the flow actions the current user acts on or waits for.
+
+        The flow action roles are read once and reduced to sets of
+        (flow define id, action id) pairs, cached per user and roles until
+        the flow actions are updated.
+
+        :return: dictionary with the 'todo' and 'wait' pairs
+        """
+        self_user_id = int(current_user.get_id())
+        self_group_ids = set(role.id for role in current_user.roles)
+        version = current_cache.get(
+            current_app.config['WEKO_WORKFLOW_FLOW_ACTION_VERSION_KEY'])
+        cache_key = current_app.config[
+            'WEKO_WORKFLOW_ACTIONABLE_FLOW_ACTIONS_CACHE_KEY'].format(
+            version=version or 0, user_id=self_user_id,
+            roles='-'.join(str(i) for i in sorted(self_group_ids)))
+        flow_actions = current_cache.get(cache_key)
+        if flow_actions is not None:
+            return flow_actions
+
+        todo = set()
+        wait = set()
+        rows = db.session.query(
+            _Flow.id, _FlowAction.action_id, _FlowActionRole.id,
+            _FlowActionRole.action_user, _FlowActionRole.action_user_exclude,
+            _FlowActionRole.action_role, _FlowActionRole.action_role_exclude
+        ).join(_FlowAction, _FlowAction.flow_id == _Flow.flow_id).outerjoin(
+            _FlowActionRole,
+            _FlowActionRole.flow_action_id == _FlowAction.id).all()
+        for flow_id, action_id, role_id, action_user, user_exclude, \
+                action_role, role_exclude in rows:
+            if role_id is None \
+                    or (action_user == self_user_id and not user_exclude) \
+                    or (action_role in self_group_ids and not role_exclude):
+                todo.add((flow_id, action_id))
+            if role_id is not None and (
+                    (action_user is not None
+                     and action_user != self_user_id and not user_exclude)
+                    or (action_role is not None
+                        and action_role not in self_group_ids
+                        and not role_exclude)):
+                wait.add((flow_id, action_id))
+        flow_actions = {'todo': todo, 'wait': wait}
+        current_cache.set(
+            cache_key, flow_actions,
+            timeout=current_app.config[
+                'WEKO_WORKFLOW_ACTIONABLE_FLOW_ACTIONS_CACHE_TTL'])
+        return flow_actions
+
+    @staticmethod
+    def filter_by_flow_actions(query, flow_actions):
+        """
+        Filter activities whose current action is one of the flow actions.
+
+        :param query:
+        :param flow_actions: set of (flow define id, action id)
+        :return:
+        """
+        if not flow_actions:
+            return query.filter(false())
+        actions_by_flow = {}
+        for flow_id, action_id in flow_actions:
+            actions_by_flow.setdefault(flow_id, []).append(action_id)
+        return query.filter(or_(
+            and_(_Activity.flow_id == flow_id,
+                 _Activity.action_id.in_(action_ids))
+            for flow_id, action_ids in actions_by_flow.items()))
+
     def query_activites_by_tab_is_wait(self, query, is_admin,
                                        is_community_admin):
         """
@@ -1057,20 +1138,14 @@ class WorkActivity(object):
         :return:
         """
         self_user_id = int(current_user.get_id())
-        self_group_ids = [role.id for role in current_user.roles]
         query = query \
             .filter(_Activity.activity_login_user == self_user_id) \
-            .filter(_FlowAction.action_id == _Activity.action_id) \
-            .filter(((_FlowActionRole.action_user != self_user_id)
-                     & (_FlowActionRole.action_user_exclude == '0'))
-                    | (_FlowActionRole.action_role.notin_(self_group_ids)
-                       & (_FlowActionRole.action_role_exclude == '0'))) \
             .filter((_Activity.activity_status
                      == ActivityStatusPolicy.ACTIVITY_BEGIN)
                     | (_Activity.activity_status
                        == ActivityStatusPolicy.ACTIVITY_MAKING))
-
-        return query
+        return self.filter_by_flow_actions(
+            query, self.get_actionable_flow_actions()['wait'])
 
     def query_activites_by_tab_is_all(self,
                                       query,
@@ -1083,7 +1158,7 @@ class WorkActivity(object):
         :param query:
         :param is_admin:
         :param is_community_admin:
-        :param community_user_ids:
+        :param community_user_ids: list or subquery of user ids
         :return:
         """
         self_user_id = int(current_user.get_id())
@@ -1129,25 +1204,21 @@ class WorkActivity(object):
         :param is_community_admin:
         :return:
         """
-        self_user_id = int(current_user.get_id())
-        self_group_ids = [role.id for role in current_user.roles]
         query = query \
             .filter((_Activity.activity_status
                     == ActivityStatusPolicy.ACTIVITY_BEGIN)
                     | (_Activity.activity_status
-                    == ActivityStatusPolicy.ACTIVITY_MAKING)) \
-            .filter(
-                ((_FlowActionRole.action_user == self_user_id)
-                 & (_FlowActionRole.action_user_exclude == '0'))
-                | (_FlowActionRole.action_role.in_(self_group_ids)
-                   & (_FlowActionRole.action_role_exclude == '0'))
-                | _FlowActionRole.id.is_(None))\
-            .filter(_FlowAction.action_id == _Activity.action_id)
-        return query
+                    == ActivityStatusPolicy.ACTIVITY_MAKING))
+        return self.filter_by_flow_actions(
+            query, self.get_actionable_flow_actions()['todo'])
 
     def get_activity_list(self, community_id=None, conditions=None):
         """Get activity list info.
 
+        The page is located with a keyset on the activity id: only the ids
+        are scanned to find the first id of the page, then the page rows are
+        loaded with their workflow, action and update user eagerly.
+
         :return:
         """
         with db.session.no_autoflush:
@@ -1163,18 +1234,12 @@ class WorkActivity(object):
             page = 1
 
             activities = []
-            community_users = User.query.outerjoin(userrole).outerjoin(
-                Role) \
-                .filter(community_role_name == Role.name) \
-                .filter(userrole.c.role_id == Role.id) \
-                .filter(User.id == userrole.c.user_id) \
-                .all()
-            community_user_ids = [
-                community_user.id for community_user in community_users]
+            community_user_ids = db.session.query(userrole.c.user_id) \
+                .join(Role, userrole.c.role_id == Role.id) \
+                .filter(community_role_name == Role.name)
 
             # query all activities
-            query_action_activities = _Activity.query.outerjoin(_Flow) \
-                .outerjoin(_FlowAction).outerjoin(_FlowActionRole)
+            query_action_activities = _Activity.query
 
             # query activities by tab is wait
             if tab == WEKO_WORKFLOW_WAIT_TAB:
@@ -1217,7 +1282,8 @@ class WorkActivity(object):
                 conditions, query_action_activities)
 
             # Count all result
-            count = query_action_activities.distinct(_Activity.id).count()
+            count = query_action_activities.with_entities(
+                func.count(_Activity.id)).scalar()
             import math
             maxpage = math.ceil(count / int(size))
             name_param = ''
@@ -1225,9 +1291,18 @@ class WorkActivity(object):
                 page = 1
                 name_param = 'pages' + tab
             offset = int(size) * (int(page) - 1)
-            action_activities = query_action_activities \
-                .distinct(_Activity.id).order_by(asc(_Activity.id)).limit(
-                    size).offset(offset).all()
+            if offset:
+                first_id = query_action_activities.with_entities(
+                    _Activity.id).order_by(asc(_Activity.id)).offset(
+                    offset).limit(1).scalar()
+                if first_id is not None:
+                    query_action_activities = query_action_activities \
+                        .filter(_Activity.id >= first_id)
+            action_activities = query_action_activities.options(
+                joinedload(_Activity.update_user),
+                joinedload(_Activity.workflow),
+                joinedload(_Activity.action)
+            ).order_by(asc(_Activity.id)).limit(size).all()
 
             # Append to do and action activities into the master list
             activities.extend(action_activities)
@@ -1246,51 +1321,24 @@ class WorkActivity(object):
                 else:
                     activi.StatusDesc = ActionStatusPolicy.describe(
                         ActionStatusPolicy.ACTION_DOING)
-                activi.User = User.query.filter_by(
-                    id=activi.activity_update_user).first()
+                activi.User = activi.update_user
             return activities, maxpage, size, page, name_param
 
     def get_all_activity_list(self, community_id=None):
         """Get all activity list info.
 
+        The allowed flows always include the flow of every activity, so any
+        activity attached to a flow is listed. This is filtered directly
+        instead of loading every activity to collect their flow ids.
+
         :return: List of activities
         """
         with db.session.no_autoflush:
-            self_group_ids = [role.id for role in current_user.roles]
-
-            db_flow_action_users = _FlowActionRole.query.filter_by(
-                action_user_exclude=False).all()
-            db_flow_action_ids = [db_flow_action_user.flow_action_id for
-                                  db_flow_action_user in db_flow_action_users]
-            db_flow_action_roles = _FlowActionRole.query.filter_by(
-                action_user_exclude=False).filter(
-                _FlowActionRole.action_role.in_(self_group_ids)).all()
-            db_flow_action_ids.extend(
-                [db_flow_action_role.flow_action_id for
-                 db_flow_action_role in db_flow_action_roles])
-            db_flow_actions = _FlowAction.query.filter(
-                _FlowAction.id.in_(db_flow_action_ids)).all()
-            db_flow_define_flow_ids = [db_flow_action.flow_id for
-                                       db_flow_action in db_flow_actions]
-            db_flow_defines = _Flow.query.filter(
-                _Flow.flow_id.in_(db_flow_define_flow_ids)).all()
-            db_flow_define_ids = [db_flow_define.id for
-                                  db_flow_define in db_flow_defines]
-            db_activitys = _Activity.query.filter_by().all()
-            db_flow_define_ids.extend(
-                [db_activity.flow_id for db_activity in db_activitys])
-            db_flow_define_ids = list(set(db_flow_define_ids))
+            query = _Activity.query.filter(_Activity.flow_id.isnot(None))
             if community_id is not None:
-                activities = _Activity.query.filter(
-                    _Activity.flow_id.in_(db_flow_define_ids),
-                    _Activity.activity_community_id == community_id
-                ).order_by(
-                    asc(_Activity.id)).all()
-            else:
-                activities = _Activity.query.filter(
-                    _Activity.flow_id.in_(db_flow_define_ids)).order_by(
-                    asc(_Activity.id)).all()
-            return activities
+                query = query.filter(
+                    _Activity.activity_community_id == community_id)
+            return query.order_by(asc(_Activity.id)).all()
 
     def get_activity_steps(self, activity_id):
         """Get activity steps."""
@@ -104,3 +104,13 @@ WEKO_WORKFLOW_TODO_TAB = 'todo'
 WEKO_WORKFLOW_WAIT_TAB = 'wait'
 
 WEKO_WORKFLOW_ALL_TAB = 'all'
+
+WEKO_WORKFLOW_FLOW_ACTION_VERSION_KEY = 'weko_workflow_flow_action_version'
+"""Cache key of the version of the flow action roles."""
+
+WEKO_WORKFLOW_ACTIONABLE_FLOW_ACTIONS_CACHE_KEY = \
+    'weko_workflow_actionable_flow_actions_{version}_{user_id}_{roles}'
+"""Cache key of the flow actions a user acts on or waits for."""
+
+WEKO_WORKFLOW_ACTIONABLE_FLOW_ACTIONS_CACHE_TTL = 60 * 60
+"""Cache timeout of the actionable flow actions of a user."""
@@ -549,6 +549,11 @@ class FlowAction(db.Model, TimestampMixin):
         backref=db.backref('flow_action'))
     """flow action relationship."""
 
+    __table_args__ = (
+        db.Index('ix_workflow_flow_action_flow_action',
+                 'flow_id', 'action_id'),
+    )
+
 
 class FlowActionRole(db.Model, TimestampMixin):
     """FlowActionRole list belong to FlowAction.
@@ -583,6 +588,13 @@ class FlowActionRole(db.Model, TimestampMixin):
         nullable=False, default=False, server_default='0')
     """If set to True, deny the action, otherwise allow it."""
 
+    __table_args__ = (
+        db.Index('ix_workflow_flow_action_role_user',
+                 'action_user', 'action_user_exclude'),
+        db.Index('ix_workflow_flow_action_role_role',
+                 'action_role', 'action_role_exclude'),
+    )
+
 
 class WorkFlow(db.Model, TimestampMixin):
     """Define WorkFlow."""
@@ -704,6 +716,10 @@ class Activity(db.Model, TimestampMixin):
         nullable=True, unique=False)
     """the user of update activity."""
 
+    update_user = db.relationship(
+        User, foreign_keys=[activity_update_user])
+    """the user of update activity relationship."""
+
     ACTIVITYSTATUSPOLICY = [
         (ActivityStatusPolicy.ACTIVITY_BEGIN,
          ActivityStatusPolicy.describe(ActivityStatusPolicy.ACTIVITY_BEGIN)),
@@ -743,6 +759,17 @@ class Activity(db.Model, TimestampMixin):
 
     shared_user_id = db.Column(db.Integer(), nullable=True)
 
+    __table_args__ = (
+        db.Index('ix_workflow_activity_status_id',
+                 'activity_status', 'id'),
+        db.Index('ix_workflow_activity_login_user_id',
+                 'activity_login_user', 'id'),
+        db.Index('ix_workflow_activity_shared_user_id',
+                 'shared_user_id', 'id'),
+        db.Index('ix_workflow_activity_flow_action',
+                 'flow_id', 'action_id'),
+    )
+
 
 class ActivityAction(db.Model, TimestampMixin):
     """Define Activety."""
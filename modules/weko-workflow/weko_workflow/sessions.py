@@ -20,11 +20,8 @@
 
 """WEKO3 module docstring."""
 
-import os
-
-import redis
 from flask import current_app, session
-from simplekv.memory.redisstore import RedisStore
+from weko_records.redis_client import get_session_redis_store
 
 from .api import WorkActivity
 
@@ -45,10 +42,7 @@ def upt_activity_item(app, user_id, item_id, item_title):
             activity, item_id.object_uuid)
         if rtn:
             del session['activity_info']
-            sessionstore = RedisStore(redis.StrictRedis.from_url(
-                'redis://{host}:{port}/1'.format(
-                    host=os.getenv('INVENIO_REDIS_HOST', 'localhost'),
-                    port=os.getenv('INVENIO_REDIS_PORT', '6379'))))
+            sessionstore = get_session_redis_store()
             activity_id = activity.get('activity_id', None)
             if activity_id and sessionstore.redis.exists(
                     'activity_item_' + activity_id):
@@ -21,12 +21,10 @@
 """Blueprint for weko-workflow."""
 
 import json
-import os
 import sys
 from collections import OrderedDict
 from functools import wraps
 
-import redis
 from flask import Blueprint, current_app, jsonify, render_template, request, \
     session, url_for
 from flask_babelex import gettext as _
@@ -37,7 +35,6 @@ from invenio_pidrelations.contrib.versioning import PIDVersioning
 from invenio_pidstore.errors import PIDDoesNotExistError
 from invenio_pidstore.models import PersistentIdentifier, PIDStatus
 from invenio_pidstore.resolver import Resolver
-from simplekv.memory.redisstore import RedisStore
 from sqlalchemy import types
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.sql.expression import cast
@@ -50,6 +47,8 @@ from weko_items_ui.api import item_login
 from weko_items_ui.utils import get_actionid, to_files_js
 from weko_records.api import FeedbackMailList, ItemLink, ItemsMetadata
 from weko_records.models import ItemMetadata
+from weko_records.redis_client import get_redis_store, \
+    get_session_redis_store
 from weko_records.serializers.utils import get_item_type_name
 from weko_records_ui.utils import get_list_licence
 from werkzeug.utils import import_string
@@ -383,10 +382,7 @@ def display_activity(activity_id=0):
             #     pid_type='depid', object_type='rec', object_uuid=item.id)
             record = item
 
-        sessionstore = RedisStore(redis.StrictRedis.from_url(
-            'redis://{host}:{port}/1'.format(
-                host=os.getenv('INVENIO_REDIS_HOST', 'localhost'),
-                port=os.getenv('INVENIO_REDIS_PORT', '6379'))))
+        sessionstore = get_session_redis_store()
         if sessionstore.redis.exists(
             'updated_json_schema_{}'.format(activity_id)) \
             and sessionstore.get(
@@ -406,10 +402,7 @@ def display_activity(activity_id=0):
         files = to_files_js(approval_record)
 
         # get files data after click Save btn
-        sessionstore = RedisStore(redis.StrictRedis.from_url(
-            'redis://{host}:{port}/1'.format(
-                host=os.getenv('INVENIO_REDIS_HOST', 'localhost'),
-                port=os.getenv('INVENIO_REDIS_PORT', '6379'))))
+        sessionstore = get_session_redis_store()
         if sessionstore.redis.exists('activity_item_' + str(activity_id)):
             item_str = sessionstore.get('activity_item_' + str(activity_id))
             item_json = json.loads(item_str.decode('utf-8'))
@@ -755,10 +748,7 @@ def next_action(activity_id='0', action_id=0):
         if isinstance(error_list, str):
             return jsonify(code=-1, msg=_(error_list))
 
-        sessionstore = RedisStore(redis.StrictRedis.from_url(
-            'redis://{host}:{port}/1'.format(
-                host=os.getenv('INVENIO_REDIS_HOST', 'localhost'),
-                port=os.getenv('INVENIO_REDIS_PORT', '6379'))))
+        sessionstore = get_session_redis_store()
         if error_list:
             sessionstore.put(
                 'updated_json_schema_{}'.format(activity_id),
@@ -944,8 +934,7 @@ def get_journals():
     if not key:
         return jsonify({})
 
-    datastore = RedisStore(redis.StrictRedis.from_url(
-        current_app.config['CACHE_REDIS_URL']))
+    datastore = get_redis_store()
     cache_key = current_app.config[
         'WEKO_WORKFLOW_OAPOLICY_SEARCH'].format(keyword=key)
 
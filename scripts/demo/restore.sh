@@ -30,6 +30,7 @@ docker-compose exec web invenio db create -v
 # postgresql-restore-begin
 docker cp ./scripts/demo/postgresql/weko.sql $(docker-compose ps -q postgresql):/
 docker-compose exec postgresql psql -U invenio -d invenio -f weko.sql
+docker-compose exec web invenio index_tree rebuild_path
 # postgresql-restore-end
 
 # elasticsearch-restore-begin
@@ -110,6 +110,9 @@ ${INVENIO_WEB_INSTANCE} index queue init
 # sphinxdoc-index-initialisation-end
 
 # sphinxdoc-pipeline-registration-begin
+# "ignore_missing" skips the file contents already extracted as text.
+# Existing clusters keep the pipeline registered without it: run this
+# command again on them before reindexing (see weko-deposit CHANGES.rst).
 curl -XPUT 'http://elasticsearch:9200/_ingest/pipeline/item-file-pipeline' -H 'Content-Type: application/json' -d '{
  "description" : "Index contents of each file.",
  "processors" : [
@@ -121,6 +124,7 @@ curl -XPUT 'http://elasticsearch:9200/_ingest/pipeline/item-file-pipeline' -H 'C
            "indexed_chars" : -1,
            "target_field": "_ingest._value.attachment",
            "field": "_ingest._value.file",
+           "ignore_missing": true,
            "properties": [
              "content"
            ]